@@ -1,6 +1,10 @@
+import codecs
 import requests
 import json
 from pathlib import Path
+from typing import Iterator
+
+from Data.json_stream import iter_array_objects
 
 
 class APIService:
@@ -12,6 +16,7 @@ class APIService:
         "https://tigerds-api.kindflower-ccaf48b6."
         "eastus.azurecontainerapps.io"
     )
+    CHUNK_SIZE = 1 << 16
 
     def fetch(self, endpoint: str) -> dict:
         url = f"{self.BASE_URL}/{endpoint}"
@@ -24,15 +29,71 @@ class APIService:
         except Exception:
             return self._load_cache(endpoint)
 
-    def _save_cache(self, endpoint: str, data: dict) -> None:
+    def stream(self, endpoint: str) -> Iterator[dict]:
+        """
+        Entrega uno a uno los objetos de la primera lista de objetos de la
+        respuesta, sin cargarla completa. La respuesta se copia a la caché
+        mientras llega; si la API falla antes del primer objeto se lee la
+        caché de la misma forma.
+        """
+        source = self._stream_http(endpoint)
+        yielded = False
+        try:
+            for item in iter_array_objects(source):
+                yielded = True
+                yield item
+            # Termina de leer el cuerpo para completar la caché
+            for _ in source:
+                pass
+            return
+        except Exception as exc:
+            if yielded:
+                print(f"Feed {endpoint} interrumpido: {exc}")
+                return
+        finally:
+            source.close()
+        yield from iter_array_objects(self._stream_cache(endpoint))
+
+    def _cache_path(self, endpoint: str) -> Path:
         safe_name = endpoint.replace("/", "_") + ".json"
-        path = Path("api_cache") / safe_name
+        return Path("api_cache") / safe_name
+
+    def _stream_http(self, endpoint: str) -> Iterator[str]:
+        url = f"{self.BASE_URL}/{endpoint}"
+        path = self._cache_path(endpoint)
+        partial = path.with_suffix(".part")
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        complete = False
+        response = requests.get(url, timeout=5, stream=True)
+        try:
+            response.raise_for_status()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(partial, "wb") as cache:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    cache.write(chunk)
+                    yield decoder.decode(chunk)
+                yield decoder.decode(b"", final=True)
+            complete = True
+            partial.replace(path)
+        finally:
+            response.close()
+            if not complete and partial.exists():
+                partial.unlink()
+
+    def _stream_cache(self, endpoint: str) -> Iterator[str]:
+        with open(self._cache_path(endpoint), "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def _save_cache(self, endpoint: str, data: dict) -> None:
+        path = self._cache_path(endpoint)
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f)
 
     def _load_cache(self, endpoint: str) -> dict:
-        safe_name = endpoint.replace("/", "_") + ".json"
-        path = Path("api_cache") / safe_name
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
\ No newline at end of file
+        with open(self._cache_path(endpoint), "r", encoding="utf-8") as f:
+            return json.load(f)
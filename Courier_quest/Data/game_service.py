@@ -1,13 +1,20 @@
 from collections import deque
 import math
-import time
-from typing import Iterable, Tuple
+from typing import Iterable, List, Optional
 
 from Logic.entity.job import Job
 from Logic.entity.weather_burst import WeatherBurst
 from Logic.entity.city_map import CityMap
 from Logic.entity.courier import Courier
 from Logic.entity.ia import Ia
+from Logic.distance_field import DistanceFieldCache
+from Logic.pathfinder import PathFinder
+from Logic.spatial_index import SpatialHash
+from Logic.release_scheduler import ReleaseScheduler
+from Logic.job_table import JobTable
+from Logic.route_optimizer import RouteOptimizer, Tour
+from Logic.dispatcher import Dispatcher
+from Logic.clock import Clock, SYSTEM_CLOCK
 
 
 class GameService:
@@ -24,46 +31,159 @@ class GameService:
         release_time=0,
     )
 
-    def __init__(self, jobs: Iterable[Job], weather: Iterable[WeatherBurst], map: CityMap, courier: Courier, ia : Ia):
-        self.session_start = time.time()
-        self.jobs = jobs
+    def __init__(self, jobs: Iterable[Job], weather: Iterable[WeatherBurst], map: CityMap, courier: Courier, ia : Ia,
+                 distance_fields: Optional[DistanceFieldCache] = None,
+                 pathfinder: Optional[PathFinder] = None,
+                 clock: Optional[Clock] = None):
+        # Reloj de la partida: deadlines, liberaciones y vencimientos se miden con él
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        self.session_start = self.clock.now()
+        # Solo los pedidos liberados y sin expirar; el resto espera en la línea de tiempo
+        self.jobs: List[Job] = []
+        self.release_scheduler = ReleaseScheduler()
+        self.job_table = JobTable()  # columnas de los pedidos liberados; activas = disponibles
+        self._jobs_by_id = {}  # id del feed -> pedido, para mezclar refrescos
+        self._merge_seen = None  # ids vistos en el refresco en curso
         self.weather = weather
         self.map = map
+        # Un caché vacío es falsy (__len__): comparar contra None
+        self.distance_fields = distance_fields if distance_fields is not None else DistanceFieldCache(map)
+        self.pathfinder = pathfinder if pathfinder is not None else PathFinder(map)
         self.courier = courier
         self.ia = ia
         self.last_job = self.job_example
         self.last_job_ia = self.job_example
         self.last_job_ia = self.job_example
-        self._bind_jobs_to_session(self.jobs)
         if hasattr(self.job_example, "bind_session_start"):
-            self.job_example.bind_session_start(self.session_start)
+            self.job_example.bind_session_start(self.session_start, self.clock)
         self.pila = deque()
 
+        # Índices espaciales: pickups disponibles y dropoffs por inventario
+        self._pickup_index = SpatialHash()
+        self._pickup_key = None
+        self._pickup_order = 0
+        self._dropoff_indexes = {}
+
+        # Optimizadores de recorrido por agente (si el agente no trae uno)
+        self._route_optimizers = {}
+
+        # Reparto de pedidos entre varias IAs (solo las registradas)
+        self.dispatcher = Dispatcher(self.pathfinder)
+        self.set_jobs(jobs)
+
     def _bind_jobs_to_session(self, jobs_iterable: Iterable[Job]) -> None:
         for job in jobs_iterable:
             if hasattr(job, "bind_session_start"):
-                job.bind_session_start(self.session_start)
+                job.bind_session_start(self.session_start, self.clock)
 
     def job_most_nearly(self, curr_position):
         """Busca el job mas cercano a la posicion del jugador."""
-        candidates = list(self.jobs) + list(self.courier.inventory.get_all())
-        if not candidates:
-            return None
+        return self._nearest_job_for(self.courier.inventory, curr_position)
 
-        nearest: Job | None = None
-        min_dist = float("inf")
+    # ---------------------- INDICE ESPACIAL ----------------------
+    def _index_job(self, job: Job) -> None:
+        """Marca job como disponible en el índice espacial y en la tabla."""
+        self._pickup_index.insert(job, job.pickup, self._pickup_order)
+        self._pickup_order += 1
+        self.job_table.append(job)
+        self.job_table.set_active(job, True)
 
-        for job in candidates:
-            if job in self.courier.inventory.get_all():
-                dist = self.distance(job.dropoff, curr_position)
-            else:
-                dist = self.distance(job.pickup, curr_position)
+    def _unindex_job(self, job: Job) -> None:
+        self._pickup_index.remove(job)
+        self.job_table.set_active(job, False)
+        self.dispatcher.release(job)
+
+    def _rebuild_pickup_index(self) -> None:
+        """Reconstruye el índice de pickups en el orden de self.jobs."""
+        self._pickup_index.clear()
+        self._pickup_order = 0
+        self.job_table.deactivate_all()
+        self.dispatcher.clear()
+        for job in self.jobs:
+            self._index_job(job)
+        self._pickup_key = (id(self.jobs), len(self.jobs))
+
+    def _sync_pickup_index(self) -> None:
+        """
+        Aplica cambios hechos directamente sobre la lista de pedidos (sin
+        pasar por take_job / set_jobs): solo agrega y quita la diferencia.
+        """
+        if self._pickup_key == (id(self.jobs), len(self.jobs)):
+            return
+        current = list(self.jobs)
+        present = set(current)
+        for job in self._pickup_index.items():
+            if job not in present:
+                self._unindex_job(job)
+        for job in current:
+            if job not in self._pickup_index:
+                self._index_job(job)
+        self._pickup_key = (id(self.jobs), len(self.jobs))
+
+    def _dropoff_index(self, inventory) -> SpatialHash:
+        """Índice de dropoffs de un inventario; se sincroniza por su versión."""
+        entry = self._dropoff_indexes.get(id(inventory))
+        if entry is None:
+            entry = self._dropoff_indexes[id(inventory)] = [SpatialHash(), None, 0]
+        index, version, order = entry
+        if version != inventory.version:
+            carried = inventory.get_all()
+            present = set(carried)
+            for job in index.items():
+                if job not in present:
+                    index.remove(job)
+            for job in carried:
+                if job not in index:
+                    index.insert(job, job.dropoff, order)
+                    order += 1
+            entry[1], entry[2] = inventory.version, order
+        return index
+
+    def take_job(self, job: Job) -> None:
+        """Saca un pedido aceptado de la lista de disponibles y del índice."""
+        self._sync_pickup_index()
+        if job in self._pickup_index:
+            self.jobs.remove(job)
+            self._unindex_job(job)
+            self.release_scheduler.cancel(job)
+            self._pickup_key = (id(self.jobs), len(self.jobs))
 
-            if dist <= 5 and dist < min_dist:
-                nearest = job
-                min_dist = dist
+    def pickups_within(self, position, radius: float):
+        """Pedidos disponibles con pickup a distancia <= radius, como (job, dist)."""
+        self._sync_pickup_index()
+        return self._pickup_index.query_radius(position, radius)
 
-        return nearest
+    def nearest_pickups(self, position, k: int = 1, max_radius: Optional[float] = None):
+        """Los k pedidos disponibles con pickup más cercano, como (job, dist)."""
+        self._sync_pickup_index()
+        return self._pickup_index.nearest(position, k, max_radius)
+
+    def _nearest_job_for(self, inventory, position, radius: float = 5):
+        """
+        Pedido más cercano dentro de radius: pickups disponibles o dropoffs
+        de lo que ya se lleva. Los empates se resuelven como el recorrido
+        lineal sobre jobs + inventario: primero el orden en la lista de
+        pedidos y después el del inventario.
+        """
+        carried = self._dropoff_index(inventory)
+        pickups = self._pickup_index
+        best = None
+        best_key = None
+        for job, dist in self.pickups_within(position, radius):
+            if job not in carried:
+                best, best_key = job, (dist, 0, pickups.order_of(job))
+                break
+        for job, dist in carried.query_radius(position, radius):
+            if best_key is not None and dist > best_key[0]:
+                break
+            # Un pedido que sigue en la lista compite en su lugar de la lista
+            if job in pickups:
+                key = (dist, 0, pickups.order_of(job))
+            else:
+                key = (dist, 1, carried.order_of(job))
+            if best_key is None or key < best_key:
+                best, best_key = job, key
+        return best
 
     def distance(self, a, b):
         """
@@ -71,6 +191,49 @@ class GameService:
         """
         return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
 
+    def next_step_towards(self, position, target):
+        """Siguiente celda hacia target segun el campo de distancias cacheado."""
+        return self.distance_fields.next_step(position, target)
+
+    def route_hint(self, position, target):
+        """Ruta completa sugerida al jugador desde position hasta target."""
+        return self.pathfinder.find_path(tuple(position), tuple(target))
+
+    # ---------------------- REPARTO ----------------------
+    def register_agent(self, agent) -> None:
+        """Suma agent al reparto: desde ahora persigue el pedido que se le asigne."""
+        self.dispatcher.register(agent)
+        agent.dispatcher = self.dispatcher
+
+    def dispatch_jobs(self) -> int:
+        """Asigna pedidos disponibles a los agentes libres; devuelve cuántos se asignaron."""
+        if not len(self.dispatcher):
+            return 0
+        self._sync_pickup_index()
+        return self.dispatcher.dispatch(self._pickup_index, self.job_table.version)
+
+    # ---------------------- RECORRIDO ----------------------
+    def route_optimizer_for(self, agent) -> RouteOptimizer:
+        """Optimizador del agente; se crea uno por agente si no tiene propio."""
+        optimizer = getattr(agent, "route_optimizer", None)
+        if optimizer is None:
+            optimizer = self._route_optimizers.get(id(agent))
+            if optimizer is None:
+                optimizer = self._route_optimizers[id(agent)] = RouteOptimizer(self.pathfinder, clock=self.clock)
+        return optimizer
+
+    def best_route(self, agent, budget: Optional[float] = None, candidates: Optional[int] = None) -> Tour:
+        """
+        Mejor recorrido conocido para agent: entregas de su inventario más
+        los ``candidates`` pedidos disponibles con pickup más cercano. Cada
+        llamada sigue mejorando la búsqueda anterior durante ``budget`` segundos.
+        """
+        optimizer = self.route_optimizer_for(agent)
+        k = optimizer.max_candidates if candidates is None else candidates
+        visible = [job for job, _ in self.nearest_pickups(agent.position, k)] if k > 0 else []
+        return optimizer.update(agent.position, agent.inventory.get_all(), visible,
+                                agent.inventory.max_weight, budget=budget)
+
     def get_last_job(self):
         """Devuelve el ultimo trabajo tomado."""
         return self.last_job
@@ -80,8 +243,105 @@ class GameService:
         self.last_job = job
 
     def set_jobs(self, jobs: Iterable[Job]) -> None:
-        self.jobs = jobs
-        self._bind_jobs_to_session(self.jobs)
+        """Reemplaza la lista de pedidos; solo quedan activos los ya liberados."""
+        jobs = list(jobs)
+        self._bind_jobs_to_session(jobs)
+        self.release_scheduler = ReleaseScheduler(jobs)
+        self.job_table = JobTable()
+        self._jobs_by_id = {job.id: job for job in jobs}
+        self._merge_seen = None
+        self.jobs = []
+        self._rebuild_pickup_index()
+        self.update_jobs()
+
+    def add_jobs(self, jobs: Iterable[Job]) -> None:
+        """Suma pedidos a la línea de tiempo sin tocar los ya cargados (feed en curso)."""
+        for job in jobs:
+            if hasattr(job, "bind_session_start"):
+                job.bind_session_start(self.session_start, self.clock)
+            self.release_scheduler.schedule(job)
+            self._jobs_by_id[job.id] = job
+
+    # ---------------------- REFRESCO POR DIFERENCIAS ----------------------
+    def begin_merge(self) -> None:
+        """Empieza un refresco: los pedidos abiertos que no vuelvan a aparecer se retiran."""
+        self._merge_seen = set()
+
+    def merge_jobs(self, raw_jobs: Iterable[dict]) -> List[Job]:
+        """
+        Mezcla un lote crudo del feed por id: crea solo los pedidos nuevos,
+        actualiza en el lugar los abiertos (pendientes o disponibles) que
+        cambiaron y deja intactos los aceptados, entregados o vencidos.
+        Devuelve los pedidos creados.
+        """
+        by_id = self._jobs_by_id
+        seen = self._merge_seen
+        new_raw = []
+        for raw in raw_jobs:
+            job_id = raw.get("id")
+            if seen is not None:
+                seen.add(job_id)
+            job = by_id.get(job_id)
+            if job is None:
+                new_raw.append(raw)
+            elif self._is_open(job) and job.feed_signature() != Job.signature_of(raw):
+                self._update_job(job, raw)
+        new_jobs = Job.from_dicts(new_raw, self.clock)
+        self.add_jobs(new_jobs)
+        return new_jobs
+
+    def finish_merge(self) -> List[Job]:
+        """Cierra el refresco en curso retirando los pedidos abiertos que ya no están."""
+        seen = self._merge_seen
+        self._merge_seen = None
+        if seen is None:
+            return []
+        retired = [job for job_id, job in self._jobs_by_id.items()
+                   if job_id not in seen and self._is_open(job)]
+        self._sync_pickup_index()
+        for job in retired:
+            del self._jobs_by_id[job.id]
+            self.release_scheduler.cancel(job)
+            if job in self._pickup_index:
+                self.jobs.remove(job)
+                self._unindex_job(job)
+        self._pickup_key = (id(self.jobs), len(self.jobs))
+        return retired
+
+    def _is_open(self, job: Job) -> bool:
+        """True si job sigue pendiente de liberar o disponible para aceptar."""
+        return self.release_scheduler.is_pending(job) or job in self._pickup_index
+
+    def _update_job(self, job: Job, raw: dict) -> None:
+        job.update_from(raw)
+        if job in self._pickup_index:
+            self._pickup_index.insert(job, job.pickup, self._pickup_index.order_of(job))
+        self.job_table.update(job)
+        self.release_scheduler.reschedule(job)
+
+    def update_jobs(self, now: Optional[float] = None) -> List[Job]:
+        """
+        Pasa a self.jobs los pedidos cuyo release_time ya llegó y quita los
+        disponibles cuyo deadline pasó. Devuelve los pedidos liberados.
+        """
+        now = self.clock.now() if now is None else now
+        scheduler = self.release_scheduler
+        self._sync_pickup_index()
+        released = scheduler.release_due(now)
+        for job in released:
+            self.jobs.append(job)
+            self._index_job(job)
+        for job in scheduler.expire_due(now):
+            # Los pedidos ya aceptados no están en el índice y siguen su curso
+            if job in self._pickup_index:
+                self.jobs.remove(job)
+                self._unindex_job(job)
+        self._pickup_key = (id(self.jobs), len(self.jobs))
+        return released
+
+    def pending_jobs(self) -> int:
+        """Cantidad de pedidos que todavía no se liberan."""
+        return len(self.release_scheduler)
     
     def get_steps(self):
         if self.pila: 
@@ -98,28 +358,9 @@ class GameService:
         return 
     
     #---------------------- IA LOGIC -------------------------------
-    def job_most_nearly_ia(self, ia_position):
-        """Busca el job más cercano a la IA con distancia máxima 5."""
-        candidates = list(self.jobs) + list(self.ia.inventory.get_all())
-        if not candidates:
-            return None
-
-        nearest = None
-        min_dist = float("inf")
-
-        for job in candidates:
-            # Si el job está en inventario → ir al dropoff
-            if job in self.ia.inventory.get_all():
-                dist = self.distance(job.dropoff, ia_position)
-            else:
-                dist = self.distance(job.pickup, ia_position)
-
-            # Debe estar relativamente cerca para evitar IA perdida
-            if dist <= 5 and dist < min_dist:
-                min_dist = dist
-                nearest = job
-
-        return nearest
+    def job_most_nearly_ia(self, ia_position, ia=None):
+        """Busca el job más cercano a la IA (por defecto self.ia) con distancia máxima 5."""
+        return self._nearest_job_for((ia if ia is not None else self.ia).inventory, ia_position)
 
     
     def _next_movement_ia(self):
@@ -0,0 +1,83 @@
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_SEPARATORS = " \t\n\r,"
+_COMPACT_AT = 1 << 16
+_decoder = json.JSONDecoder()
+
+
+def iter_array_objects(chunks: Iterable[str]) -> Iterator[dict]:
+    """
+    Recorre un documento JSON que llega por pedazos y entrega uno a uno los
+    objetos del primer arreglo de objetos que aparece (el mismo que
+    encuentra ``controller_game._find_list_of_dicts`` en respuestas como
+    ``{"version": ..., "data": [{...}, ...]}``).
+
+    Solo se retiene el texto aún no procesado, así la memoria no crece con
+    el tamaño del documento. Si no hay ningún arreglo de objetos no entrega
+    nada; si el documento se corta dentro del arreglo lanza
+    ``json.JSONDecodeError``.
+    """
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+
+    # 1) Avanzar hasta el primer "[" cuyo primer elemento es un objeto
+    in_string = escape = array_open = False
+    while True:
+        if pos >= len(buffer):
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            buffer, pos = chunk, 0
+            continue
+        ch = buffer[pos]
+        pos += 1
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if array_open:
+            if ch in _WHITESPACE:
+                continue
+            if ch == "{":
+                pos -= 1
+                break
+            array_open = False
+        if ch == '"':
+            in_string = True
+        elif ch == "[":
+            array_open = True
+
+    # 2) Decodificar elementos hasta el "]" que cierra el arreglo
+    buffer, pos = buffer[pos:], 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(buffer):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise json.JSONDecodeError("Arreglo sin cerrar", buffer, pos)
+            buffer, pos = chunk, 0
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Elemento incompleto: se espera el siguiente pedazo
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        pos = end
+        if isinstance(item, dict):
+            yield item
+        if pos >= _COMPACT_AT:
+            buffer, pos = buffer[pos:], 0
@@ -0,0 +1,146 @@
+# Logic/agent_table.py
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from Logic.entity.city_map import CityMap
+
+Position = Tuple[int, int]
+
+# Energía extra por celda según el clima (igual que _calculate_stamina_cost)
+WEATHER_STAMINA_COST = {"rain": 0.1, "wind": 0.1, "heat": 0.2, "storm": 0.3}
+EXHAUSTED_RESUME = 30.0  # energía con la que un agente agotado vuelve a moverse
+
+
+class AgentTable:
+    """
+    Tabla columnar del estado físico de los agentes (courier e IAs).
+
+    Guarda en arreglos planos (``array``) las columnas que cambian en cada
+    tick: posición x/y, energía y su máximo, carga, reputación y el
+    bloqueo por agotamiento. La fila r corresponde a ``agents[r]``; los
+    agentes leen y escriben su fila a través de ``AgentColumn``, así su API
+    de atributos no cambia.
+
+    ``step`` mueve un lote de agentes en una sola pasada: valida el
+    destino contra el mapa de bloqueos, descuenta la energía según carga y
+    clima, recupera a los que no avanzaron y actualiza los bloqueos.
+    """
+
+    def __init__(self):
+        self.agents: List = []
+        self.x = array("l")
+        self.y = array("l")
+        self.stamina = array("d")
+        self.stamina_max = array("d")
+        self.load = array("d")
+        self.reputation = array("l")
+        self.exhausted = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    # -------------------------
+    # Altas
+    # -------------------------
+    def add(self, agent, position: Position, stamina: float = 100.0, stamina_max: float = 100.0,
+            load: float = 0.0, reputation: int = 70, exhausted: bool = False) -> int:
+        """Agrega una fila para agent, lo vincula a ella y devuelve su índice."""
+        row = len(self.agents)
+        self.agents.append(agent)
+        self.x.append(int(position[0]))
+        self.y.append(int(position[1]))
+        self.stamina.append(float(stamina))
+        self.stamina_max.append(float(stamina_max))
+        self.load.append(float(load))
+        self.reputation.append(int(reputation))
+        self.exhausted.append(1 if exhausted else 0)
+        agent._agent_table = self
+        agent._agent_row = row
+        return row
+
+    def adopt(self, agent) -> int:
+        """Pasa agent (con su estado actual) desde su tabla a esta."""
+        if getattr(agent, "_agent_table", None) is self:
+            return agent._agent_row
+        return self.add(agent, agent.position, agent.stamina, agent.stamina_max,
+                        agent.current_load, agent.reputation, agent.exhausted_lock)
+
+    # -------------------------
+    # Paso en lote
+    # -------------------------
+    def step(
+        self,
+        rows: Sequence[int],
+        dxs: Sequence[int],
+        dys: Sequence[int],
+        city_map: CityMap,
+        weather: Optional[str] = None,
+        recover: float = 1.0,
+    ) -> List[bool]:
+        """
+        Intenta mover cada fila de rows en (dx, dy). Un agente avanza si
+        puede moverse (energía > 0, o >= 30 si está agotado) y el destino
+        está dentro del mapa y libre; al avanzar paga 0.5 + 0.2 por unidad
+        de carga sobre 3 + el extra del clima. Los que no avanzan recuperan
+        ``recover``. Devuelve, por fila, si el agente se movió.
+        """
+        xs, ys = self.x, self.y
+        stamina, stamina_max = self.stamina, self.stamina_max
+        load, exhausted = self.load, self.exhausted
+        blocked = city_map.blocked_grid
+        width, height = city_map.width, city_map.height
+        base = 0.5 + WEATHER_STAMINA_COST.get(weather, 0.0)
+
+        moved = []
+        for r, dx, dy in zip(rows, dxs, dys):
+            s = stamina[r]
+            nx, ny = xs[r] + dx, ys[r] + dy
+            if ((dx or dy) and (s >= EXHAUSTED_RESUME if exhausted[r] else s > 0.0)
+                    and 0 <= nx < width and 0 <= ny < height and not blocked[ny * width + nx]):
+                xs[r], ys[r] = nx, ny
+                extra = load[r] - 3.0
+                s -= base + 0.2 * extra if extra > 0 else base
+                if s <= 0.0:
+                    s = 0.0
+                    exhausted[r] = 1
+                stamina[r] = s
+                moved.append(True)
+            else:
+                if s < stamina_max[r]:
+                    s = min(stamina_max[r], s + recover)
+                    stamina[r] = s
+                    if exhausted[r] and s >= EXHAUSTED_RESUME:
+                        exhausted[r] = 0
+                moved.append(False)
+        return moved
+
+
+class AgentColumn:
+    """Atributo de un agente guardado en una columna de su ``AgentTable``."""
+
+    def __init__(self, column: str, kind=float):
+        self.column = column
+        self.kind = kind
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        return self.kind(getattr(agent._agent_table, self.column)[agent._agent_row])
+
+    def __set__(self, agent, value) -> None:
+        getattr(agent._agent_table, self.column)[agent._agent_row] = self.kind(value)
+
+
+class AgentPosition:
+    """Posición (x, y) de un agente guardada en las columnas x/y de su tabla."""
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        table, row = agent._agent_table, agent._agent_row
+        return table.x[row], table.y[row]
+
+    def __set__(self, agent, value: Position) -> None:
+        table, row = agent._agent_table, agent._agent_row
+        table.x[row] = int(value[0])
+        table.y[row] = int(value[1])
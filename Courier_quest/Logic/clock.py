@@ -0,0 +1,89 @@
+# Logic/clock.py
+import time
+from typing import Callable, Optional
+
+
+class Clock:
+    """
+    Reloj de la partida en segundos (misma escala que ``time.time()``).
+
+    Todo lo que depende del tiempo (deadlines, liberación de pedidos,
+    clima, entregas) lo lee de un reloj inyectado en vez de llamar a
+    ``time.time()``, así una sesión puede correr en tiempo real, acelerada
+    o avanzando a mano tick a tick de forma reproducible.
+
+    ``rate`` es cuántos segundos de juego pasan por segundo real; la
+    simulación lo usa para convertir el dt de un frame en ticks.
+    ``advance`` lo llama la simulación en cada tick: los relojes de pared
+    lo ignoran porque avanzan solos.
+    """
+
+    rate = 1.0
+
+    def now(self) -> float:
+        raise NotImplementedError
+
+    def advance(self, dt: float) -> None:
+        pass
+
+
+class RealClock(Clock):
+    """Tiempo de pared."""
+
+    def __init__(self, source: Callable[[], float] = time.time):
+        self._source = source
+
+    def now(self) -> float:
+        return self._source()
+
+
+class ScaledClock(Clock):
+    """
+    Tiempo de pared acelerado (o frenado) por ``scale``, a partir de
+    ``start`` (por defecto, el momento de crearlo). Cambiar la escala no
+    produce saltos: se continúa desde el instante actual.
+    """
+
+    def __init__(self, scale: float = 1.0, start: Optional[float] = None,
+                 source: Callable[[], float] = time.time):
+        self._source = source
+        self._origin = source()
+        self._start = self._origin if start is None else start
+        self.rate = scale
+
+    @property
+    def scale(self) -> float:
+        return self.rate
+
+    @scale.setter
+    def scale(self, value: float) -> None:
+        self._start = self.now()
+        self._origin = self._source()
+        self.rate = value
+
+    def now(self) -> float:
+        return self._start + (self._source() - self._origin) * self.rate
+
+
+class ManualClock(Clock):
+    """
+    Reloj que solo avanza cuando se le pide (``advance`` o ``set``); con
+    él una sesión corre tan rápido como se pueda simular y dos corridas
+    con las mismas entradas dan el mismo resultado.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, dt: float) -> None:
+        self._now += dt
+
+    def set(self, value: float) -> None:
+        self._now = float(value)
+
+
+# Reloj por defecto cuando no se inyecta ninguno
+SYSTEM_CLOCK = RealClock()
@@ -0,0 +1,120 @@
+# Logic/dispatcher.py
+from typing import Dict, Hashable, List, Optional
+
+from Logic.entity.job import Job
+from Logic.pathfinder import PathFinder
+from Logic.spatial_index import SpatialHash
+
+
+class Dispatcher:
+    """
+    Reparte los pedidos disponibles entre varias IAs para que no persigan
+    todas el mismo pickup.
+
+    Cada agente libre pide al índice espacial de pickups sus ``candidates``
+    pedidos sin dueño más cercanos y se calcula el costo de ruta real hasta
+    ellos con un solo Dijkstra acotado. Con esas aristas se hace una
+    asignación voraz por lotes: de menor a mayor costo, cada arista cuyo
+    agente y pedido siguen libres queda asignada.
+
+    Las asignaciones vigentes no se recalculan: cuando un pedido deja de
+    estar disponible (``release``) solo su agente vuelve a quedar libre y
+    entra en el próximo lote. Un agente sin candidatos no se reintenta
+    hasta que cambie el conjunto de pedidos (``jobs_key``). Cada lote
+    atiende como mucho ``batch_size`` agentes, así el costo por frame
+    queda acotado aunque haya cientos de IAs libres a la vez.
+    """
+
+    def __init__(self, pathfinder: PathFinder, candidates: int = 6, batch_size: int = 16):
+        self.pathfinder = pathfinder
+        self.candidates = max(1, candidates)
+        self.batch_size = max(1, batch_size)
+        self.agents: List = []
+        self._order: Dict[int, int] = {}  # id(agente) -> orden de registro
+        self._assigned: Dict[int, Job] = {}  # id(agente) -> pedido
+        self._owner: Dict[int, object] = {}  # id(pedido) -> agente
+        self._idle: Dict[int, Hashable] = {}  # id(agente) -> jobs_key sin candidatos
+        self._registered = 0
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    # -------------------------
+    # Agentes
+    # -------------------------
+    def register(self, agent) -> None:
+        if id(agent) in self._order:
+            return
+        self._order[id(agent)] = self._registered
+        self._registered += 1
+        self.agents.append(agent)
+
+    # -------------------------
+    # Asignaciones
+    # -------------------------
+    def assignment_for(self, agent) -> Optional[Job]:
+        """Pedido asignado a agent (None si no tiene)."""
+        return self._assigned.get(id(agent))
+
+    def release(self, job: Job) -> None:
+        """El pedido dejó de estar disponible: su agente queda libre."""
+        agent = self._owner.pop(id(job), None)
+        if agent is not None:
+            self._assigned.pop(id(agent), None)
+
+    def clear(self) -> None:
+        """Olvida todas las asignaciones (por ejemplo al reemplazar los pedidos)."""
+        self._assigned.clear()
+        self._owner.clear()
+        self._idle.clear()
+
+    def dispatch(self, pickups: SpatialHash, jobs_key: Hashable = None) -> int:
+        """
+        Asigna pedidos de ``pickups`` (índice de pedidos disponibles) a los
+        agentes libres. Devuelve cuántas asignaciones nuevas se hicieron.
+        """
+        free = [agent for agent in self.agents
+                if id(agent) not in self._assigned and self._idle.get(id(agent), self) != jobs_key]
+        if not free or not len(pickups):
+            return 0
+        free = free[:self.batch_size]
+
+        # 1) Aristas agente -> pedido con costo de ruta real
+        edges = []
+        claimed = self._owner
+        for agent in free:
+            position = (int(agent.position[0]), int(agent.position[1]))
+            inventory = agent.inventory
+            # Si los más cercanos ya tienen dueño se amplía la búsqueda
+            k = self.candidates
+            while True:
+                nearby = pickups.nearest(position, k)
+                jobs = [job for job, _ in nearby if id(job) not in claimed and inventory.can_add(job)]
+                if len(jobs) >= self.candidates or len(nearby) < k:
+                    break
+                k *= 2
+            jobs = jobs[:self.candidates]
+            if not jobs:
+                self._idle[id(agent)] = jobs_key
+                continue
+            costs = self.pathfinder.distances_from(position, [tuple(job.pickup) for job in jobs])
+            rank = self._order[id(agent)]
+            found = False
+            for job, cost in zip(jobs, costs):
+                if cost is not None:
+                    edges.append((cost, rank, pickups.order_of(job), agent, job))
+                    found = True
+            if not found:
+                self._idle[id(agent)] = jobs_key
+
+        # 2) Asignación voraz: la arista más barata primero
+        edges.sort(key=lambda edge: edge[:3])
+        made = 0
+        for _, _, _, agent, job in edges:
+            if id(agent) in self._assigned or id(job) in self._owner:
+                continue
+            self._assigned[id(agent)] = job
+            self._owner[id(job)] = agent
+            self._idle.pop(id(agent), None)
+            made += 1
+        return made
@@ -0,0 +1,163 @@
+# Logic/distance_field.py
+import heapq
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from Logic.entity.city_map import CityMap
+from Logic.pathfinder import CostModel, SurfaceCost
+
+UNREACHABLE = float("inf")
+
+
+class DistanceField:
+    """
+    Campo de distancias hacia una celda objetivo sobre la grilla compilada.
+
+    Para cada celda guarda el costo acumulado hasta el objetivo y el id de la
+    siguiente celda en el camino óptimo, así ambas consultas son O(1).
+    """
+
+    def __init__(self, city_map: CityMap, target: Tuple[int, int], costs: Sequence[float]):
+        self.target = target
+        self.width = city_map.width
+        self.height = city_map.height
+        size = self.width * self.height
+        self.dist = array("f", [UNREACHABLE]) * size
+        self.next_cell = array("i", [-1]) * size
+        self._build(city_map.blocked_grid, costs)
+
+    def _build(self, blocked, costs: Sequence[float]) -> None:
+        """
+        Dijkstra inverso desde el objetivo. Entrar a una celda cuesta su peso;
+        el objetivo se siembra aunque esté bloqueado (pickups en edificios),
+        pero solo se expande hacia celdas transitables.
+        """
+        width, height = self.width, self.height
+        dist, next_cell = self.dist, self.next_cell
+        tx, ty = self.target
+        if not (0 <= tx < width and 0 <= ty < height):
+            return
+
+        start = ty * width + tx
+        dist[start] = 0.0
+        open_heap = [(0.0, start)]
+        size = width * height
+        closed = bytearray(size)
+
+        while open_heap:
+            d, cell = heapq.heappop(open_heap)
+            if closed[cell]:
+                continue
+            closed[cell] = 1
+            step = d + costs[cell]
+            x = cell % width
+
+            for nb in (cell - 1 if x > 0 else -1,
+                       cell + 1 if x < width - 1 else -1,
+                       cell - width,
+                       cell + width):
+                if nb < 0 or nb >= size or blocked[nb] or closed[nb]:
+                    continue
+                if step < dist[nb]:
+                    dist[nb] = step
+                    next_cell[nb] = cell
+                    heapq.heappush(open_heap, (step, nb))
+
+    def distance(self, position: Tuple[int, int]) -> Optional[float]:
+        """Costo desde position hasta el objetivo, o None si no hay ruta."""
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        d = self.dist[y * self.width + x]
+        return None if d == UNREACHABLE else d
+
+    def next_step(self, position: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Siguiente celda hacia el objetivo, o None si ya llegó o no hay ruta."""
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        nxt = self.next_cell[y * self.width + x]
+        if nxt < 0:
+            return None
+        return nxt % self.width, nxt // self.width
+
+    def path(self, position: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Camino completo (incluye origen y objetivo) o lista vacía."""
+        if self.distance(position) is None:
+            return []
+        path = [tuple(position)]
+        current = self.next_step(position)
+        while current is not None:
+            path.append(current)
+            current = self.next_step(current)
+        return path
+
+
+class DistanceFieldCache:
+    """
+    Servicio de campos de distancia por objetivo con política LRU.
+
+    Los costos salen de un ``CostModel`` del motor de rutas; los campos se
+    invalidan solos cuando cambia su ``cache_key()`` (versión del mapa o
+    perfil de costos) y al reemplazarlo con ``set_cost_profile``.
+    """
+
+    def __init__(self, city_map: CityMap, capacity: int = 16, cost_model: Optional[CostModel] = None):
+        self.city_map = city_map
+        self.capacity = max(1, capacity)
+        self.cost_model = cost_model or SurfaceCost(city_map)
+        self._fields: "OrderedDict[Tuple[int, int], DistanceField]" = OrderedDict()
+        self._cost_key = self.cost_model.cache_key()
+
+    # -------------------------
+    # Invalidación
+    # -------------------------
+    def invalidate(self) -> None:
+        """Descarta todos los campos calculados."""
+        self._fields.clear()
+        self._cost_key = self.cost_model.cache_key()
+
+    def detach(self) -> None:
+        """Suelta los listeners de su modelo de costo."""
+        self.cost_model.detach()
+
+    def set_cost_profile(self, cost_model: Optional[CostModel]) -> None:
+        """Cambia el modelo de costo por celda. None vuelve a SurfaceCost."""
+        self.cost_model = cost_model or SurfaceCost(self.city_map)
+        self.invalidate()
+
+    # -------------------------
+    # Consultas
+    # -------------------------
+    def field(self, target: Tuple[int, int]) -> DistanceField:
+        """Devuelve el campo hacia target, calculándolo si no está en caché."""
+        if self._cost_key != self.cost_model.cache_key():
+            self.invalidate()
+
+        target = (int(target[0]), int(target[1]))
+        cached = self._fields.get(target)
+        if cached is not None:
+            self._fields.move_to_end(target)
+            return cached
+
+        field = DistanceField(self.city_map, target, self.cost_model.costs())
+        self._fields[target] = field
+        if len(self._fields) > self.capacity:
+            self._fields.popitem(last=False)
+        return field
+
+    def distance(self, position: Tuple[int, int], target: Tuple[int, int]) -> Optional[float]:
+        return self.field(target).distance(position)
+
+    def next_step(self, position: Tuple[int, int], target: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        return self.field(target).next_step(position)
+
+    def path(self, position: Tuple[int, int], target: Tuple[int, int]) -> List[Tuple[int, int]]:
+        return self.field(target).path(position)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, target: Tuple[int, int]) -> bool:
+        return tuple(target) in self._fields
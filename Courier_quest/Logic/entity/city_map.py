@@ -1,12 +1,26 @@
-from typing import Any, Dict, List
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Callback de cambio de tile: (x, y, (rx, ry, ancho, alto) sucio)
+TileListener = Callable[[int, int, Tuple[int, int, int, int]], None]
 
 
 class CityMap:
     """
     Representa el mapa de la ciudad con sus tiles,
     leyenda y objetivo de puntaje o posición de meta.
+
+    Al construirse compila los tiles y la leyenda en dos grillas planas
+    indexadas por ``y * width + x``: un mapa de bits de celdas bloqueadas
+    (``bytearray``) y el peso de superficie de cada celda (``array('f')``).
+
+    La descomposición de edificios en rectángulos también se calcula una
+    sola vez; ``set_tile`` la repara solo en la región afectada.
     """
 
+    # Tiles que se agrupan en bloques de edificio al dibujar
+    BUILDING_TILES = ("B", "D")
+
     def __init__(
         self,
         width: int,
@@ -18,59 +32,232 @@ class CityMap:
         self.width = width
         self.height = height
         self.tiles = tiles
-        self.legend = legend 
+        self.legend = legend
         self.goal = goal
+        self._blocked = bytearray(width * height)
+        self._surface = array("f", bytes(4 * width * height))
+        self._compile()
+
+        # Contador de versión: cambia con cada modificación de tiles
+        self.version = 0
+        self._tile_listeners: List[TileListener] = []
+
+        # Bloques de edificio: id -> rect y, por celda, el id de su bloque
+        self._blocks: Dict[int, Dict[str, int]] = {}
+        self._block_of = array("i", [-1]) * (width * height)
+        self._next_block_id = 0
+        self._blocks_list: Optional[List[Dict[str, int]]] = None
+        self._scan_blocks(0, 0, width, height)
+
+    # -------------------------
+    # Compilación
+    # -------------------------
+    def _tile_profile(self, key: str) -> Tuple[int, float]:
+        """Devuelve (bloqueado, peso) para un tipo de tile de la leyenda."""
+        entry = self.legend.get(key)
+        if entry is None:
+            # 'D' y cualquier tile fuera de la leyenda se tratan como edificio
+            return 1, 1.0
+        return (
+            1 if entry.get("blocked", False) else 0,
+            float(entry.get("surface_weight", 1.0)),
+        )
+
+    def _compile(self) -> None:
+        """Traduce tiles y leyenda a las grillas compactas (una sola vez)."""
+        profiles: Dict[str, Tuple[int, float]] = {}
+        blocked = self._blocked
+        surface = self._surface
+        width = self.width
+        for y, row in enumerate(self.tiles):
+            base = y * width
+            for x, key in enumerate(row):
+                profile = profiles.get(key)
+                if profile is None:
+                    profile = profiles[key] = self._tile_profile(key)
+                blocked[base + x] = profile[0]
+                surface[base + x] = profile[1]
+
+    # -------------------------
+    # Accesos escalares O(1)
+    # -------------------------
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def is_blocked(self, x: int, y: int) -> bool:
         """
         Devuelve True si la posición (x, y) está bloqueada.
+        Las posiciones fuera del mapa se consideran bloqueadas.
         """
-        key = self.tiles[y][x]
-        if(key == 'D'):
-            return "blocked",False
-        else:
-          return self.legend[key].get("blocked", False)
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self._blocked[y * self.width + x] != 0
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        """Devuelve True si (x, y) está dentro del mapa y no bloqueada."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self._blocked[y * self.width + x] == 0
 
     def get_surface_weight(self, x: int, y: int) -> float:
         """
         Devuelve el peso de superficie para calcular costos de paso.
         """
-        key = self.tiles[y][x]
-        return self.legend[key].get("surface_weight", 1.0)
-    
-    def detectar_bloques(self):
-      visited = [[False] * self.width for _ in range(self.height)] 
-      bloques = []  
-
-      for y in range(self.height): 
-        for x in range(self.width):  
-            if (self.tiles[y][x] == "B" or self.tiles[y][x] == "D") and not visited[y][x]:
+        return self._surface[y * self.width + x]
+
+    # -------------------------
+    # Accesos en bloque
+    # -------------------------
+    @property
+    def blocked_grid(self) -> memoryview:
+        """Vista de solo lectura del mapa de bits de bloqueos (1 = bloqueado)."""
+        return memoryview(self._blocked).toreadonly()
+
+    @property
+    def surface_grid(self) -> memoryview:
+        """Vista de solo lectura de los pesos de superficie (float32)."""
+        return memoryview(self._surface).toreadonly()
+
+    # -------------------------
+    # Bloques de edificio
+    # -------------------------
+    def detectar_bloques(self) -> List[Dict[str, int]]:
+        """
+        Devuelve los rectángulos de edificio ya calculados.
+        La lista se reutiliza entre frames hasta que cambie algún tile.
+        """
+        if self._blocks_list is None:
+            self._blocks_list = list(self._blocks.values())
+        return self._blocks_list
+
+    def _is_building(self, x: int, y: int) -> bool:
+        return self.tiles[y][x] in self.BUILDING_TILES
+
+    def _scan_blocks(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """
+        Barrido voraz de rectángulos dentro de [x0, x1) x [y0, y1) sobre las
+        celdas de edificio que todavía no pertenecen a ningún bloque.
+        """
+        width = self.width
+        block_of = self._block_of
+
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                if not self._is_building(x, y) or block_of[y * width + x] != -1:
+                    continue
+
                 w = 1
-                while (x + w < self.width and 
-                   (self.tiles[y][x + w] == "B" or self.tiles[y][x + w] == "D") and 
-                   not visited[y][x + w]):
-                   w += 1
-                
+                while (x + w < x1 and
+                       self._is_building(x + w, y) and
+                       block_of[y * width + x + w] == -1):
+                    w += 1
+
                 h = 1
                 expand = True
-                while expand and y + h < self.height:
+                while expand and y + h < y1:
                     for i in range(w):
-                        if ((self.tiles[y + h][x + i] != "B" and self.tiles[y + h][x + i] != "D") or 
-                            visited[y + h][x + i]):
+                        if (not self._is_building(x + i, y + h) or
+                                block_of[(y + h) * width + x + i] != -1):
                             expand = False
                             break
                     if expand:
                         h += 1
-                
+
+                block_id = self._next_block_id
+                self._next_block_id += 1
                 for yy in range(y, y + h):
                     for xx in range(x, x + w):
-                        visited[yy][xx] = True
-                
-                bloques.append({
-                    'x': x, 
-                    'y': y, 
-                    'width': w, 
+                        block_of[yy * width + xx] = block_id
+
+                self._blocks[block_id] = {
+                    'x': x,
+                    'y': y,
+                    'width': w,
                     'height': h,
-                })
-    
-      return bloques
\ No newline at end of file
+                }
+
+        self._blocks_list = None
+
+    def _remove_block(self, block_id: int) -> None:
+        block = self._blocks.pop(block_id)
+        width = self.width
+        for yy in range(block['y'], block['y'] + block['height']):
+            for xx in range(block['x'], block['x'] + block['width']):
+                self._block_of[yy * width + xx] = -1
+
+    def _blocks_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> set:
+        width = self.width
+        found = set()
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                block_id = self._block_of[yy * width + xx]
+                if block_id != -1:
+                    found.add(block_id)
+        return found
+
+    def _rebuild_blocks_around(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        """
+        Recalcula los bloques que tocan la vecindad de (x, y).
+
+        La región se amplía hasta contener completos todos los bloques que la
+        intersecan, así el nuevo barrido no se cruza con bloques externos.
+        Devuelve la región recalculada como (x, y, ancho, alto).
+        """
+        x0, y0 = max(0, x - 1), max(0, y - 1)
+        x1, y1 = min(self.width, x + 2), min(self.height, y + 2)
+        affected: set = set()
+
+        while True:
+            found = self._blocks_in_rect(x0, y0, x1, y1) - affected
+            if not found:
+                break
+            affected |= found
+            for block_id in found:
+                block = self._blocks[block_id]
+                x0 = min(x0, block['x'])
+                y0 = min(y0, block['y'])
+                x1 = max(x1, block['x'] + block['width'])
+                y1 = max(y1, block['y'] + block['height'])
+
+        for block_id in affected:
+            self._remove_block(block_id)
+        self._scan_blocks(x0, y0, x1, y1)
+        return x0, y0, x1 - x0, y1 - y0
+
+    # -------------------------
+    # Modificación de tiles
+    # -------------------------
+    def set_tile(self, x: int, y: int, key: str) -> Tuple[int, int, int, int]:
+        """
+        Cambia el tile (x, y), actualiza las grillas compiladas y repara la
+        descomposición de edificios solo en la región afectada.
+        Devuelve el rectángulo sucio (x, y, ancho, alto) en celdas.
+        """
+        if not self.in_bounds(x, y):
+            raise IndexError(f"Tile fuera del mapa: ({x}, {y})")
+
+        previous = self.tiles[y][x]
+        if previous == key:
+            return x, y, 0, 0
+
+        self.tiles[y][x] = key
+        idx = y * self.width + x
+        self._blocked[idx], self._surface[idx] = self._tile_profile(key)
+        self.version += 1
+
+        dirty = (x, y, 1, 1)
+        if previous in self.BUILDING_TILES or key in self.BUILDING_TILES:
+            dirty = self._rebuild_blocks_around(x, y)
+
+        for listener in list(self._tile_listeners):
+            listener(x, y, dirty)
+        return dirty
+
+    def add_tile_listener(self, listener: TileListener) -> None:
+        """Registra un callback que se invoca después de cada set_tile."""
+        if listener not in self._tile_listeners:
+            self._tile_listeners.append(listener)
+
+    def remove_tile_listener(self, listener: TileListener) -> None:
+        if listener in self._tile_listeners:
+            self._tile_listeners.remove(listener)
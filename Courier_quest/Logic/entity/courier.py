@@ -1,7 +1,8 @@
 # src/models/courier.py
 
-import time
 from typing import Tuple, List, Optional
+from Logic.clock import Clock, SYSTEM_CLOCK
+from Logic.agent_table import AgentTable, AgentColumn, AgentPosition
 from Logic.entity.job import Job
 from Logic.entity.inventory import Inventory
 from Logic.entity.city_map import CityMap
@@ -14,8 +15,19 @@ class Courier:
       - resistencia (energía), carga, inventario y entregas
     """
 
-    def __init__(self, start_pos: Tuple[int, int], max_weight: float):
+    position = AgentPosition()
+    stamina = AgentColumn("stamina")
+    stamina_max = AgentColumn("stamina_max")
+    current_load = AgentColumn("load")
+    reputation = AgentColumn("reputation", int)
+    exhausted_lock = AgentColumn("exhausted", bool)
+
+    def __init__(self, start_pos: Tuple[int, int], max_weight: float, clock: Optional[Clock] = None,
+                 agents: Optional[AgentTable] = None):
+        # Estado físico en una fila de la tabla de agentes (propia si no se comparte)
+        (agents if agents is not None else AgentTable()).add(self, start_pos)
         self.position: Tuple[int, int] = start_pos
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
         self.max_weight: float = max_weight
         self.current_load: float = 0.0
         self.inventory: Inventory = Inventory(max_weight)
@@ -45,7 +57,7 @@ class Courier:
 
     def deliver_job(self, job: Job) -> dict:
         """Registra la entrega y devuelve datos utiles para puntaje."""
-        now = time.time()
+        now = self.clock.now()
         deadline_ts = job.get_deadline_timestamp()
         delta = None if deadline_ts is None else deadline_ts - now
         lateness_seconds = 0.0 if delta is None or delta >= 0 else -delta
@@ -104,7 +116,7 @@ class Courier:
         else:
             nx, ny = dx, dy
 
-        if 0 <= nx < width and 0 <= ny < height and not cmap.is_blocked(nx, ny):
+        if 0 <= nx < width and 0 <= ny < height and cmap.is_walkable(nx, ny):
             self.move_to((nx, ny))
 
     def move_to(self, position: Tuple[int, int]) -> None:
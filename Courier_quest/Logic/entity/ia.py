@@ -1,9 +1,15 @@
 
-import time
 from typing import Tuple, List, Optional
+from Logic.clock import Clock, SYSTEM_CLOCK
+from Logic.agent_table import AgentTable, AgentColumn, AgentPosition
 from Logic.entity.job import Job
 from Logic.entity.inventory import Inventory
 from Logic.entity.city_map import CityMap
+from Logic.distance_field import DistanceFieldCache
+from Logic.pathfinder import PathFinder
+from Logic.incremental_planner import IncrementalPlanner
+from Logic.route_optimizer import RouteOptimizer
+from Logic.ia_strategy import STRATEGIES, IaStrategy
 import random
 
 class Ia:
@@ -13,8 +19,24 @@ class Ia:
         - resistencia (energía), carga, inventario y entregas
     """
 
-    def __init__(self, start_pos: Tuple[int, int], max_weight: float, city_map=None):
+    position = AgentPosition()
+    stamina = AgentColumn("stamina")
+    stamina_max = AgentColumn("stamina_max")
+    current_load = AgentColumn("load")
+    reputation = AgentColumn("reputation", int)
+    exhausted_lock = AgentColumn("exhausted", bool)
+
+    def __init__(self, start_pos: Tuple[int, int], max_weight: float, city_map=None,
+                 distance_fields: Optional[DistanceFieldCache] = None,
+                 pathfinder: Optional[PathFinder] = None,
+                 planner: Optional[IncrementalPlanner] = None,
+                 route_optimizer: Optional[RouteOptimizer] = None,
+                 clock: Optional[Clock] = None,
+                 agents: Optional[AgentTable] = None):
+        # Estado físico en una fila de la tabla de agentes (propia si no se comparte)
+        (agents if agents is not None else AgentTable()).add(self, start_pos)
         self.position: Tuple[int, int] = start_pos
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
         self.max_weight: float = max_weight
         self.current_load: float = 0.0
         self.inventory: Inventory = Inventory(max_weight)
@@ -27,8 +49,21 @@ class Ia:
         self.first_late_penalty_reduced = False  # control de tardanza reducida
         self.defeat_reason: Optional[str] = None  # motivo de derrota si ocurre
         self.mode_deliver = None
+        self.strategy: Optional[IaStrategy] = None
         self.prev = None
         self.city_map=city_map
+        if distance_fields is None and city_map is not None:
+            distance_fields = DistanceFieldCache(city_map)
+        self.distance_fields = distance_fields
+        if pathfinder is None and city_map is not None:
+            pathfinder = PathFinder(city_map)
+        self.pathfinder = pathfinder
+        # Planificador incremental propio: repara la ruta ante cambios
+        self.planner = planner
+        # Orden de recogidas y entregas (lo usa la estrategia difícil)
+        self.route_optimizer = route_optimizer
+        # Reparto central de pedidos cuando hay varias IAs (lo asigna GameService)
+        self.dispatcher = None
 
         # Resistencia
         self.stamina_max: float = 100.0
@@ -47,7 +82,7 @@ class Ia:
 
     def deliver_job(self, job: Job) -> dict:
         """Registra la entrega y devuelve datos utiles para puntaje."""
-        now = time.time()
+        now = self.clock.now()
         deadline_ts = job.get_deadline_timestamp()
         delta = None if deadline_ts is None else deadline_ts - now
         lateness_seconds = 0.0 if delta is None or delta >= 0 else -delta
@@ -107,7 +142,7 @@ class Ia:
         else:
             nx, ny = dx, dy
 
-        if 0 <= nx < width and 0 <= ny < height and not cmap.is_blocked(nx, ny):
+        if 0 <= nx < width and 0 <= ny < height and cmap.is_walkable(nx, ny):
             self.move_to((nx, ny))
 
     def move_to(self, position: Tuple[int, int]) -> None:
@@ -197,221 +232,47 @@ class Ia:
         return False
     
     def _is_valid_position(self, x, y):
-        """Verifica si (x,y) es una calle ('C') y no edificio."""
-        if 0 <= x < 29 and 0 <= y < 29 and self.city_map is not None:
-            try:
-                if hasattr(self.city_map, 'tiles'):
-                    return self.city_map.tiles[y][x] == 'C'
-                elif hasattr(self.city_map, 'get_tile'):
-                    return self.city_map.get_tile(x, y) == 'C'
-                else:
-                    return self.city_map[y][x] == 'C'
-            except Exception:
-                return False
-        return False
+        """
+        Verifica si (x,y) esta dentro del mapa y es transitable. La IA usa la
+        misma regla que el courier y que el motor de rutas compartido: toda
+        celda que la leyenda no bloquea (calles y parques).
+        """
+        if self.city_map is None:
+            return False
+        return self.city_map.is_walkable(x, y)
 
     
     def next_movement_ia(self, jobs, city_map=None):
-        options = (
-            self.easy_mode(jobs, city_map),
-            self.medium_mode(jobs, city_map),
-            self.hard_mode(jobs, city_map)
-        )
-
-        ret = [None, None]
-
-        if self.mode_deliver == 1:
-            ret[0] = self.obtain_movement(options[0])
-            ret[1] = options[0]
-        elif self.mode_deliver == 2:
-            ret[0] = self.obtain_movement(options[1])
-            ret[1] = options[1]
-        elif self.mode_deliver == 3:
-            ret[0] = self.obtain_movement(options[2])
-            ret[1] = options[2]
-
-        return ret
-    
+        """
+        Calcula solo la estrategia activa y devuelve [direccion, posicion].
+        La estrategia sigue su plan cacheado; no replanea en cada frame.
+        """
+        if self.strategy is None:
+            return [None, None]
+
+        nxt = self.strategy.next_position(jobs, city_map)
+        return [self.obtain_movement(nxt), nxt]
+
     def set_mode(self,mode):
         """
         cambia el modo de busqueda del pedido
         """
         self.mode_deliver = mode
+        strategy_cls = STRATEGIES.get(mode)
+        self.strategy = strategy_cls(self) if strategy_cls else None
         return
 
-    def easy_mode(self, jobs, city_map=None):
-        current_x, current_y = self.position
-
-        job = None
-        if jobs:
-            job = self.prev if self.prev else random.choice(jobs)
-
-        target = None
-        if job:
-            if job in self.inventory.get_all():
-                target = getattr(job, "dropoff_position", None) or getattr(job, "dropoff", None)
-            else:
-                target = getattr(job, "pickup_position", None) or getattr(job, "pickup", None)
-
-        # Movimiento dirigido
-        if target:
-            tx, ty = target
-            dx = 1 if tx > current_x else -1 if tx < current_x else 0
-            dy = 1 if ty > current_y else -1 if ty < current_y else 0
-
-            if random.random() < 0.9:
-                nx, ny = current_x + dx, current_y + dy
-                if self._is_valid_position(nx, ny) and (nx, ny) != self.prev:
-                    return (nx, ny)
-
-        # Movimiento aleatorio seguro
-        directions = [(-1,0),(1,0),(0,-1),(0,1)]
-        random.shuffle(directions)
-
-        for dx, dy in directions:
-            nx, ny = current_x + dx, current_y + dy
-            if self._is_valid_position(nx, ny) and (nx, ny) != self.prev:
-                return (nx, ny)
-
-        return (current_x, current_y)
-
-    def medium_mode(self, jobs, city_map=None):
-        current_x, current_y = self.position
-
-        if not jobs:
-            return self.easy_mode(jobs, city_map)
-
-        best = None
-        best_dist = float("inf")
-
-        for job in jobs:
-            if job in self.inventory.get_all():
-                tx, ty = getattr(job, "dropoff_position", None) or getattr(job, "dropoff", None)
-            else:
-                tx, ty = getattr(job, "pickup_position", None) or getattr(job, "pickup", None)
-
-            if tx is None or ty is None:
-                continue
-
-            d = abs(tx - current_x) + abs(ty - current_y)
-            if d < best_dist:
-                best = (tx, ty)
-                best_dist = d
-
-        if best is None:
-            return self.easy_mode(jobs, city_map)
-
-        tx, ty = best
-
-        candidates = []
-        if tx > current_x: candidates.append((current_x+1, current_y))
-        if tx < current_x: candidates.append((current_x-1, current_y))
-        if ty > current_y: candidates.append((current_x, current_y+1))
-        if ty < current_y: candidates.append((current_x, current_y-1))
-
-        # Elegir candidato válido
-        for nx, ny in candidates:
-            if self._is_valid_position(nx, ny) and (nx, ny) != self.prev:
-                return (nx, ny)
-
-        return self.easy_mode(jobs, city_map)
-
-    def hard_mode(self, jobs, city_map=None):
-        current = self.position
-
-        # Seleccionar job objetivo
-        if self.prev:
-            target_job = self.prev
-        else:
-            target_job = None
-            best_dist = float("inf")
-            for job in jobs:
-                if job in self.inventory.get_all():
-                    tx, ty = getattr(job, "dropoff_position", None) or getattr(job, "dropoff", None)
-                else:
-                    tx, ty = getattr(job, "pickup_position", None) or getattr(job, "pickup", None)
-
-                if tx is None or ty is None: continue
-
-                d = abs(tx - current[0]) + abs(ty - current[1])
-                if d < best_dist:
-                    best_dist = d
-                    target_job = job
-
-        if not target_job:
-            return self.medium_mode(jobs, city_map)
-
-        if target_job in self.inventory.get_all():
-            target = getattr(target_job, "dropoff_position", None) or getattr(target_job, "dropoff", None)
-        else:
-            target = getattr(target_job, "pickup_position", None) or getattr(target_job, "pickup", None)
-
-        if not target:
-            return self.medium_mode(jobs, city_map)
-
-        if city_map is None:
-            return self.medium_mode(jobs, city_map)
-
-        # A*
-        path = self.astar(start=current, goal=target, city_map=city_map)
-
-        if path and len(path) >= 2:
-            nxt = path[1]
-            if nxt == self.prev and len(path) >= 3:
-                nxt = path[2]
-
-            if self._is_valid_position(nxt[0], nxt[1]):
-                return nxt
-
-        return self.medium_mode(jobs, city_map)
-
-    # ---------- utilidades para hard_mode ----------
-    def _neighbors(self, node, city_map):
-        x, y = node
-        cand = [(x-1,y),(x+1,y),(x,y-1),(x,y+1)]
-        valid = []
-
-        for nx, ny in cand:
-            if self._is_valid_position(nx, ny):
-                valid.append((nx, ny))
-
-        return valid
-
-
-    def astar(self, start, goal, city_map, max_nodes=6000):
-        import heapq
-
-        def h(a, b): return abs(a[0]-b[0]) + abs(a[1]-b[1])
-
-        open_heap = []
-        heapq.heappush(open_heap, (0, start))
-        came_from = {start: None}
-        g = {start: 0}
-
-        processed = 0
-
-        while open_heap and processed < max_nodes:
-            _, current = heapq.heappop(open_heap)
-            processed += 1
-
-            if current == goal:
-                path = []
-                c = current
-                while c:
-                    path.append(c)
-                    c = came_from[c]
-                path.reverse()
-                return path
-
-            for nb in self._neighbors(current, city_map):
-                tentative = g[current] + 1
-                if tentative < g.get(nb, float("inf")):
-                    came_from[nb] = current
-                    g[nb] = tentative
-                    f = tentative + h(nb, goal)
-                    heapq.heappush(open_heap, (f, nb))
-
-        return None
+    # ---------- utilidades de busqueda ----------
+    def astar(self, start, goal, city_map=None, max_nodes=6000):
+        """
+        Ruta con el motor compartido de Logic.pathfinder, acotada a
+        max_nodes expansiones. Devuelve la lista de celdas o None si no hay
+        ruta o se agota el presupuesto.
+        """
+        if self.pathfinder is None:
+            return None
+        path = self.pathfinder.find_path(start, goal, max_expansions=max_nodes)
+        return path or None
 
 
     def obtain_movement(self, other):
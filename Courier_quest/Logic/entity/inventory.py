@@ -1,7 +1,7 @@
 # src/models/inventory.py
 
-from typing import List, Optional
-import heapq
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
 from Logic.entity.job import Job
 import random
 
@@ -11,17 +11,32 @@ class Node:
         self.job = job
         self.prev: Optional["Node"] = None
         self.next: Optional["Node"] = None
+        self.priority_entry: Optional[tuple] = None  # entrada en la vista por prioridad
+        self.deadline_entry: Optional[tuple] = None  # entrada en la vista por deadline
 
 class Inventory:
     """
     Almacena pedidos aceptados y controla
     capacidad máxima de carga.
+
+    Además de la lista enlazada mantiene un índice id(job) -> nodo, el peso
+    total acumulado y dos vistas ordenadas que se actualizan con bisect en
+    cada alta o baja: por prioridad (que además es la cola de entrega) y
+    por deadline. ``get_all`` y ``ordered_jobs`` devuelven tuplas
+    inmutables que se reutilizan hasta la siguiente alta o baja.
     """
     def __init__(self, max_weight: float):
         self.max_weight = max_weight
         self.head: Optional[Node] = None
         self.tail: Optional[Node] = None
-        self._heap = []  # cola de prioridad
+        self._by_priority: List[tuple] = []  # (-prioridad, deadline, secuencia, nodo)
+        self._by_deadline: List[tuple] = []  # (deadline, secuencia, nodo)
+        self._nodes: Dict[int, Node] = {}  # id(job) -> nodo vivo
+        self._weight = 0.0
+        self._seq = 0  # desempate estable entre pedidos con la misma clave
+        self._snapshot: Optional[Tuple[Job, ...]] = None
+        self._views: Dict[str, Tuple[Job, ...]] = {}
+        self.version = 0  # cambia con cada alta o baja de pedidos
 
     # -------------------------
     # Métodos internos
@@ -30,24 +45,46 @@ class Inventory:
         deadline_ts = job.get_deadline_timestamp() if hasattr(job, "get_deadline_timestamp") else None
         return deadline_ts if deadline_ts is not None else float("inf")
 
+    def _changed(self) -> None:
+        self._snapshot = None
+        self._views = {}
+        self.version += 1
+
+    def _unlink(self, node: Node) -> None:
+        """Desconecta node de la lista, del índice y de las vistas ordenadas."""
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+
+        # La secuencia es única, así la búsqueda nunca compara nodos distintos
+        for view, entry in ((self._by_priority, node.priority_entry), (self._by_deadline, node.deadline_entry)):
+            i = bisect_left(view, entry)
+            if i < len(view) and view[i] is entry:
+                del view[i]
+
+        del self._nodes[id(node.job)]
+        self._weight = self._weight - node.job.weight if self._nodes else 0.0
+        self._changed()
+
     def total_weight(self) -> float:
-        total = 0
-        current = self.head
-        while current:
-            total += current.job.weight
-            current = current.next
-        return total
+        return self._weight
 
     def can_add(self, job : Job) -> bool:
-        return self.total_weight() + job.weight <= self.max_weight
+        return self._weight + job.weight <= self.max_weight
 
     # -------------------------
     # Operaciones principales
     # -------------------------
-    
+
     def add_job(self, job : Job) -> bool:
-        """Agrega un nuevo trabajo al final de la lista."""
-        if not self.can_add(job):
+        """Agrega un nuevo trabajo al final de la lista (un mismo pedido no se repite)."""
+        if self.exist(job) or not self.can_add(job):
             return False
 
         new_node = Node(job)
@@ -58,78 +95,88 @@ class Inventory:
             new_node.prev = self.tail
             self.tail = new_node
 
-        heapq.heappush(self._heap, (-job.priority, self._deadline_key(job), job))
+        self._nodes[id(job)] = new_node
+        self._weight += job.weight
+        self._seq += 1
+        deadline = self._deadline_key(job)
+        new_node.priority_entry = (-job.priority, deadline, self._seq, new_node)
+        new_node.deadline_entry = (deadline, self._seq, new_node)
+        insort(self._by_priority, new_node.priority_entry)
+        insort(self._by_deadline, new_node.deadline_entry)
+        self._changed()
         return True
 
     def remove_job(self, job : Job) -> bool:
-        """Elimina un trabajo de la lista y del heap."""
-        current = self.head
-        while current:
-            if current.job == job:
-                # desconectar el nodo
-                if current.prev:
-                    current.prev.next = current.next
-                else:
-                    self.head = current.next
-                if current.next:
-                    current.next.prev = current.prev
-                else:
-                    self.tail = current.prev
-
-                # remover del heap
-                self._heap = [entry for entry in self._heap if entry[2] != job]
-                heapq.heapify(self._heap)
-                return True
-            current = current.next
-        return False
-
-    def get_all(self) -> List:
-        """Devuelve una lista con todos los jobs en orden."""
-        jobs = []
-        current = self.head
-        while current:
-            jobs.append(current.job)
-            current = current.next
-        return jobs
+        """Elimina un trabajo de la lista y de las vistas ordenadas."""
+        node = self._nodes.get(id(job))
+        if node is None or node.job is not job:
+            return False
+        self._unlink(node)
+        return True
+
+    def clear(self) -> None:
+        """Vacía el inventario."""
+        self.head = self.tail = None
+        self._by_priority = []
+        self._by_deadline = []
+        self._nodes = {}
+        self._weight = 0.0
+        self._changed()
+
+    def get_all(self) -> Tuple[Job, ...]:
+        """Devuelve una tupla con todos los jobs en orden (se reutiliza hasta el próximo cambio)."""
+        if self._snapshot is None:
+            jobs = []
+            current = self.head
+            while current:
+                jobs.append(current.job)
+                current = current.next
+            self._snapshot = tuple(jobs)
+        return self._snapshot
+
+    @property
+    def items(self) -> Tuple[Job, ...]:
+        return self.get_all()
 
     def exist(self, job : Job) -> bool:
         """Devuelve True si el trabajo está en la lista."""
-        current = self.head
-        while current:
-            if current.job == job:
-                return True
-            current = current.next
-        return False
+        node = self._nodes.get(id(job))
+        return node is not None and node.job is job
 
     def peek_next(self):
         """Devuelve el siguiente job en la cola de prioridad sin eliminarlo."""
-        return self._heap[0][2] if self._heap else None
+        return self._by_priority[0][3].job if self._by_priority else None
 
     def pop_next(self):
         """Saca y devuelve el siguiente job según la cola de prioridad."""
-        if not self._heap:
+        if not self._by_priority:
             return None
-        _, _, job = heapq.heappop(self._heap)
-        self.remove_job(job)
-        return job
-    
+        node = self._by_priority[0][3]
+        self._unlink(node)
+        return node.job
+
     def random_job(self) -> Optional[Job]:
        jobs = self.get_all()
        if not jobs:
             return None
        return random.choice(jobs)
-        
-    def ordered_jobs(self, order_by: str = "priority") -> List[Job]:
+
+    def ordered_jobs(self, order_by: str = "priority") -> Tuple[Job, ...]:
         """
         Devuelve los jobs ordenados según el criterio especificado.
         order_by: "priority" o "deadline"
+        Las vistas se mantienen ordenadas en cada cambio; la tupla se
+        reutiliza hasta la siguiente alta o baja.
         """
-        jobs = self.get_all()  # obtener todos los jobs en la lista
-        if order_by == "priority":
-            # mayor prioridad primero
-            return sorted(jobs, key=lambda job: (-job.priority, self._deadline_key(job)))
-        elif order_by == "deadline":
-            # fecha de entrega más cercana primero
-            return sorted(jobs, key=lambda job: self._deadline_key(job))
-        else:
-            raise ValueError(f"Ordenamiento no soportado: {order_by}")
\ No newline at end of file
+        view = self._views.get(order_by)
+        if view is None:
+            if order_by == "priority":
+                # mayor prioridad primero
+                view = tuple(entry[3].job for entry in self._by_priority)
+            elif order_by == "deadline":
+                # fecha de entrega más cercana primero
+                view = tuple(entry[2].job for entry in self._by_deadline)
+            else:
+                raise ValueError(f"Ordenamiento no soportado: {order_by}")
+            self._views[order_by] = view
+        return view
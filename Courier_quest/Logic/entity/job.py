@@ -1,15 +1,141 @@
 from __future__ import annotations
 
-import time
 from datetime import datetime, timezone
-from typing import Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from Logic.clock import Clock, SYSTEM_CLOCK
 
 DeadlineInput = Union[str, int, float]
+DeadlineFields = Tuple[Optional[datetime], Optional[float]]
+
+_FALLBACK_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%H:%M:%S",
+    "%H:%M",
+)
+_NO_DEADLINE: DeadlineFields = (None, None)
+
+# Memo de textos de deadline ya parseados -> (datetime UTC, segundos desde medianoche).
+# No guarda los formatos de solo hora, que dependen del día actual.
+_deadline_memo: Dict[str, DeadlineFields] = {}
+_DEADLINE_MEMO_LIMIT = 8192
+
+
+def _parse_api_deadline(text: str) -> Optional[DeadlineFields]:
+    """
+    Ruta rápida para la forma que envía la API, ``YYYY-MM-DDTHH:MMZ``
+    (o con segundos): fromisoformat directo y el offset sale de los campos
+    de hora. Devuelve None si text no tiene esa forma.
+    """
+    n = len(text)
+    if (n != 17 and n != 20) or text[-1] != "Z" or text[10] != "T":
+        return None
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        # Formato inválido, o Python < 3.11 que no acepta "Z": ruta general
+        return None
+    return dt, float(dt.hour * 3600 + dt.minute * 60 + dt.second)
+
+
+def _parse_deadline_text(text: str) -> Tuple[Optional[datetime], bool]:
+    """Ruta general: fromisoformat y luego los formatos alternativos. Indica si es cacheable."""
+    iso = text[:-1] + "+00:00" if text.endswith("Z") else text
+    try:
+        dt = datetime.fromisoformat(iso)
+    except ValueError:
+        for fmt in _FALLBACK_FORMATS:
+            try:
+                parsed = datetime.strptime(iso, fmt)
+            except ValueError:
+                continue
+            time_only = fmt.startswith("%H")
+            if time_only:
+                today = datetime.now(timezone.utc)
+                parsed = parsed.replace(
+                    year=today.year,
+                    month=today.month,
+                    day=today.day,
+                )
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.astimezone(timezone.utc), not time_only
+        return None, True
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc), True
+
+
+def _offset_of(dt: Optional[datetime]) -> Optional[float]:
+    if dt is None:
+        return None
+    base = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    return (dt - base).total_seconds()
+
+
+def deadline_fields(value: DeadlineInput | None, fast: bool = True) -> DeadlineFields:
+    """
+    (datetime UTC, segundos desde medianoche) de un deadline en texto;
+    (None, None) si no es texto o no se reconoce. Los textos repetidos
+    salen de la memo.
+    """
+    if not isinstance(value, str):
+        return _NO_DEADLINE
+    fields = _deadline_memo.get(value)
+    if fields is not None:
+        return fields
+    text = value.strip()
+    if not text:
+        return _NO_DEADLINE
+    fields = _parse_api_deadline(text) if fast else None
+    cacheable = True
+    if fields is None:
+        dt, cacheable = _parse_deadline_text(text)
+        fields = (dt, _offset_of(dt)) if dt is not None else _NO_DEADLINE
+    if cacheable:
+        if len(_deadline_memo) >= _DEADLINE_MEMO_LIMIT:
+            _deadline_memo.clear()
+        _deadline_memo[value] = fields
+    return fields
+
+
+def parse_deadlines(values: Iterable[DeadlineInput | None]) -> List[DeadlineFields]:
+    """
+    Parsea los deadlines de un feed completo. El formato se detecta una
+    vez con el primer texto: si es el de la API se usa la ruta rápida para
+    todos (con la general como respaldo); si no, se va directo a la general.
+    """
+    values = list(values)
+    first = next((v.strip() for v in values if isinstance(v, str) and v.strip()), None)
+    fast = first is not None and _parse_api_deadline(first) is not None
+    return [deadline_fields(value, fast) for value in values]
 
 
 class Job:
     """Representa un pedido con origen, destino, pago y restricciones."""
 
+    # Sin __dict__ por instancia: los feeds grandes tienen miles de pedidos
+    __slots__ = (
+        "id",
+        "pickup",
+        "dropoff",
+        "payout",
+        "weight",
+        "priority",
+        "release_time",
+        "deadline_raw",
+        "deadline",
+        "_created_epoch",
+        "_clock",
+        "_session_start",
+        "_deadline_dt",
+        "_deadline_offset",
+        "_deadline_timestamp",
+        "_release_timestamp",
+        "_total_duration_cache",
+    )
+
     def __init__(
         self,
         id: str,
@@ -20,6 +146,9 @@ class Job:
         weight: float,
         priority: int,
         release_time: Optional[Union[int, float]] = None,
+        clock: Optional[Clock] = None,
+        *,
+        _deadline_fields: Optional[DeadlineFields] = None,
     ):
         self.id = id
         self.pickup = tuple(pickup)
@@ -31,14 +160,68 @@ class Job:
         self.deadline_raw = deadline
         self.deadline = self._format_deadline_display(deadline)
 
-        self._created_epoch: float = time.time()
+        self._clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self._created_epoch: float = self._clock.now()
         self._session_start: Optional[float] = None
-        self._deadline_dt: Optional[datetime] = self._parse_deadline(deadline)
-        self._deadline_offset: Optional[float] = self._calculate_deadline_offset(self._deadline_dt)
+        self._deadline_dt: Optional[datetime]
+        self._deadline_offset: Optional[float]
+        # from_dicts ya los trae parseados con el formato detectado para el feed
+        self._deadline_dt, self._deadline_offset = (
+            _deadline_fields if _deadline_fields is not None else deadline_fields(deadline))
         self._deadline_timestamp: Optional[float] = None
         self._release_timestamp: Optional[float] = None
         self._total_duration_cache: Optional[float] = None
 
+    @classmethod
+    def from_dicts(cls, raw_jobs: Iterable[dict], clock: Optional[Clock] = None) -> List["Job"]:
+        """Crea los pedidos de un feed parseando todos sus deadlines de una vez."""
+        raw_jobs = list(raw_jobs)
+        fields = parse_deadlines(raw.get("deadline") for raw in raw_jobs)
+        return [cls(**raw, clock=clock, _deadline_fields=parsed) for raw, parsed in zip(raw_jobs, fields)]
+
+    @staticmethod
+    def signature_of(raw: dict) -> tuple:
+        """Campos de un pedido crudo del feed, comparables con ``feed_signature``."""
+        return (
+            tuple(raw["pickup"]),
+            tuple(raw["dropoff"]),
+            raw["payout"],
+            raw["deadline"],
+            raw["weight"],
+            raw["priority"],
+            raw.get("release_time"),
+        )
+
+    def feed_signature(self) -> tuple:
+        return (
+            self.pickup,
+            self.dropoff,
+            self.payout,
+            self.deadline_raw,
+            self.weight,
+            self.priority,
+            self.release_time,
+        )
+
+    def update_from(self, raw: dict) -> None:
+        """Aplica en el lugar los campos de un feed nuevo para este mismo pedido."""
+        self.pickup = tuple(raw["pickup"])
+        self.dropoff = tuple(raw["dropoff"])
+        self.payout = raw["payout"]
+        self.weight = raw["weight"]
+        self.priority = raw["priority"]
+        self.release_time = raw.get("release_time")
+        deadline = raw["deadline"]
+        if deadline != self.deadline_raw:
+            self.deadline_raw = deadline
+            self.deadline = self._format_deadline_display(deadline)
+            self._deadline_dt, self._deadline_offset = deadline_fields(deadline)
+        self._deadline_timestamp = None
+        self._release_timestamp = None
+        self._total_duration_cache = None
+        if self._session_start is not None:
+            self.bind_session_start(self._session_start)
+
     def _format_deadline_display(self, value: DeadlineInput | None) -> str:
         if value is None:
             return ""
@@ -47,48 +230,10 @@ class Job:
         return str(value)
 
     def _parse_deadline(self, value: DeadlineInput | None) -> Optional[datetime]:
-        if not isinstance(value, str):
-            return None
-        text = value.strip()
-        if not text:
-            return None
-        if text.endswith("Z"):
-            text = text[:-1] + "+00:00"
-        try:
-            dt = datetime.fromisoformat(text)
-        except ValueError:
-            formats = (
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%d %H:%M",
-                "%H:%M:%S",
-                "%H:%M",
-            )
-            for fmt in formats:
-                try:
-                    parsed = datetime.strptime(text, fmt)
-                except ValueError:
-                    continue
-                if fmt.startswith("%H"):
-                    today = datetime.now(timezone.utc)
-                    parsed = parsed.replace(
-                        year=today.year,
-                        month=today.month,
-                        day=today.day,
-                    )
-                if parsed.tzinfo is None:
-                    parsed = parsed.replace(tzinfo=timezone.utc)
-                return parsed.astimezone(timezone.utc)
-            return None
-        else:
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
+        return deadline_fields(value)[0]
 
     def _calculate_deadline_offset(self, deadline_dt: Optional[datetime]) -> Optional[float]:
-        if deadline_dt is None:
-            return None
-        base = deadline_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        return (deadline_dt - base).total_seconds()
+        return _offset_of(deadline_dt)
 
     def _to_float(self, value: DeadlineInput | None) -> Optional[float]:
         if value is None:
@@ -123,8 +268,10 @@ class Job:
             return None
         return session_start + offset
 
-    def bind_session_start(self, session_start: float) -> None:
+    def bind_session_start(self, session_start: float, clock: Optional[Clock] = None) -> None:
         """Vincula el pedido a un reloj de partida y recalcula tiempos absolutos."""
+        if clock is not None:
+            self._clock = clock
         self._session_start = session_start
         self._deadline_timestamp = self._compute_deadline_timestamp()
         self._release_timestamp = self._compute_release_timestamp()
@@ -150,7 +297,7 @@ class Job:
         deadline_ts = self.get_deadline_timestamp()
         if deadline_ts is None:
             return None
-        ref = reference_time if reference_time is not None else time.time()
+        ref = reference_time if reference_time is not None else self._clock.now()
         return deadline_ts - ref
 
     def get_total_duration(self) -> float:
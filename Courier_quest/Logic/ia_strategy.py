@@ -0,0 +1,281 @@
+# Logic/ia_strategy.py
+import heapq
+import random
+from typing import List, Optional, Tuple
+
+Position = Tuple[int, int]
+
+# Expansiones de D* Lite por plan (como el presupuesto de Ia.astar); si no
+# alcanzan, el plan sale del campo de distancias y D* sigue en el próximo
+PLANNER_BUDGET = 6000
+
+
+class IaStrategy:
+    """
+    Estrategia base de movimiento de la IA.
+
+    Elige un pedido objetivo, guarda un plan (camino completo hasta el
+    objetivo) y lo sigue paso a paso. Solo se vuelve a planear cuando cambia
+    el objetivo, el mapa (``city_map.version``) o el inventario de la IA
+    (``inventory.version``), o si la IA quedó fuera del plan.
+    """
+
+    def __init__(self, ia):
+        self.ia = ia
+        self.target_job = None
+        self.target: Optional[Position] = None
+        self.plan: List[Position] = []
+        self._cursor = 0
+        self._plan_key = None
+        self._selection_key = None
+
+    # -------------------------
+    # API pública
+    # -------------------------
+    def next_position(self, jobs, city_map=None) -> Optional[Position]:
+        """Devuelve la siguiente celda a la que debe moverse la IA."""
+        ia = self.ia
+        cmap = city_map if city_map is not None else ia.city_map
+        job = self._current_job(jobs)
+        target = self._target_for(job) if job is not None else None
+
+        if target is None:
+            return self._fallback_step()
+
+        plan_key = (target, getattr(cmap, "version", None), ia.inventory.version)
+        if plan_key != self._plan_key or not self._sync_cursor():
+            self.target_job = job
+            self.target = target
+            self.plan = self.build_plan(ia.position, target, cmap)
+            self._cursor = 0
+            self._plan_key = plan_key
+
+        if self._cursor + 1 < len(self.plan):
+            nxt = self.plan[self._cursor + 1]
+            if ia._is_valid_position(nxt[0], nxt[1]):
+                return nxt
+            # El objetivo puede estar dentro de un edificio: ya está al lado
+            if nxt == self.target:
+                return None
+        return self._fallback_step()
+
+    def invalidate(self) -> None:
+        """Obliga a elegir objetivo y planear de nuevo en la próxima llamada."""
+        self._plan_key = None
+        self._selection_key = None
+        self.target_job = None
+
+    # -------------------------
+    # Puntos de extensión
+    # -------------------------
+    def select_job(self, jobs):
+        """Elige el pedido objetivo entre los disponibles."""
+        raise NotImplementedError
+
+    def build_plan(self, start: Position, target: Position, city_map) -> List[Position]:
+        """Camino completo desde start hasta target (start incluido)."""
+        return self._greedy_plan(start, target)
+
+    def _fallback_step(self) -> Optional[Position]:
+        return self._random_step()
+
+    # -------------------------
+    # Helpers
+    # -------------------------
+    def _current_job(self, jobs):
+        ia = self.ia
+        # Solo se puede entregar el pedido al frente de la cola de prioridad
+        carried = ia.inventory.peek_next()
+        if carried is not None:
+            return carried
+        if ia.prev:
+            return ia.prev
+        # Con varias IAs el pickup lo decide el reparto central
+        if getattr(ia, "dispatcher", None) is not None:
+            return ia.dispatcher.assignment_for(ia)
+        if not jobs:
+            return None
+
+        # La selección solo se repite cuando cambian pedidos o inventario
+        selection_key = (id(jobs), len(jobs), ia.inventory.version)
+        job = self.target_job
+        if selection_key != self._selection_key or job is None:
+            job = self.select_job(jobs)
+            self._selection_key = selection_key
+            self.target_job = job
+        return job
+
+    def _target_for(self, job) -> Optional[Position]:
+        if self.ia.inventory.exist(job):
+            target = getattr(job, "dropoff_position", None) or getattr(job, "dropoff", None)
+        else:
+            target = getattr(job, "pickup_position", None) or getattr(job, "pickup", None)
+        if target is None:
+            return None
+        return int(target[0]), int(target[1])
+
+    def _target_distance(self, job, position: Position) -> Optional[int]:
+        target = self._target_for(job)
+        if target is None:
+            return None
+        return abs(target[0] - position[0]) + abs(target[1] - position[1])
+
+    def _nearest_job(self, jobs):
+        position = self.ia.position
+        best = None
+        best_dist = float("inf")
+        for job in jobs:
+            d = self._target_distance(job, position)
+            if d is not None and d < best_dist:
+                best = job
+                best_dist = d
+        return best
+
+    def _sync_cursor(self) -> bool:
+        """Ubica la posición actual dentro del plan; False si se salió de él."""
+        position = self.ia.position
+        plan = self.plan
+        if self._cursor < len(plan) and plan[self._cursor] == position:
+            return True
+        if self._cursor + 1 < len(plan) and plan[self._cursor + 1] == position:
+            self._cursor += 1
+            return True
+        return False
+
+    def _greedy_plan(self, start: Position, target: Position) -> List[Position]:
+        """
+        Plan voraz: avanza sobre el eje x y luego el y hacia el objetivo
+        mientras la celda sea transitable. Se detiene al quedar trabado.
+        """
+        ia = self.ia
+        plan = [start]
+        cx, cy = start
+        tx, ty = target
+        for _ in range(abs(tx - cx) + abs(ty - cy)):
+            candidates = []
+            if tx > cx: candidates.append((cx + 1, cy))
+            if tx < cx: candidates.append((cx - 1, cy))
+            if ty > cy: candidates.append((cx, cy + 1))
+            if ty < cy: candidates.append((cx, cy - 1))
+
+            for nx, ny in candidates:
+                if (nx, ny) == target or ia._is_valid_position(nx, ny):
+                    cx, cy = nx, ny
+                    plan.append((cx, cy))
+                    break
+            else:
+                break
+            if (cx, cy) == target:
+                break
+        return plan
+
+    def _random_step(self) -> Optional[Position]:
+        ia = self.ia
+        current_x, current_y = ia.position
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        random.shuffle(directions)
+
+        for dx, dy in directions:
+            nx, ny = current_x + dx, current_y + dy
+            if ia._is_valid_position(nx, ny):
+                return (nx, ny)
+        return None
+
+
+class EasyStrategy(IaStrategy):
+    """Objetivo aleatorio, plan voraz y un 10% de pasos al azar."""
+
+    def select_job(self, jobs):
+        return random.choice(jobs)
+
+    def next_position(self, jobs, city_map=None) -> Optional[Position]:
+        if random.random() >= 0.9:
+            return self._random_step()
+        return super().next_position(jobs, city_map)
+
+
+class MediumStrategy(IaStrategy):
+    """Pedido más cercano (Manhattan) con plan voraz."""
+
+    def select_job(self, jobs):
+        return self._nearest_job(jobs)
+
+
+class HardStrategy(IaStrategy):
+    """
+    Pedido más cercano por costo de ruta real y ruta óptima: del
+    planificador incremental de la IA si lo tiene (repara la ruta ante
+    cambios de mapa o clima) o, si no o si agota ``PLANNER_BUDGET``, del
+    campo de distancias.
+
+    Si la IA tiene ``route_optimizer``, el objetivo es la primera parada
+    del mejor recorrido entre sus entregas y los pedidos más cercanos.
+    """
+
+    def __init__(self, ia):
+        super().__init__(ia)
+        self._candidates = []
+        self._candidates_key = None
+
+    def _current_job(self, jobs):
+        ia = self.ia
+        optimizer = getattr(ia, "route_optimizer", None)
+        if optimizer is None:
+            return super()._current_job(jobs)
+
+        # Los candidatos solo cambian con la lista de pedidos o el inventario,
+        # así el optimizador sigue mejorando el mismo problema entre frames
+        candidates_key = (id(jobs), len(jobs) if jobs else 0, ia.inventory.version)
+        if getattr(ia, "dispatcher", None) is not None:
+            assigned = ia.dispatcher.assignment_for(ia)
+            self._candidates = [assigned] if assigned is not None else []
+        elif candidates_key != self._candidates_key:
+            x, y = ia.position
+            self._candidates = heapq.nsmallest(
+                optimizer.max_candidates, jobs or (),
+                key=lambda job: abs(job.pickup[0] - x) + abs(job.pickup[1] - y))
+            self._candidates_key = candidates_key
+        tour = optimizer.update(ia.position, ia.inventory.get_all(), self._candidates, ia.max_weight)
+        stop = tour.next_stop()
+        if stop is None:
+            return super()._current_job(jobs)
+        return stop[1]
+
+    def select_job(self, jobs):
+        """Pedido con menor costo de ruta real, en una sola pasada de Dijkstra."""
+        pathfinder = self.ia.pathfinder
+        if pathfinder is None:
+            return self._nearest_job(jobs)
+        candidates = [(job, self._target_for(job)) for job in jobs]
+        candidates = [(job, target) for job, target in candidates if target is not None]
+        costs = pathfinder.distances_from(self.ia.position, [target for _, target in candidates])
+        best, best_cost = None, float("inf")
+        for (job, _), cost in zip(candidates, costs):
+            if cost is not None and cost < best_cost:
+                best, best_cost = job, cost
+        return best if best is not None else self._nearest_job(jobs)
+
+    def build_plan(self, start: Position, target: Position, city_map) -> List[Position]:
+        ia = self.ia
+        path = None
+        if getattr(ia, "planner", None) is not None:
+            path = ia.planner.plan(start, target, max_expansions=PLANNER_BUDGET)
+        if not path and ia.distance_fields is not None:
+            path = ia.distance_fields.path(start, target)
+        if not path:
+            path = ia.astar(start, target)
+        return path if path else self._greedy_plan(start, target)
+
+    def _fallback_step(self) -> Optional[Position]:
+        if self.target is not None:
+            plan = self._greedy_plan(self.ia.position, self.target)
+            if len(plan) >= 2 and self.ia._is_valid_position(*plan[1]):
+                return plan[1]
+        return self._random_step()
+
+
+STRATEGIES = {
+    1: EasyStrategy,
+    2: MediumStrategy,
+    3: HardStrategy,
+}
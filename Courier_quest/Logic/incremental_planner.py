@@ -0,0 +1,332 @@
+# Logic/incremental_planner.py
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+from Logic.entity.city_map import CityMap
+from Logic.pathfinder import INFINITY, CostModel, Position, SurfaceCost, WeatherCost
+
+Key = Tuple[float, float]
+
+
+class IncrementalPlanner:
+    """
+    Planificador incremental D* Lite para un agente.
+
+    Busca desde el objetivo hacia el agente y conserva g/rhs entre llamadas:
+    cuando el agente avanza solo se ajusta ``km`` y cuando cambian tiles o
+    el clima se reparan los vértices afectados en lugar de buscar de cero.
+
+    - Los cambios de tile llegan por ``CityMap.add_tile_listener``.
+    - Los cambios de clima llegan por
+      ``WeatherSimulator.add_condition_listener``. Si todos los costos se
+      escalan por el mismo factor (WeatherCost), se reescala el estado
+      entero sin expandir nodos; otro tipo de cambio reinicia la búsqueda.
+    - Cambiar de objetivo reinicia la búsqueda.
+
+    Como en PathFinder, el objetivo puede estar bloqueado (pickups dentro
+    de edificios) y se alcanza desde una celda vecina transitable.
+    """
+
+    def __init__(
+        self,
+        city_map: CityMap,
+        cost_model: Optional[CostModel] = None,
+        weather_simulator=None,
+    ):
+        self.city_map = city_map
+        if cost_model is None:
+            cost_model = (WeatherCost(city_map, weather_simulator)
+                          if weather_simulator is not None else SurfaceCost(city_map))
+        self.cost_model = cost_model
+        self.weather_simulator = weather_simulator
+        self.expanded = 0  # nodos expandidos en la última llamada
+        self.budget_exhausted = False
+
+        self._goal = -1
+        self._start = -1
+        self._changed_cells: Set[int] = set()
+        self._costs_stale = False
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {}
+        self._open: List[Tuple[float, float, int]] = []
+        self._open_key: Dict[int, Key] = {}
+        self._km = 0.0
+        self._last = -1
+        self._scale = 1.0
+        self._step: List[float] = []
+        self._cost_key = None
+
+        city_map.add_tile_listener(self._on_tile_changed)
+        if weather_simulator is not None and hasattr(weather_simulator, "add_condition_listener"):
+            weather_simulator.add_condition_listener(self._on_condition_changed)
+
+    def detach(self) -> None:
+        """Deja de escuchar cambios del mapa y del clima (él y su modelo de costo)."""
+        self.city_map.remove_tile_listener(self._on_tile_changed)
+        self.cost_model.detach()
+        if self.weather_simulator is not None and hasattr(self.weather_simulator, "remove_condition_listener"):
+            self.weather_simulator.remove_condition_listener(self._on_condition_changed)
+
+    # -------------------------
+    # Notificaciones
+    # -------------------------
+    def _on_tile_changed(self, x: int, y: int, dirty) -> None:
+        self._changed_cells.add(y * self.city_map.width + x)
+
+    def _on_condition_changed(self, previous: str, current: str) -> None:
+        self._costs_stale = True
+
+    # -------------------------
+    # API pública
+    # -------------------------
+    def plan(self, start: Position, goal: Position, max_expansions: Optional[int] = None) -> List[Position]:
+        """
+        Camino (x, y) de start a goal reutilizando la búsqueda anterior.
+        Devuelve lista vacía si no hay ruta o se agota el presupuesto; en
+        ese caso la próxima llamada continúa donde quedó.
+        """
+        cmap = self.city_map
+        width, height = cmap.width, cmap.height
+        sx, sy = start
+        gx, gy = goal
+        self.expanded = 0
+        self.budget_exhausted = False
+        if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+            return []
+        start_idx = sy * width + sx
+        goal_idx = gy * width + gx
+        if start_idx == goal_idx:
+            return [(sx, sy)]
+
+        if goal_idx != self._goal or len(self._step) != width * height:
+            self._initialize(start_idx, goal_idx)
+        else:
+            if start_idx != self._start:
+                # El agente avanzó: las claves viejas quedan desfasadas en km
+                self._km += self._heuristic(self._last, start_idx)
+                self._last = start_idx
+                self._start = start_idx
+            self._apply_changes()
+
+        self._compute_shortest_path(max_expansions if max_expansions is not None else -1)
+        if self.budget_exhausted or self._g.get(start_idx, INFINITY) == INFINITY:
+            return []
+        return self._extract_path()
+
+    def next_step(self, start: Position, goal: Position) -> Optional[Position]:
+        """Siguiente celda hacia goal, o None si ya llegó o no hay ruta."""
+        path = self.plan(start, goal)
+        return path[1] if len(path) >= 2 else None
+
+    # -------------------------
+    # Estado de la búsqueda
+    # -------------------------
+    def _build_step_table(self) -> List[float]:
+        costs = self.cost_model.costs()
+        blocked = self.city_map.blocked_grid
+        return [INFINITY if blocked[idx] else cost for idx, cost in enumerate(costs)]
+
+    def _initialize(self, start_idx: int, goal_idx: int) -> None:
+        self._goal = goal_idx
+        self._start = start_idx
+        self._last = start_idx
+        self._km = 0.0
+        self._g = {}
+        self._rhs = {goal_idx: 0.0}
+        self._open = []
+        self._open_key = {}
+        self._step = self._build_step_table()
+        self._scale = self.cost_model.min_cost()
+        self._cost_key = self.cost_model.cache_key()
+        self._changed_cells.clear()
+        self._costs_stale = False
+        self._push(goal_idx, (self._heuristic(start_idx, goal_idx), 0.0))
+
+    def _apply_changes(self) -> None:
+        """Repara el estado según los tiles y costos que cambiaron."""
+        key = self.cost_model.cache_key()
+        if key != self._cost_key and not self._changed_cells:
+            # Cambio de costos sin notificación (otro modelo de costo)
+            self._costs_stale = True
+        if not self._changed_cells and not self._costs_stale:
+            return
+
+        if self._costs_stale:
+            if not self._changed_cells and self._rescale(self._build_step_table()):
+                self._cost_key = key
+                self._costs_stale = False
+                return
+            self._initialize(self._start, self._goal)
+            return
+
+        if self.cost_model.min_cost() < self._scale:
+            # La heurística dejaría de ser admisible
+            self._initialize(self._start, self._goal)
+            return
+
+        costs = self.cost_model.costs()
+        blocked = self.city_map.blocked_grid
+        width, height = self.city_map.width, self.city_map.height
+        step = self._step
+        for cell in self._changed_cells:
+            step[cell] = INFINITY if blocked[cell] else costs[cell]
+        for cell in self._changed_cells:
+            y, x = divmod(cell, width)
+            self._update_vertex(cell)
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= nx < width and 0 <= ny < height:
+                    self._update_vertex(ny * width + nx)
+        self._changed_cells.clear()
+        self._cost_key = key
+
+    def _rescale(self, new_step: List[float]) -> bool:
+        """
+        Si todos los costos cambiaron por un mismo factor, escala g, rhs,
+        km y las claves abiertas por ese factor. Devuelve False si no.
+        """
+        ratio = None
+        for old, new in zip(self._step, new_step):
+            if old == INFINITY or new == INFINITY:
+                if old != new:
+                    return False
+                continue
+            r = new / old
+            if ratio is None:
+                ratio = r
+            elif abs(r - ratio) > 1e-5 * ratio:
+                return False
+        self._step = new_step
+        if ratio is None or ratio == 1.0:
+            return True
+
+        self._g = {cell: value * ratio for cell, value in self._g.items()}
+        self._rhs = {cell: value * ratio for cell, value in self._rhs.items()}
+        self._km *= ratio
+        self._scale *= ratio
+        self._open_key = {cell: (k1 * ratio, k2 * ratio) for cell, (k1, k2) in self._open_key.items()}
+        self._open = [(k1, k2, cell) for cell, (k1, k2) in self._open_key.items()]
+        heapq.heapify(self._open)
+        return True
+
+    # -------------------------
+    # D* Lite
+    # -------------------------
+    def _heuristic(self, a: int, b: int) -> float:
+        width = self.city_map.width
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        return (abs(ax - bx) + abs(ay - by)) * self._scale
+
+    def _calc_key(self, cell: int) -> Key:
+        best = min(self._g.get(cell, INFINITY), self._rhs.get(cell, INFINITY))
+        return best + self._heuristic(self._start, cell) + self._km, best
+
+    def _push(self, cell: int, key: Key) -> None:
+        self._open_key[cell] = key
+        heapq.heappush(self._open, (key[0], key[1], cell))
+
+    def _step_cost(self, cell: int) -> float:
+        """Costo de entrar a cell; el objetivo se admite aunque esté bloqueado."""
+        cost = self._step[cell]
+        if cost == INFINITY and cell == self._goal:
+            return self.cost_model.costs()[cell]
+        return cost
+
+    def _update_vertex(self, cell: int) -> None:
+        if self._step[cell] == INFINITY and cell != self._start:
+            # Nadie puede pasar por una celda bloqueada
+            self._open_key.pop(cell, None)
+            return
+        if cell != self._goal:
+            width, height = self.city_map.width, self.city_map.height
+            g = self._g
+            y, x = divmod(cell, width)
+            best = INFINITY
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= nx < width and 0 <= ny < height:
+                    nb = ny * width + nx
+                    value = self._step_cost(nb) + g.get(nb, INFINITY)
+                    if value < best:
+                        best = value
+            self._rhs[cell] = best
+        if self._g.get(cell, INFINITY) != self._rhs.get(cell, INFINITY):
+            self._push(cell, self._calc_key(cell))
+        else:
+            self._open_key.pop(cell, None)
+
+    def _predecessors(self, cell: int) -> List[int]:
+        """Celdas desde las que se puede entrar a cell."""
+        if self._step_cost(cell) == INFINITY:
+            return []
+        width, height = self.city_map.width, self.city_map.height
+        y, x = divmod(cell, width)
+        result = []
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < width and 0 <= ny < height:
+                nb = ny * width + nx
+                if self._step[nb] != INFINITY or nb == self._start:
+                    result.append(nb)
+        return result
+
+    def _compute_shortest_path(self, limit: int) -> None:
+        open_heap, open_key = self._open, self._open_key
+        g, rhs = self._g, self._rhs
+        start = self._start
+        heappop = heapq.heappop
+        expanded = 0
+
+        while open_heap:
+            k1, k2, cell = open_heap[0]
+            if open_key.get(cell) != (k1, k2):
+                heappop(open_heap)
+                continue
+            g_start = g.get(start, INFINITY)
+            if (k1, k2) >= self._calc_key(start) and rhs.get(start, INFINITY) == g_start:
+                break
+            if expanded == limit:
+                self.budget_exhausted = True
+                break
+            heappop(open_heap)
+            expanded += 1
+
+            new_key = self._calc_key(cell)
+            if (k1, k2) < new_key:
+                self._push(cell, new_key)
+                continue
+            del open_key[cell]
+            g_cell = g.get(cell, INFINITY)
+            rhs_cell = rhs.get(cell, INFINITY)
+            if g_cell > rhs_cell:
+                g[cell] = rhs_cell
+                for pred in self._predecessors(cell):
+                    self._update_vertex(pred)
+            else:
+                g[cell] = INFINITY
+                for pred in self._predecessors(cell):
+                    self._update_vertex(pred)
+                self._update_vertex(cell)
+
+        self.expanded = expanded
+
+    def _extract_path(self) -> List[Position]:
+        """Sigue al vecino con menor costo + g desde el agente al objetivo."""
+        width, height = self.city_map.width, self.city_map.height
+        g = self._g
+        cell = self._start
+        path = [(cell % width, cell // width)]
+        for _ in range(width * height):
+            if cell == self._goal:
+                return path
+            y, x = divmod(cell, width)
+            best, best_cell = INFINITY, -1
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= nx < width and 0 <= ny < height:
+                    nb = ny * width + nx
+                    value = self._step_cost(nb) + g.get(nb, INFINITY)
+                    if value < best:
+                        best, best_cell = value, nb
+            if best_cell == -1:
+                return []
+            cell = best_cell
+            path.append((cell % width, cell // width))
+        return []
@@ -0,0 +1,170 @@
+# Logic/job_table.py
+from array import array
+from itertools import compress, repeat
+from operator import add, sub
+from typing import Iterable, List, Optional, Tuple
+
+from Logic.entity.job import Job
+
+Position = Tuple[int, int]
+INFINITY = float("inf")
+# Las filas inactivas se descartan cuando pasan de la mitad de la tabla
+COMPACT_MIN_ROWS = 64
+
+
+class JobTable:
+    """
+    Tabla columnar de pedidos.
+
+    Guarda en arreglos planos (``array``) los campos de cada pedido:
+    pickup/dropoff x/y, pago, peso, prioridad y los timestamps de
+    liberación y deadline. La fila r corresponde a ``jobs[r]``;
+    ``active[r]`` marca si el pedido está disponible.
+
+    ``nearest`` trabaja columna por columna: filtra las filas activas con
+    ``itertools.compress`` y calcula las distancias con
+    ``map(columna.__getitem__, filas)`` y ``operator``, así el trabajo por
+    fila queda en C y no se toca ningún atributo de ``Job``.
+
+    Los pedidos que dejan de estar disponibles solo apagan su bit; cuando
+    las filas inactivas superan a las activas la tabla se compacta
+    (``compact``) y los índices de fila cambian.
+    """
+
+    def __init__(self, jobs: Iterable[Job] = ()):
+        self.jobs: List[Job] = []
+        self.pickup_x = array("l")
+        self.pickup_y = array("l")
+        self.dropoff_x = array("l")
+        self.dropoff_y = array("l")
+        self.payout = array("d")
+        self.weight = array("d")
+        self.priority = array("l")
+        self.release_ts = array("d")
+        self.deadline_ts = array("d")
+        self.active = bytearray()
+        self._active_count = 0
+        self._rows = {}  # id(job) -> fila
+        self.version = 0  # cambia con cada alta, cambio de disponibilidad o compactación
+        self._active_cache = None
+        for job in jobs:
+            self.append(job)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def __contains__(self, job: Job) -> bool:
+        return id(job) in self._rows
+
+    # -------------------------
+    # Altas y estado
+    # -------------------------
+    def append(self, job: Job, active: bool = False) -> int:
+        """Agrega job como fila nueva y devuelve su índice."""
+        row = self._rows.get(id(job))
+        if row is not None:
+            return row
+        row = len(self.jobs)
+        self.jobs.append(job)
+        self._rows[id(job)] = row
+        self.pickup_x.append(int(job.pickup[0]))
+        self.pickup_y.append(int(job.pickup[1]))
+        self.dropoff_x.append(int(job.dropoff[0]))
+        self.dropoff_y.append(int(job.dropoff[1]))
+        self.payout.append(float(job.payout))
+        self.weight.append(float(job.weight))
+        self.priority.append(int(job.priority))
+        release_ts = job.get_release_timestamp()
+        deadline_ts = job.get_deadline_timestamp()
+        self.release_ts.append(release_ts if release_ts is not None else -INFINITY)
+        self.deadline_ts.append(deadline_ts if deadline_ts is not None else INFINITY)
+        self.active.append(1 if active else 0)
+        self._active_count += 1 if active else 0
+        self._changed()
+        return row
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._active_cache = None
+
+    def update(self, job: Job) -> None:
+        """Reescribe la fila de job tras un cambio de sus campos."""
+        row = self._rows.get(id(job))
+        if row is None:
+            return
+        self.pickup_x[row] = int(job.pickup[0])
+        self.pickup_y[row] = int(job.pickup[1])
+        self.dropoff_x[row] = int(job.dropoff[0])
+        self.dropoff_y[row] = int(job.dropoff[1])
+        self.payout[row] = float(job.payout)
+        self.weight[row] = float(job.weight)
+        self.priority[row] = int(job.priority)
+        release_ts = job.get_release_timestamp()
+        deadline_ts = job.get_deadline_timestamp()
+        self.release_ts[row] = release_ts if release_ts is not None else -INFINITY
+        self.deadline_ts[row] = deadline_ts if deadline_ts is not None else INFINITY
+        self._changed()
+
+    def set_active(self, job: Job, active: bool) -> None:
+        row = self._rows.get(id(job))
+        flag = 1 if active else 0
+        if row is not None and self.active[row] != flag:
+            self.active[row] = flag
+            self._active_count += 1 if active else -1
+            self._changed()
+            if not active and len(self.jobs) >= COMPACT_MIN_ROWS and 2 * self._active_count < len(self.jobs):
+                self.compact()
+
+    def deactivate_all(self) -> None:
+        self.active[:] = bytes(len(self.jobs))
+        self._active_count = 0
+        self._changed()
+
+    def compact(self) -> None:
+        """Descarta las filas inactivas conservando el orden de las activas."""
+        keep = self.active_rows()
+        if len(keep) == len(self.jobs):
+            return
+        for name in ("pickup_x", "pickup_y", "dropoff_x", "dropoff_y", "payout", "weight",
+                     "priority", "release_ts", "deadline_ts"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, map(column.__getitem__, keep)))
+        self.jobs = list(map(self.jobs.__getitem__, keep))
+        self._rows = {id(job): row for row, job in enumerate(self.jobs)}
+        self.active = bytearray(b"\x01") * len(keep)
+        self._active_count = len(keep)
+        self._changed()
+
+    def active_rows(self) -> List[int]:
+        """Filas activas en orden; la lista se comparte hasta el próximo cambio."""
+        if self._active_cache is None:
+            self._active_cache = list(compress(range(len(self.jobs)), self.active))
+        return self._active_cache
+
+    # -------------------------
+    # Consultas masivas
+    # -------------------------
+    def nearest(
+        self,
+        position: Position,
+        target: str = "pickup",
+        max_distance: Optional[float] = None,
+        rows: Optional[List[int]] = None,
+    ) -> Optional[Job]:
+        """
+        Pedido activo con target ("pickup" o "dropoff") más cercano a
+        position en distancia Manhattan. Empata a favor de la fila menor.
+        """
+        if rows is None:
+            rows = self.active_rows()
+        if not rows:
+            return None
+        xs, ys = (self.pickup_x, self.pickup_y) if target == "pickup" else (self.dropoff_x, self.dropoff_y)
+        px, py = int(position[0]), int(position[1])
+        dists = list(map(add,
+                         map(abs, map(sub, map(xs.__getitem__, rows), repeat(px))),
+                         map(abs, map(sub, map(ys.__getitem__, rows), repeat(py)))))
+        best_dist = min(dists)
+        if max_distance is not None and best_dist > max_distance:
+            return None
+        return self.jobs[rows[dists.index(best_dist)]]
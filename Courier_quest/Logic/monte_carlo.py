@@ -0,0 +1,326 @@
+# Logic/monte_carlo.py
+import argparse
+import json
+import os
+import sys
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from itertools import product
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from Logic.clock import ManualClock
+from Logic.entity.city_map import CityMap
+from Logic.entity.job import Job
+from Logic.score_manager import ScoreManager
+from Logic.simulation import Simulation, PlayerInput, IDLE
+
+# Métricas por sesión que se resumen con percentiles
+METRICS = (
+    "total_points",
+    "base_income",
+    "penalty_total",
+    "time_bonus",
+    "earned",
+    "reputation",
+    "delivered",
+    "ia_earned",
+    "ia_delivered",
+    "time_spent",
+)
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class SessionSpec:
+    """
+    Una sesión del barrido: semilla, dificultad de la IA, juego de
+    parámetros y cantidad de IAs (con más de una, el reparto central les
+    asigna los pickups).
+    """
+
+    seed: int
+    ia_mode: int
+    params: str = "default"
+    ias: int = 1
+
+
+@dataclass
+class World:
+    """Datos crudos del mundo (mapa, pedidos y clima) tal como llegan de la API."""
+
+    city_map: Dict[str, Any]
+    jobs: List[Dict[str, Any]]
+    weather: Dict[str, Any]
+
+    @classmethod
+    def load(cls, api=None) -> "World":
+        """Lee el mundo de la API (o de su caché) una sola vez para todo el lote."""
+        if api is None:
+            from Data.api_service import APIService
+            api = APIService()
+        return cls(_unwrap(api.fetch("city/map")), list(api.stream("city/jobs")),
+                   _unwrap(api.fetch("city/weather")))
+
+
+def _unwrap(resp: Dict[str, Any]) -> Dict[str, Any]:
+    # Igual que controller_game._deep_unwrap
+    while isinstance(resp, dict) and isinstance(resp.get("data"), dict):
+        resp = resp["data"]
+    return resp
+
+
+def sweep(seeds: Iterable[int], ia_modes: Sequence[int] = (1, 2, 3),
+          params: Sequence[str] = ("default",), ias: int = 1) -> Iterator[SessionSpec]:
+    """Todas las combinaciones de semilla, modo de IA y juego de parámetros."""
+    for name, mode, seed in product(params, ia_modes, seeds):
+        yield SessionSpec(seed, mode, name, ias)
+
+
+# -------------------------
+# Jugador automático
+# -------------------------
+class GreedyPlayer:
+    """
+    Entradas del courier para sesiones sin jugador: lleva el pedido al
+    frente de la cola de entrega o, con el inventario vacío, va al pickup
+    disponible más cercano. Siempre intenta recoger y entregar, y se queda
+    quieto para recuperar energía cuando no puede moverse.
+
+    Solo decide en los ticks en que el courier se mueve; en el resto
+    devuelve ``IDLE`` sin tocar el mundo.
+    """
+
+    def __init__(self, simulation: Simulation):
+        self.simulation = simulation
+
+    def __iter__(self) -> "GreedyPlayer":
+        return self
+
+    def __next__(self) -> PlayerInput:
+        sim = self.simulation
+        if sim.move_timer + sim.tick < sim.move_delay:
+            return IDLE
+        courier = sim.courier
+        if not courier.can_move():
+            return IDLE
+        position = courier.position
+        game_service = sim.game_service
+        job = courier.inventory.peek_next()
+        if job is not None:
+            target = job.dropoff
+        else:
+            job = game_service.job_table.nearest(position)
+            if job is None:
+                return IDLE
+            target = job.pickup
+        nxt = game_service.next_step_towards(position, tuple(target))
+        if nxt is None:
+            return PlayerInput(pick=True, deliver=True)
+        return PlayerInput(nxt[0] - position[0], nxt[1] - position[1], pick=True, deliver=True)
+
+
+# -------------------------
+# Trabajador
+# -------------------------
+_world: Optional[World] = None
+_city_map: Optional[CityMap] = None
+_param_sets: Dict[str, Dict[str, Any]] = {}
+
+
+def _init_worker(world: World, param_sets: Dict[str, Dict[str, Any]], quiet: bool = True) -> None:
+    """Carga el mundo una vez por proceso; las sesiones solo reciben su SessionSpec."""
+    global _world, _city_map, _param_sets
+    _world = world
+    raw = world.city_map
+    _city_map = CityMap(width=raw["width"], height=raw["height"], tiles=raw["tiles"],
+                        legend=raw["legend"], goal=raw["goal"])
+    _param_sets = param_sets
+    if quiet:
+        # El puntaje y el clima imprimen cada evento
+        sys.stdout = open(os.devnull, "w")
+
+
+def run_session(spec: SessionSpec, world: Optional[World] = None,
+                param_sets: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Juega una sesión completa con reloj manual y devuelve su registro.
+
+    Un juego de parámetros puede traer ``score`` (argumentos de
+    ScoreManager), ``weather`` (claves que reemplazan las de la
+    configuración de clima) y ``simulation`` (opciones de Simulation, por
+    ejemplo ``session_duration`` o ``ia_move_delay``).
+    """
+    if world is not None:
+        _init_worker(world, param_sets or {}, quiet=False)
+    params = _param_sets.get(spec.params, {})
+    weather_config = dict(_world.weather)
+    weather_config.update(params.get("weather", {}))
+
+    clock = ManualClock()
+    sim = Simulation.create(_city_map, Job.from_dicts(_world.jobs, clock), weather_config,
+                            ia_mode=spec.ia_mode, score_manager=ScoreManager(**params.get("score", {})),
+                            clock=clock, seed=spec.seed, **params.get("simulation", {}))
+    for _ in range(spec.ias - 1):
+        sim.add_ia(mode=spec.ia_mode)
+    try:
+        stats = sim.run(GreedyPlayer(sim))
+    finally:
+        # El mapa es del proceso y sobrevive a la sesión
+        sim.close()
+    record = {
+        "seed": spec.seed,
+        "ia_mode": spec.ia_mode,
+        "params": spec.params,
+        "ias": spec.ias,
+        "reason": stats["reason"],
+        "time_spent": stats["time_spent"],
+        "earned": stats["earned"],
+        "reputation": stats["reputation"],
+        "delivered": stats["delivered"],
+        "ia_earned": sum(getattr(ia, "total_earned", 0.0) for ia in sim.ias),
+        "ia_delivered": sum(len(getattr(ia, "delivered_jobs", [])) for ia in sim.ias),
+        "ticks": sim.ticks,
+    }
+    record.update(stats["score"])
+    return record
+
+
+# -------------------------
+# Agregación
+# -------------------------
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil q (0-100) con interpolación lineal sobre values ya ordenados."""
+    if not values:
+        return float("nan")
+    pos = (len(values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+class Aggregator:
+    """
+    Resumen por grupo (juego de parámetros, modo de IA) sin guardar los
+    registros: de cada métrica se conserva solo la columna de valores en
+    un ``array('d')`` (8 bytes por sesión) y de los motivos de fin, un
+    contador.
+    """
+
+    def __init__(self):
+        self._columns: Dict[Tuple[str, int], Dict[str, array]] = {}
+        self._reasons: Dict[Tuple[str, int], Counter] = {}
+
+    def __len__(self) -> int:
+        return sum(len(columns["total_points"]) for columns in self._columns.values())
+
+    def add(self, record: Dict[str, Any]) -> None:
+        key = (record["params"], record["ia_mode"])
+        columns = self._columns.get(key)
+        if columns is None:
+            columns = self._columns[key] = {name: array("d") for name in METRICS}
+            self._reasons[key] = Counter()
+        for name in METRICS:
+            columns[name].append(float(record.get(name, 0.0)))
+        self._reasons[key][record.get("reason")] += 1
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Un resumen por grupo: sesiones, motivos de fin y media/percentiles por métrica."""
+        report = []
+        for key in sorted(self._columns):
+            columns = self._columns[key]
+            metrics = {}
+            for name in METRICS:
+                values = sorted(columns[name])
+                summary = {"mean": sum(values) / len(values), "min": values[0], "max": values[-1]}
+                for q in PERCENTILES:
+                    summary[f"p{q}"] = percentile(values, q)
+                metrics[name] = summary
+            report.append({
+                "params": key[0],
+                "ia_mode": key[1],
+                "sessions": len(columns["total_points"]),
+                "reasons": dict(self._reasons[key]),
+                "metrics": metrics,
+            })
+        return report
+
+
+def summarize(path: str) -> List[Dict[str, Any]]:
+    """Reporte agregado de un archivo de resultados (JSON Lines) ya escrito."""
+    aggregator = Aggregator()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                aggregator.add(json.loads(line))
+    return aggregator.report()
+
+
+# -------------------------
+# Lote
+# -------------------------
+def run_batch(
+    world: World,
+    specs: Iterable[SessionSpec],
+    out_path: str,
+    param_sets: Optional[Dict[str, Dict[str, Any]]] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 4,
+) -> List[Dict[str, Any]]:
+    """
+    Juega specs en un pool de procesos y escribe cada registro en out_path
+    (una línea JSON por sesión) apenas llega, en el orden en que terminan.
+    Cada proceso carga el mundo una vez y las sesiones son independientes,
+    así el lote escala con la cantidad de núcleos. Devuelve el reporte
+    agregado.
+    """
+    param_sets = param_sets or {"default": {}}
+    aggregator = Aggregator()
+    with open(out_path, "w", encoding="utf-8") as out, \
+            Pool(processes, initializer=_init_worker, initargs=(world, param_sets)) as pool:
+        for record in pool.imap_unordered(run_session, specs, chunksize):
+            out.write(json.dumps(record) + "\n")
+            aggregator.add(record)
+    return aggregator.report()
+
+
+def _print_report(report: List[Dict[str, Any]]) -> None:
+    for group in report:
+        points = group["metrics"]["total_points"]
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(group["reasons"].items(), key=str))
+        print(f"[{group['params']}] IA {group['ia_mode']} - {group['sessions']} sesiones ({reasons})")
+        print("  puntos       " + "  ".join(f"p{q}={points[f'p{q}']:.0f}" for q in PERCENTILES)
+              + f"  media={points['mean']:.1f}")
+        for name in ("delivered", "reputation", "ia_delivered"):
+            metric = group["metrics"][name]
+            print(f"  {name:<13}p50={metric['p50']:.1f}  media={metric['mean']:.2f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sesiones sin interfaz en paralelo con resumen de puntajes.")
+    parser.add_argument("--seeds", type=int, default=100, help="sesiones por modo y juego de parámetros")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--modes", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--ias", type=int, default=1, help="IAs por sesión (con más de una, reparto central)")
+    parser.add_argument("--params", help="JSON con {nombre: {score, weather, simulation}}")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--out", default="monte_carlo.jsonl")
+    parser.add_argument("--report", default=None, help="dónde guardar el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    param_sets = {"default": {}}
+    if args.params:
+        with open(args.params, "r", encoding="utf-8") as f:
+            param_sets = json.load(f)
+    world = World.load()
+    specs = sweep(range(args.first_seed, args.first_seed + args.seeds), args.modes, list(param_sets), args.ias)
+    report = run_batch(world, specs, args.out, param_sets, args.processes)
+    _print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,646 @@
+# Logic/pathfinder.py
+import heapq
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from Logic.entity.city_map import CityMap
+
+Position = Tuple[int, int]
+INFINITY = float("inf")
+
+# Heurística: recibe |dx|, |dy| en celdas y devuelve una estimación en pasos.
+Heuristic = Callable[[int, int], float]
+
+
+def manhattan(dx: int, dy: int) -> float:
+    return dx + dy
+
+
+def euclidean(dx: int, dy: int) -> float:
+    return (dx * dx + dy * dy) ** 0.5
+
+
+def zero(dx: int, dy: int) -> float:
+    """Sin heurística: A* se comporta como Dijkstra."""
+    return 0.0
+
+
+# -------------------------
+# Modelos de costo
+# -------------------------
+class CostModel:
+    """
+    Costo de entrar a cada celda, indexado por id de celda.
+    El arreglo se reconstruye solo cuando cambia ``cache_key()``, salvo los
+    cambios de tile, que se aplican celda por celda al recibirlos.
+    """
+
+    def __init__(self, city_map: CityMap):
+        self.city_map = city_map
+        self._costs: Optional[array] = None
+        self._key = None
+        self._min_cost = 1.0
+        self._uniform = False
+        city_map.add_tile_listener(self._on_tile_changed)
+
+    def detach(self) -> None:
+        """
+        Deja de escuchar cambios del mapa. Sigue sirviendo costos correctos:
+        sin los parches por celda, un cambio de tile reconstruye el arreglo.
+        """
+        self.city_map.remove_tile_listener(self._on_tile_changed)
+
+    def cache_key(self):
+        return self.city_map.version, self._profile_key()
+
+    def _profile_key(self):
+        """Parte de la clave que no depende del mapa (p. ej. el clima)."""
+        return None
+
+    def _on_tile_changed(self, x: int, y: int, dirty) -> None:
+        # Solo se parchea si el arreglo estaba al día antes de este cambio
+        if self._costs is None or self._key != (self.city_map.version - 1, self._profile_key()):
+            return
+        idx = y * self.city_map.width + x
+        cost = self._cell_cost(self.city_map.get_surface_weight(x, y))
+        self._costs[idx] = cost
+        if not self.city_map.is_blocked(x, y):
+            # Aproximación segura: el mínimo solo baja y la uniformidad solo
+            # se pierde; la próxima reconstrucción completa los recalcula
+            if cost != self._min_cost:
+                self._uniform = False
+            if cost < self._min_cost:
+                self._min_cost = cost
+        self._key = self.cache_key()
+
+    def _cell_cost(self, surface_weight: float) -> float:
+        raise NotImplementedError
+
+    def costs(self) -> Sequence[float]:
+        key = self.cache_key()
+        if self._costs is None or key != self._key:
+            self._rebuild()
+            self._key = key
+        return self._costs
+
+    def min_cost(self) -> float:
+        """Menor costo entre celdas transitables (escala la heurística)."""
+        self.costs()
+        return self._min_cost
+
+    def is_uniform(self) -> bool:
+        """True si todas las celdas transitables tienen el mismo costo."""
+        self.costs()
+        return self._uniform
+
+    def _rebuild(self) -> None:
+        surface = self.city_map.surface_grid
+        blocked = self.city_map.blocked_grid
+        by_weight = {}
+        costs = array("f", bytes(4 * len(surface)))
+        min_cost = float("inf")
+        walkable_costs = set()
+        for idx, weight in enumerate(surface):
+            cost = by_weight.get(weight)
+            if cost is None:
+                cost = by_weight[weight] = self._cell_cost(weight)
+            costs[idx] = cost
+            if not blocked[idx]:
+                walkable_costs.add(cost)
+                if cost < min_cost:
+                    min_cost = cost
+        self._costs = costs
+        self._min_cost = min_cost if min_cost != float("inf") else 1.0
+        self._uniform = len(walkable_costs) <= 1
+
+
+class UnitCost(CostModel):
+    """Todas las celdas cuestan 1 (conteo de pasos)."""
+
+    def _cell_cost(self, surface_weight: float) -> float:
+        return 1.0
+
+
+class SurfaceCost(CostModel):
+    """
+    Tiempo por celda según la superficie: la velocidad se multiplica por
+    surface_weight, así que el costo es su inverso.
+    """
+
+    def _cell_cost(self, surface_weight: float) -> float:
+        return 1.0 / surface_weight if surface_weight > 0 else float("inf")
+
+
+class WeatherCost(SurfaceCost):
+    """
+    Tiempo por celda considerando superficie y el multiplicador base de la
+    condición climática. Se recalcula al cambiar de condición, no durante
+    cada paso de la transición interpolada.
+    """
+
+    def __init__(self, city_map: CityMap, weather_simulator=None):
+        super().__init__(city_map)
+        self.weather_simulator = weather_simulator
+
+    def _condition(self) -> Optional[str]:
+        simulator = self.weather_simulator
+        return getattr(simulator, "current_condition", None) if simulator else None
+
+    def _multiplier(self) -> float:
+        simulator = self.weather_simulator
+        if simulator is None:
+            return 1.0
+        return max(0.01, simulator._get_speed_multiplier(self._condition()))
+
+    def _profile_key(self):
+        return self._condition()
+
+    def _cell_cost(self, surface_weight: float) -> float:
+        return super()._cell_cost(surface_weight) / self._multiplier()
+
+
+# -------------------------
+# Motor A*
+# -------------------------
+class PathFinder:
+    """
+    A* sobre la grilla compilada del CityMap.
+
+    - Heurística (y su peso) y modelo de costo intercambiables.
+    - Desempate determinista: menor f, luego menor h, luego menor id de celda.
+    - Presupuesto opcional de nodos expandidos por búsqueda.
+    - Arreglos g/padre/cerrado preasignados e indexados por id de celda; se
+      reutilizan entre búsquedas marcándolos con un número de búsqueda.
+
+    El objetivo puede estar bloqueado (pickups dentro de edificios): se
+    considera alcanzado al llegar desde una celda vecina transitable.
+
+    Si todas las celdas transitables cuestan lo mismo (``is_uniform()``) se
+    usa Jump Point Search: los caminos simétricos de la grilla se recorren
+    en saltos rectos y solo se expanden los puntos de giro. Con costos
+    variables se vuelve al A* ponderado.
+    """
+
+    def __init__(
+        self,
+        city_map: CityMap,
+        cost_model: Optional[CostModel] = None,
+        heuristic: Heuristic = manhattan,
+        heuristic_weight: float = 1.0,
+        jump_points: bool = True,
+    ):
+        self.city_map = city_map
+        self.cost_model = cost_model or SurfaceCost(city_map)
+        self.heuristic = heuristic
+        # > 1.0 convierte la búsqueda en A* ponderado: menos nodos expandidos
+        # a cambio de rutas hasta heuristic_weight veces más caras.
+        self.heuristic_weight = heuristic_weight
+        # Permite desactivar JPS aunque los costos sean uniformes
+        self.jump_points = jump_points
+        self.expanded = 0  # nodos expandidos en la última búsqueda
+        self.budget_exhausted = False
+        self._allocate()
+
+    def detach(self) -> None:
+        """Suelta los listeners de su modelo de costo."""
+        self.cost_model.detach()
+
+    def _allocate(self) -> None:
+        # Listas planas de Python: el acceso por índice es más rápido que en
+        # array porque no hay que convertir (boxing) en cada lectura.
+        size = self.city_map.width * self.city_map.height
+        self._size = size
+        self._g = [0.0] * size
+        self._parent = [-1] * size
+        self._seen = [0] * size
+        self._closed = [0] * size
+        self._search_id = 0
+        self._step_costs: List[float] = []
+        self._step_key = None
+        self._jumps: Tuple[List[int], ...] = ([],)
+        self._jump_key = None
+
+    def _next_search_id(self) -> int:
+        if self._size != self.city_map.width * self.city_map.height:
+            self._allocate()
+        self._search_id += 1
+        return self._search_id
+
+    def _step_cost_table(self) -> List[float]:
+        """
+        Costo de entrar a cada celda con las bloqueadas en infinito, así el
+        bucle interno resuelve bloqueo y costo con una sola lectura.
+        """
+        key = self.cost_model.cache_key()
+        if key != self._step_key or len(self._step_costs) != self._size:
+            costs = self.cost_model.costs()
+            blocked = self.city_map.blocked_grid
+            self._step_costs = [
+                INFINITY if blocked[idx] else cost for idx, cost in enumerate(costs)
+            ]
+            self._step_key = key
+        return self._step_costs
+
+    def find_path(
+        self,
+        start: Position,
+        goal: Position,
+        max_expansions: Optional[int] = None,
+    ) -> List[Position]:
+        """
+        Devuelve la lista de coordenadas (x, y) del camino de menor costo
+        desde 'start' hasta 'goal'. Si no hay ruta o se agota el presupuesto,
+        devuelve lista vacía.
+        """
+        cmap = self.city_map
+        width, height = cmap.width, cmap.height
+        sx, sy = start
+        gx, gy = goal
+        self.expanded = 0
+        self.budget_exhausted = False
+        if not (0 <= sx < width and 0 <= sy < height and 0 <= gx < width and 0 <= gy < height):
+            return []
+
+        start_idx = sy * width + sx
+        goal_idx = gy * width + gx
+        if start_idx == goal_idx:
+            return [(sx, sy)]
+
+        search = self._next_search_id()
+        limit = max_expansions if max_expansions is not None else -1
+        if self.jump_points and self.cost_model.is_uniform():
+            return self._jump_point_search(start_idx, goal_idx, search, limit)
+
+        costs = self._step_cost_table()
+        goal_cost = self.cost_model.costs()[goal_idx]
+        scale = self.cost_model.min_cost() * self.heuristic_weight
+        heuristic = self.heuristic
+        fast_manhattan = heuristic is manhattan
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        heappush, heappop = heapq.heappush, heapq.heappop
+        steps = ((-1, -1, 0), (1, 1, 0), (-width, 0, -1), (width, 0, 1))
+        max_x, max_y = width - 1, height - 1
+
+        g[start_idx] = 0.0
+        parent[start_idx] = -1
+        seen[start_idx] = search
+        h0 = heuristic(abs(sx - gx), abs(sy - gy)) * scale
+        open_heap = [(h0, h0, start_idx)]
+        expanded = 0
+
+        while open_heap:
+            _, _, cell = heappop(open_heap)
+            if closed[cell] == search:
+                continue
+            if cell == goal_idx:
+                self.expanded = expanded
+                return self._reconstruct(cell)
+            if expanded == limit:
+                self.budget_exhausted = True
+                break
+            closed[cell] = search
+            expanded += 1
+
+            base = g[cell]
+            y, x = divmod(cell, width)
+            for delta, dx, dy in steps:
+                nx = x + dx
+                ny = y + dy
+                if nx < 0 or ny < 0 or nx > max_x or ny > max_y:
+                    continue
+                nb = cell + delta
+                if closed[nb] == search:
+                    continue
+                step = costs[nb]
+                if step == INFINITY:
+                    if nb != goal_idx:
+                        continue
+                    # objetivo bloqueado (pickup en edificio): se admite
+                    step = goal_cost
+                tentative = base + step
+                if seen[nb] != search or tentative < g[nb]:
+                    seen[nb] = search
+                    g[nb] = tentative
+                    parent[nb] = cell
+                    if fast_manhattan:
+                        h = ((nx - gx if nx > gx else gx - nx) + (ny - gy if ny > gy else gy - ny)) * scale
+                    else:
+                        h = heuristic(abs(nx - gx), abs(ny - gy)) * scale
+                    heappush(open_heap, (tentative + h, h, nb))
+
+        self.expanded = expanded
+        return []
+
+    def _jump_tables(self) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Saltos precalculados por celda y dirección (derecha, izquierda,
+        abajo, arriba), independientes del objetivo; se recalculan solo
+        cuando cambia ``city_map.version``.
+
+        Valor v > 0: hay punto de salto a v celdas. Valor v <= 0: no hay
+        punto de salto y quedan -v celdas transitables antes de la pared.
+
+        - El salto horizontal se detiene en una celda con vecino forzado: se
+          abre un hueco arriba o abajo que en la celda anterior estaba tapado.
+        - El vertical además se detiene donde un salto horizontal lateral
+          encontraría un punto de salto.
+        """
+        key = self.city_map.version
+        if self._jump_key == key and len(self._jumps[0]) == self._size:
+            return self._jumps
+
+        width, height = self.city_map.width, self.city_map.height
+        blocked = self.city_map.blocked_grid
+        size = width * height
+        right, left, down, up = [0] * size, [0] * size, [0] * size, [0] * size
+
+        def is_open(x: int, y: int) -> bool:
+            return 0 <= x < width and 0 <= y < height and not blocked[y * width + x]
+
+        def extend(table: List[int], nxt: int) -> int:
+            v = table[nxt]
+            return v + 1 if v > 0 else v - 1
+
+        for y in range(height):
+            row = y * width
+            for dx, table, xs in ((1, right, range(width - 2, -1, -1)), (-1, left, range(1, width))):
+                for x in xs:
+                    cell = row + x
+                    nx = x + dx
+                    if blocked[cell] or blocked[row + nx]:
+                        continue
+                    if ((is_open(nx, y - 1) and not is_open(x, y - 1)) or
+                            (is_open(nx, y + 1) and not is_open(x, y + 1))):
+                        table[cell] = 1
+                    else:
+                        table[cell] = extend(table, row + nx)
+
+        for dy, table, ys in ((1, down, range(height - 2, -1, -1)), (-1, up, range(1, height))):
+            for y in ys:
+                ny = y + dy
+                for x in range(width):
+                    cell = y * width + x
+                    nxt = ny * width + x
+                    if blocked[cell] or blocked[nxt]:
+                        continue
+                    if ((is_open(x - 1, ny) and not is_open(x - 1, y)) or
+                            (is_open(x + 1, ny) and not is_open(x + 1, y)) or
+                            right[nxt] > 0 or left[nxt] > 0):
+                        table[cell] = 1
+                    else:
+                        table[cell] = extend(table, nxt)
+
+        self._jumps = (right, left, down, up)
+        self._jump_key = key
+        return self._jumps
+
+    def _jump_point_search(self, start_idx: int, goal_idx: int, search: int, limit: int) -> List[Position]:
+        """
+        Jump Point Search para grillas 4-conexas de costo uniforme.
+
+        Desde un nodo alcanzado en horizontal se sigue en esa dirección y se
+        prueban ambas verticales; desde uno vertical, al revés. Los saltos
+        salen de ``_jump_tables``; aquí solo se agrega el corte en el
+        objetivo (o en la fila del objetivo si desde ella se lo alcanza en
+        horizontal).
+
+        Solo los puntos de salto entran al heap y cuentan como expandidos.
+        La heurística Manhattan no se pondera: con costo uniforme la ruta ya
+        sale óptima sin sacrificar nodos.
+        """
+        width = self.city_map.width
+        right, left, down, up = self._jump_tables()
+        unit = self.cost_model.min_cost()
+        goal_cost = self.cost_model.costs()[goal_idx]
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        heappush, heappop = heapq.heappush, heapq.heappop
+        gy, gx = divmod(goal_idx, width)
+
+        def open_run(v: int) -> int:
+            # Celdas transitables en línea recta hasta el punto de salto o la pared
+            return v if v > 0 else -v
+
+        def reach(v: int) -> int:
+            # Igual que open_run, pero incluye la celda bloqueada que sigue a
+            # la pared por si es el objetivo (pickups en edificios)
+            return v if v > 0 else 1 - v
+
+        def jump_horizontal(x: int, y: int, dx: int) -> int:
+            v = (right if dx > 0 else left)[y * width + x]
+            d = (gx - x) * dx
+            if d > 0:
+                if gy == y:
+                    if d <= reach(v):
+                        return goal_idx
+                elif abs(gy - y) == 1 and d <= open_run(v):
+                    # Celda justo encima/debajo del objetivo: punto de giro
+                    return y * width + gx
+            return y * width + x + v * dx if v > 0 else -1
+
+        def jump_vertical(x: int, y: int, dy: int) -> int:
+            v = (down if dy > 0 else up)[y * width + x]
+            if gx == x:
+                d = (gy - y) * dy
+                if 0 < d <= reach(v):
+                    return goal_idx
+            else:
+                side = right if gx > x else left
+                dh = abs(gx - x)
+                # Filas del objetivo y sus vecinas, de la más cercana a la más lejana
+                for row in (gy - dy, gy, gy + dy):
+                    d = (row - y) * dy
+                    if d <= 0 or d > open_run(v):
+                        continue
+                    row_cell = row * width + x
+                    h = side[row_cell]
+                    if dh <= (reach(h) if row == gy else open_run(h)):
+                        return row_cell
+            return (y + v * dy) * width + x if v > 0 else -1
+
+        g[start_idx] = 0.0
+        parent[start_idx] = -1
+        seen[start_idx] = search
+        sy, sx = divmod(start_idx, width)
+        h0 = (abs(sx - gx) + abs(sy - gy)) * unit
+        open_heap = [(h0, h0, start_idx)]
+        expanded = 0
+
+        while open_heap:
+            _, _, cell = heappop(open_heap)
+            if closed[cell] == search:
+                continue
+            if cell == goal_idx:
+                self.expanded = expanded
+                return self._reconstruct_jumps(cell)
+            if expanded == limit:
+                self.budget_exhausted = True
+                break
+            closed[cell] = search
+            expanded += 1
+
+            y, x = divmod(cell, width)
+            origin = parent[cell]
+            if origin == -1:
+                directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+            else:
+                py, px = divmod(origin, width)
+                if py == y:
+                    dx = 1 if x > px else -1
+                    directions = ((dx, 0), (0, 1), (0, -1))
+                else:
+                    dy = 1 if y > py else -1
+                    directions = ((0, dy), (1, 0), (-1, 0))
+
+            base = g[cell]
+            for dx, dy in directions:
+                if dy == 0:
+                    jump = jump_horizontal(x, y, dx)
+                else:
+                    jump = jump_vertical(x, y, dy)
+                if jump == -1 or closed[jump] == search:
+                    continue
+                jy, jx = divmod(jump, width)
+                distance = abs(jx - x) + abs(jy - y)
+                if jump == goal_idx:
+                    tentative = base + (distance - 1) * unit + goal_cost
+                else:
+                    tentative = base + distance * unit
+                if seen[jump] != search or tentative < g[jump]:
+                    seen[jump] = search
+                    g[jump] = tentative
+                    parent[jump] = cell
+                    h = (abs(jx - gx) + abs(jy - gy)) * unit
+                    heappush(open_heap, (tentative + h, h, jump))
+
+        self.expanded = expanded
+        return []
+
+    def distances_from(self, source: Position, targets: Sequence[Position]) -> List[Optional[float]]:
+        """
+        Costo de ruta desde source hasta cada target con un solo Dijkstra
+        que se detiene al asentar todos los objetivos. None si no hay ruta.
+
+        Como en find_path, source y los targets pueden estar bloqueados
+        (pickups en edificios): se entra a ellos pero no se los atraviesa.
+        """
+        cmap = self.city_map
+        width, height = cmap.width, cmap.height
+        sx, sy = source
+        if not (0 <= sx < width and 0 <= sy < height):
+            return [None] * len(targets)
+        source_idx = sy * width + sx
+
+        target_ids: List[int] = []
+        for tx, ty in targets:
+            target_ids.append(ty * width + tx if 0 <= tx < width and 0 <= ty < height else -1)
+        pending = {idx for idx in target_ids if idx >= 0}
+        wanted = frozenset(pending)
+        found = {}
+
+        search = self._next_search_id()
+        costs = self._step_cost_table()
+        raw_costs = self.cost_model.costs()
+        g, seen, closed = self._g, self._seen, self._closed
+        heappush, heappop = heapq.heappush, heapq.heappop
+        steps = ((-1, -1, 0), (1, 1, 0), (-width, 0, -1), (width, 0, 1))
+        max_x, max_y = width - 1, height - 1
+
+        g[source_idx] = 0.0
+        seen[source_idx] = search
+        open_heap = [(0.0, source_idx)]
+        expanded = 0
+
+        while open_heap and pending:
+            d, cell = heappop(open_heap)
+            if closed[cell] == search:
+                continue
+            closed[cell] = search
+            expanded += 1
+            if cell in pending:
+                pending.discard(cell)
+                found[cell] = d
+            if cell != source_idx and costs[cell] == INFINITY:
+                continue
+
+            y, x = divmod(cell, width)
+            for delta, dx, dy in steps:
+                nx = x + dx
+                ny = y + dy
+                if nx < 0 or ny < 0 or nx > max_x or ny > max_y:
+                    continue
+                nb = cell + delta
+                if closed[nb] == search:
+                    continue
+                step = costs[nb]
+                if step == INFINITY:
+                    if nb not in wanted:
+                        continue
+                    step = raw_costs[nb]
+                tentative = d + step
+                if seen[nb] != search or tentative < g[nb]:
+                    seen[nb] = search
+                    g[nb] = tentative
+                    heappush(open_heap, (tentative, nb))
+
+        self.expanded = expanded
+        return [found.get(idx) if idx >= 0 else None for idx in target_ids]
+
+    def distance_matrix(
+        self,
+        sources: Sequence[Position],
+        targets: Sequence[Position],
+    ) -> List[List[Optional[float]]]:
+        """
+        Matriz de costos sources x targets: una pasada de Dijkstra
+        multiobjetivo por cada origen distinto.
+        """
+        rows = {}
+        matrix = []
+        for source in sources:
+            key = (int(source[0]), int(source[1]))
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = self.distances_from(key, targets)
+            matrix.append(list(row))
+        return matrix
+
+    def path_cost(self, path: Sequence[Position]) -> float:
+        """Costo total de un camino según el modelo de costo actual."""
+        costs = self.cost_model.costs()
+        width = self.city_map.width
+        return sum(costs[y * width + x] for x, y in path[1:])
+
+    def _reconstruct(self, cell: int) -> List[Position]:
+        """
+        Reconstruye el camino siguiendo los padres desde el goal.
+        """
+        width = self.city_map.width
+        parent = self._parent
+        path: List[Position] = []
+        while cell != -1:
+            path.append((cell % width, cell // width))
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    def _reconstruct_jumps(self, cell: int) -> List[Position]:
+        """
+        Reconstruye el camino de JPS rellenando los tramos rectos entre
+        puntos de salto consecutivos.
+        """
+        width = self.city_map.width
+        parent = self._parent
+        path: List[Position] = [(cell % width, cell // width)]
+        while parent[cell] != -1:
+            prev = parent[cell]
+            x, y = cell % width, cell // width
+            px, py = prev % width, prev // width
+            dx = (px > x) - (px < x)
+            dy = (py > y) - (py < y)
+            while (x, y) != (px, py):
+                x += dx
+                y += dy
+                path.append((x, y))
+            cell = prev
+        path.reverse()
+        return path
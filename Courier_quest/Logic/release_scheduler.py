@@ -0,0 +1,107 @@
+# Logic/release_scheduler.py
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Logic.entity.job import Job
+
+
+class ReleaseScheduler:
+    """
+    Línea de tiempo de pedidos.
+
+    Guarda los pedidos pendientes en un min-heap por ``release_time``
+    absoluto y los activos en otro por deadline. Cada frame solo se sacan
+    los que ya vencieron su momento (O(log n) por pedido liberado o
+    expirado), sin recorrer toda la lista de pedidos.
+
+    Cancelar o reprogramar un pedido no toca los heaps: la entrada vieja
+    queda como lápida (su secuencia ya no es la vigente) y se descarta al
+    llegar al frente.
+
+    Un pedido sin release_time se libera de inmediato; uno sin deadline
+    nunca expira.
+    """
+
+    def __init__(self, jobs: Iterable[Job] = ()):
+        self._pending: List[Tuple[float, int, Job]] = []
+        self._active: List[Tuple[float, int, Job]] = []
+        self._pending_seq: Dict[int, int] = {}  # id(job) -> secuencia vigente
+        self._active_seq: Dict[int, int] = {}
+        self._seq = 0
+        for job in jobs:
+            self.schedule(job)
+
+    def __len__(self) -> int:
+        return len(self._pending_seq)
+
+    def schedule(self, job: Job) -> None:
+        """Agrega (o reprograma) un pedido pendiente de liberar."""
+        release_ts = job.get_release_timestamp() if hasattr(job, "get_release_timestamp") else None
+        self._seq += 1
+        self._pending_seq[id(job)] = self._seq
+        heapq.heappush(self._pending, (release_ts if release_ts is not None else float("-inf"), self._seq, job))
+
+    def _track_deadline(self, job: Job) -> None:
+        deadline_ts = job.get_deadline_timestamp() if hasattr(job, "get_deadline_timestamp") else None
+        if deadline_ts is None:
+            self._active_seq.pop(id(job), None)
+            return
+        self._seq += 1
+        self._active_seq[id(job)] = self._seq
+        heapq.heappush(self._active, (deadline_ts, self._seq, job))
+
+    def is_pending(self, job: Job) -> bool:
+        return id(job) in self._pending_seq
+
+    def cancel(self, job: Job) -> bool:
+        """Saca job de la línea de tiempo. True si seguía pendiente."""
+        self._active_seq.pop(id(job), None)
+        return self._pending_seq.pop(id(job), None) is not None
+
+    def reschedule(self, job: Job) -> None:
+        """Vuelve a ubicar job tras un cambio de release_time o deadline."""
+        if id(job) in self._pending_seq:
+            self.schedule(job)
+        elif id(job) in self._active_seq:
+            self._track_deadline(job)
+
+    def clear(self) -> None:
+        self._pending = []
+        self._active = []
+        self._pending_seq = {}
+        self._active_seq = {}
+
+    def next_release(self) -> Optional[float]:
+        """Momento del próximo pedido por liberar (None si no quedan)."""
+        pending = self._pending
+        while pending and self._pending_seq.get(id(pending[0][2])) != pending[0][1]:
+            heapq.heappop(pending)
+        return pending[0][0] if pending else None
+
+    def release_due(self, now: float) -> List[Job]:
+        """Saca, en orden de liberación, los pedidos con release_time <= now."""
+        released = []
+        pending, pending_seq = self._pending, self._pending_seq
+        while pending and pending[0][0] <= now:
+            _, seq, job = heapq.heappop(pending)
+            if pending_seq.get(id(job)) != seq:
+                continue
+            del pending_seq[id(job)]
+            self._track_deadline(job)
+            released.append(job)
+        return released
+
+    def expire_due(self, now: float) -> List[Job]:
+        """
+        Saca los pedidos liberados cuyo deadline ya pasó. Pueden haber sido
+        aceptados antes; quien llama decide si siguen disponibles.
+        """
+        expired = []
+        active, active_seq = self._active, self._active_seq
+        while active and active[0][0] < now:
+            _, seq, job = heapq.heappop(active)
+            if active_seq.get(id(job)) != seq:
+                continue
+            del active_seq[id(job)]
+            expired.append(job)
+        return expired
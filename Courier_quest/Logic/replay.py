@@ -0,0 +1,307 @@
+# Logic/replay.py
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+from Logic.clock import ManualClock
+from Logic.entity.city_map import CityMap
+from Logic.entity.job import Job
+from Logic.simulation import Simulation, PlayerInput, IDLE
+
+MAGIC = b"CQR1"
+VERSION = 1
+
+# Tipos de registro (3 bits bajos del encabezado de cada registro)
+INPUT, BEGIN_MERGE, MERGE, FINISH_MERGE, END = range(5)
+
+FLUSH_SIZE = 1 << 14  # bytes que se juntan antes de escribir al archivo
+
+
+# -------------------------
+# Codificación
+# -------------------------
+def write_varint(out: bytearray, value: int) -> None:
+    """Entero no negativo en LEB128: 7 bits por byte, el bit alto indica que sigue."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Lee un varint de data desde pos; devuelve (valor, posición siguiente)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_blob(out: bytearray, obj: Any) -> None:
+    blob = zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"), 9)
+    write_varint(out, len(blob))
+    out += blob
+
+
+def _read_blob(data: bytes, pos: int) -> Tuple[Any, int]:
+    size, pos = read_varint(data, pos)
+    return json.loads(zlib.decompress(data[pos:pos + size])), pos + size
+
+
+def encode_input(player: PlayerInput) -> int:
+    """
+    Empaqueta una entrada en un entero de 11 bits: dx y dy (2 bits cada
+    uno), las cuatro acciones (1 bit cada una) y la dirección del sprite
+    (3 bits, 0 = sin cambio).
+    """
+    direction = 0 if player.direction is None else player.direction + 1
+    return ((player.dx + 1) | (player.dy + 1) << 2 | bool(player.back) << 4 | bool(player.pick) << 5
+            | bool(player.cancel) << 6 | bool(player.deliver) << 7 | direction << 8)
+
+
+def decode_input(code: int) -> PlayerInput:
+    direction = code >> 8
+    return PlayerInput(dx=(code & 3) - 1, dy=(code >> 2 & 3) - 1, back=bool(code & 16),
+                       pick=bool(code & 32), cancel=bool(code & 64), deliver=bool(code & 128),
+                       direction=None if direction == 0 else direction - 1)
+
+
+IDLE_CODE = encode_input(IDLE)
+
+
+# -------------------------
+# Grabación
+# -------------------------
+class Recorder:
+    """
+    Graba una sesión para repetirla sin interfaz.
+
+    El archivo empieza con ``MAGIC`` y un encabezado JSON comprimido con
+    todo lo que define la sesión: mapa, clima y pedidos iniciales tal como
+    llegaron de la API, semilla, inicio del reloj, opciones de la
+    simulación y modo de cada IA. Se escribe y se baja al disco en
+    ``attach``, así que el modo de las IAs y las IAs extra tienen que
+    fijarse antes; una sesión interrumpida deja igual una grabación que se
+    puede repetir.
+
+    Después vienen los registros, cada uno con el delta de ticks desde el
+    anterior en varint y un varint con el tipo en los 3 bits bajos. Las
+    entradas del jugador solo se graban cuando cambian; los lotes del
+    feed de pedidos van como JSON comprimido. El último registro (``END``)
+    guarda el motivo de fin y el puntaje para verificar la repetición. Si
+    la sesión se cierra sin terminar, ``close`` graba el último tick jugado
+    para que la repetición llegue hasta ahí.
+    """
+
+    def __init__(self, path: str, world: Dict[str, Any]):
+        self.path = path
+        self.world = world
+        self.simulation: Optional[Simulation] = None
+        self._file = None
+        self._buffer = bytearray()
+        self._tick = 0
+        self._code = IDLE_CODE
+        self._ended = False
+
+    def attach(self, simulation: Simulation) -> None:
+        self.simulation = simulation
+        simulation.recorder = self
+        self._begin()
+
+    def _begin(self) -> None:
+        sim = self.simulation
+        header = dict(self.world)
+        header.update({
+            "version": VERSION,
+            "tick": sim.tick,
+            "options": {
+                "session_duration": sim.session_duration,
+                "move_delay": sim.move_delay,
+                "ia_move_delay": sim.ia_move_delay,
+                "weather_interval": sim.weather_interval,
+            },
+            "ias": [[list(ia.position), ia.mode_deliver] for ia in sim.ias],
+        })
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._buffer += MAGIC
+        _write_blob(self._buffer, header)
+        self._flush()
+        self._file.flush()
+
+    def _record(self, tick: int, kind: int, value: int = 0) -> None:
+        write_varint(self._buffer, tick - self._tick)
+        write_varint(self._buffer, value << 3 | kind)
+        self._tick = tick
+        if len(self._buffer) >= FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    # Eventos de la sesión
+    def input(self, tick: int, player: PlayerInput) -> None:
+        code = encode_input(player)
+        if code != self._code:
+            self._code = code
+            self._record(tick, INPUT, code)
+
+    def begin_merge(self) -> None:
+        self._record(self.simulation.ticks, BEGIN_MERGE)
+
+    def merge(self, raw_jobs: List[dict]) -> None:
+        self._record(self.simulation.ticks, MERGE)
+        _write_blob(self._buffer, raw_jobs)
+
+    def finish_merge(self) -> None:
+        self._record(self.simulation.ticks, FINISH_MERGE)
+
+    def finish(self, tick: int, reason: str, score: Optional[Dict[str, float]]) -> None:
+        self._record(tick, END)
+        _write_blob(self._buffer, {"reason": reason, "score": score})
+        self._ended = True
+        self.close()
+
+    def discard(self) -> None:
+        """Cierra y borra la grabación (la sesión ya no se puede repetir)."""
+        self._ended = True
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            sim = self.simulation
+            if not self._ended and sim is not None and sim.ticks > self._tick:
+                # Sesión cortada: la entrada vigente hasta el último tick jugado
+                self._record(sim.ticks, INPUT, self._code)
+            self._flush()
+            self._file.close()
+            self._file = None
+        if self.simulation is not None and self.simulation.recorder is self:
+            self.simulation.recorder = None
+
+
+# -------------------------
+# Repetición
+# -------------------------
+class Replay:
+    """Sesión grabada: encabezado y registros (tick, tipo, valor, datos)."""
+
+    def __init__(self, header: Dict[str, Any], records: List[Tuple[int, int, int, Any]]):
+        self.header = header
+        self.records = records
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} no es una grabación de Courier Quest")
+        header, pos = _read_blob(data, len(MAGIC))
+        records = []
+        tick = 0
+        end = len(data)
+        while pos < end:
+            try:
+                delta, pos = read_varint(data, pos)
+                word, pos = read_varint(data, pos)
+                kind, value = word & 7, word >> 3
+                payload = None
+                if kind in (MERGE, END):
+                    payload, pos = _read_blob(data, pos)
+            except (IndexError, ValueError, zlib.error):
+                # El proceso se cortó a mitad de un registro: se usa lo completo
+                break
+            tick += delta
+            records.append((tick, kind, value, payload))
+        return cls(header, records)
+
+    @property
+    def expected(self) -> Optional[Dict[str, Any]]:
+        """Motivo de fin y puntaje grabados (None si la sesión no terminó)."""
+        for tick, kind, _, payload in reversed(self.records):
+            if kind == END:
+                return payload
+        return None
+
+    def simulation(self) -> Simulation:
+        """Arma la simulación en el mismo estado inicial que la sesión grabada."""
+        header = self.header
+        raw = header["city_map"]
+        city_map = CityMap(width=raw["width"], height=raw["height"], tiles=raw["tiles"],
+                           legend=raw["legend"], goal=raw["goal"])
+        clock = ManualClock(header["start"])
+        sim = Simulation.create(city_map, Job.from_dicts(header["jobs"], clock), header["weather"],
+                                clock=clock, seed=header["seed"], tick=header["tick"], **header["options"])
+        (position, mode), *others = header["ias"]
+        sim.ia.set_mode(mode)
+        for position, mode in others:
+            sim.add_ia(tuple(position), mode)
+        return sim
+
+    def run(self, sim: Optional[Simulation] = None) -> Dict[str, Any]:
+        """Repite la sesión tick a tick sin límite de velocidad; devuelve las estadísticas finales."""
+        sim = sim if sim is not None else self.simulation()
+        game_service = sim.game_service
+        step = sim.step
+        player = IDLE
+        for tick, kind, value, payload in self.records:
+            while sim.running and sim.ticks < tick:
+                step(player)
+            if kind == INPUT:
+                player = decode_input(value)
+            elif kind == BEGIN_MERGE:
+                game_service.begin_merge()
+            elif kind == MERGE:
+                game_service.merge_jobs(payload)
+            elif kind == FINISH_MERGE:
+                game_service.finish_merge()
+            elif kind == END and sim.running:
+                sim.finish(payload["reason"])
+        if sim.running:
+            # Grabación cortada: se juega hasta el último tick grabado
+            sim.finish("manual")
+        return sim.final_stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Repite una sesión grabada a máxima velocidad.")
+    parser.add_argument("path")
+    parser.add_argument("--verbose", action="store_true", help="muestra los mensajes del juego")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    if args.verbose:
+        sim = replay.simulation()
+        stats = replay.run(sim)
+    else:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            sim = replay.simulation()
+            stats = replay.run(sim)
+    elapsed = time.perf_counter() - start
+
+    print(f"{sim.ticks} ticks en {elapsed:.2f}s ({sim.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"Fin: {stats['reason']}  puntaje: {stats.get('score')}")
+    expected = replay.expected
+    if expected is None:
+        print("La grabación no tiene cierre; no hay puntaje con qué comparar.")
+    elif expected == {"reason": stats["reason"], "score": stats.get("score")}:
+        print("Coincide con la sesión grabada.")
+    else:
+        print(f"NO coincide con la sesión grabada: {expected}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
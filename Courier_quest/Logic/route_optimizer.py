@@ -0,0 +1,346 @@
+# Logic/route_optimizer.py
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Logic.clock import Clock, SYSTEM_CLOCK
+from Logic.entity.job import Job
+from Logic.pathfinder import PathFinder
+
+Position = Tuple[int, int]
+Stop = Tuple[str, Job]
+
+PICKUP = "pickup"
+DROPOFF = "dropoff"
+INFINITY = float("inf")
+
+
+class Tour:
+    """Recorrido de paradas (tipo, pedido) en orden, con su evaluación."""
+
+    __slots__ = ("stops", "cost", "lateness", "score", "feasible")
+
+    def __init__(self, stops: List[Stop], cost: float, lateness: float, score: float):
+        self.stops = stops
+        self.cost = cost
+        self.lateness = lateness
+        self.score = score
+        self.feasible = score < INFINITY
+
+    def next_stop(self) -> Optional[Stop]:
+        return self.stops[0] if self.stops else None
+
+    def picked_jobs(self) -> List[Job]:
+        """Pedidos nuevos que el recorrido propone recoger."""
+        return [job for kind, job in self.stops if kind == PICKUP]
+
+
+EMPTY_TOUR = Tour([], 0.0, 0.0, 0.0)
+
+
+class _Search:
+    """
+    Estado de búsqueda de un problema concreto (inventario + pedidos
+    visibles). Los nodos se codifican como 2*j (pickup del pedido j) y
+    2*j + 1 (su dropoff); los pedidos cargados solo tienen dropoff.
+    """
+
+    def __init__(self, optimizer: "RouteOptimizer", carried: Sequence[Job], visible: Sequence[Job],
+                 capacity: float):
+        self.jobs: List[Job] = list(carried) + list(visible)
+        self.n_carried = len(carried)
+        self.capacity = capacity
+        self.weights = [float(job.weight) for job in self.jobs]
+        self.payouts = [float(job.payout) for job in self.jobs]
+        self.base_load = sum(self.weights[:self.n_carried])
+        self.deadlines = []
+        self.priority_keys = []
+        for job in self.jobs:
+            deadline_ts = job.get_deadline_timestamp() if hasattr(job, "get_deadline_timestamp") else None
+            self.deadlines.append(deadline_ts if deadline_ts is not None else INFINITY)
+            self.priority_keys.append((-job.priority, self.deadlines[-1]))
+
+        # Matriz de costos entre todos los puntos (índice = nodo)
+        points = []
+        for j, job in enumerate(self.jobs):
+            points.append(tuple(job.pickup))
+            points.append(tuple(job.dropoff))
+        self.points = points
+        self.matrix = optimizer.pathfinder.distance_matrix(points, points)
+        self.start_row: List[Optional[float]] = []
+        self.position: Optional[Position] = None
+
+        self.order: List[int] = []
+        self.score = INFINITY
+        self.best_order: List[int] = []
+        self.best = (INFINITY, 0.0, 0.0)
+        self.stalled = 0
+
+    def optional_jobs(self) -> range:
+        return range(self.n_carried, len(self.jobs))
+
+
+class RouteOptimizer:
+    """
+    Optimizador anytime del orden de recogidas y entregas de un agente.
+
+    Resuelve un TSP de recogida y entrega: los pedidos cargados solo
+    necesitan su dropoff; los visibles son opcionales y, si se incluyen,
+    su pickup va antes que su dropoff. Respeta la capacidad de carga y
+    penaliza la llegada tarde según el deadline. Con ``ordered_delivery``
+    además exige la regla del juego: solo se entrega el pedido al frente
+    de la cola de prioridad del inventario.
+
+    Cada ``update`` mejora la solución durante ``time_budget`` segundos
+    (búsqueda local con reubicar, intercambiar, invertir y agregar/quitar
+    pedidos) y devuelve el mejor recorrido conocido. El estado se guarda
+    por problema (inventario + visibles), así la búsqueda continúa entre
+    frames y vuelve a servir si el agente regresa a un conjunto anterior;
+    si el agente se movió solo se reevalúan los recorridos guardados.
+    Deja de buscar cuando lleva ``stall_limit`` intentos sin mejorar.
+
+    Con ``max_evaluations`` el presupuesto de cada ``update`` es esa
+    cantidad de evaluaciones en vez de segundos: junto con ``seed`` hace
+    que la búsqueda dé el mismo resultado en cualquier máquina (para
+    repetir sesiones grabadas).
+    """
+
+    def __init__(
+        self,
+        pathfinder: PathFinder,
+        time_budget: float = 0.002,
+        seconds_per_cost: float = 0.15,
+        late_weight: float = 10.0,
+        payout_weight: float = 1.0,
+        max_candidates: int = 4,
+        ordered_delivery: bool = True,
+        stall_limit: int = 3000,
+        max_states: int = 8,
+        seed: Optional[int] = None,
+        clock: Optional[Clock] = None,
+        max_evaluations: Optional[int] = None,
+    ):
+        self.pathfinder = pathfinder
+        self.time_budget = time_budget
+        self.seconds_per_cost = seconds_per_cost
+        self.late_weight = late_weight
+        self.payout_weight = payout_weight
+        self.max_candidates = max_candidates
+        self.ordered_delivery = ordered_delivery
+        self.stall_limit = stall_limit
+        self.max_states = max_states
+        self.random = random.Random(seed)
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        self.max_evaluations = max_evaluations
+        self.best: Tour = EMPTY_TOUR
+        self.evaluations = 0  # evaluaciones hechas en la última llamada
+        self._states: "OrderedDict[tuple, _Search]" = OrderedDict()
+        self._current: Optional[_Search] = None
+
+    # -------------------------
+    # API pública
+    # -------------------------
+    def update(
+        self,
+        position: Position,
+        carried: Sequence[Job],
+        visible: Sequence[Job] = (),
+        capacity: float = INFINITY,
+        now: Optional[float] = None,
+        budget: Optional[float] = None,
+    ) -> Tour:
+        """Mejora el recorrido del problema dado dentro del presupuesto y devuelve el mejor."""
+        now = self.clock.now() if now is None else now
+        position = (int(position[0]), int(position[1]))
+        carried = list(carried)
+        visible = [job for job in visible if job not in carried]
+        self.evaluations = 0
+        if not carried and not visible:
+            self.best = EMPTY_TOUR
+            return self.best
+
+        search = self._search_for(carried, visible, capacity)
+        if search.position != position:
+            search.start_row = self.pathfinder.distances_from(position, search.points)
+            search.position = position
+            search.stalled = 0
+        search.score = self._evaluate(search, search.order, now)[0]
+        if search.score == INFINITY:
+            # El orden heredado ya no es válido: se parte de las entregas en cola
+            search.order = self._seed_order(search, None)
+            search.score = self._evaluate(search, search.order, now)[0]
+        search.best = self._evaluate(search, search.best_order, now)
+        if search.score < search.best[0]:
+            search.best_order, search.best = list(search.order), self._evaluate(search, search.order, now)
+
+        limit = time.perf_counter() + (self.time_budget if budget is None else budget)
+        self._improve(search, now, limit)
+        self.best = self._tour(search)
+        return self.best
+
+    def invalidate(self) -> None:
+        """Descarta los estados guardados (por ejemplo tras cambiar de mapa)."""
+        self._states.clear()
+        self._current = None
+        self.best = EMPTY_TOUR
+
+    # -------------------------
+    # Estados por problema
+    # -------------------------
+    def _search_for(self, carried: List[Job], visible: List[Job], capacity: float) -> _Search:
+        # La firma detecta pedidos modificados en el lugar por un refresco del feed
+        key = (tuple((id(job), job.feed_signature()) for job in carried),
+               tuple((id(job), job.feed_signature()) for job in visible),
+               capacity, self.pathfinder.cost_model.cache_key())
+        search = self._states.get(key)
+        if search is not None:
+            self._states.move_to_end(key)
+            self._current = search
+            return search
+
+        search = _Search(self, carried, visible, capacity)
+        search.order = self._seed_order(search, self._current)
+        search.best_order = list(search.order)
+        self._states[key] = search
+        if len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+        self._current = search
+        return search
+
+    def _seed_order(self, search: _Search, previous: Optional[_Search]) -> List[int]:
+        """
+        Orden inicial: el mejor del problema anterior, traducido a los
+        pedidos que siguen presentes, más los dropoffs cargados que falten
+        según la cola de prioridad.
+        """
+        index = {id(job): j for j, job in enumerate(search.jobs)}
+        order: List[int] = []
+        placed = set()
+        if previous is not None:
+            for node in previous.best_order:
+                job = previous.jobs[node >> 1]
+                j = index.get(id(job))
+                if j is None:
+                    continue
+                drop = node & 1
+                if not drop and j < search.n_carried:
+                    continue  # ya se recogió
+                order.append(2 * j + drop)
+                placed.add(2 * j + drop)
+            # Un pickup sin su dropoff (o al revés) no sirve
+            order = [node for node in order
+                     if (node >> 1) < search.n_carried or (node ^ 1) in placed]
+        missing = [j for j in range(search.n_carried) if 2 * j + 1 not in placed]
+        missing.sort(key=lambda j: (search.priority_keys[j], j))
+        return order + [2 * j + 1 for j in missing]
+
+    # -------------------------
+    # Evaluación
+    # -------------------------
+    def _evaluate(self, search: _Search, order: List[int], now: float) -> Tuple[float, float, float]:
+        """(puntaje, costo de viaje, segundos de atraso); puntaje infinito si es inválido."""
+        matrix, start_row = search.matrix, search.start_row
+        weights, deadlines, keys = search.weights, search.deadlines, search.priority_keys
+        n_carried = search.n_carried
+        ordered = self.ordered_delivery
+        spc = self.seconds_per_cost
+
+        holding: Dict[int, tuple] = {j: keys[j] + (j,) for j in range(n_carried)}
+        seq = n_carried
+        load = search.base_load
+        cost = lateness = reward = 0.0
+        prev = -1
+        for node in order:
+            d = start_row[node] if prev < 0 else matrix[prev][node]
+            if d is None:
+                return INFINITY, 0.0, 0.0
+            cost += d
+            j = node >> 1
+            if node & 1:
+                key = holding.get(j)
+                if key is None:
+                    return INFINITY, 0.0, 0.0
+                if ordered and key != min(holding.values()):
+                    return INFINITY, 0.0, 0.0
+                del holding[j]
+                load -= weights[j]
+                late = now + cost * spc - deadlines[j]
+                if late > 0:
+                    lateness += late
+                if j >= n_carried:
+                    reward += search.payouts[j]
+            else:
+                if j in holding:
+                    return INFINITY, 0.0, 0.0
+                load += weights[j]
+                if load > search.capacity + 1e-9:
+                    return INFINITY, 0.0, 0.0
+                holding[j] = keys[j] + (seq,)
+                seq += 1
+            prev = node
+        if holding:
+            return INFINITY, 0.0, 0.0
+        self.evaluations += 1
+        return cost + self.late_weight * lateness - self.payout_weight * reward, cost, lateness
+
+    def _tour(self, search: _Search) -> Tour:
+        score, cost, lateness = search.best
+        stops = [(DROPOFF if node & 1 else PICKUP, search.jobs[node >> 1]) for node in search.best_order]
+        return Tour(stops, cost, lateness, score)
+
+    # -------------------------
+    # Búsqueda local
+    # -------------------------
+    def _improve(self, search: _Search, now: float, limit: float) -> None:
+        rng = self.random
+        clock = time.perf_counter
+        max_evaluations = self.max_evaluations
+        optional = list(search.optional_jobs())
+        while search.stalled < self.stall_limit and (
+                clock() < limit if max_evaluations is None else self.evaluations < max_evaluations):
+            order = search.order
+            n = len(order)
+            move = rng.random()
+            if optional and (move < 0.25 or n < 2):
+                candidate = self._toggle(search, order, rng.choice(optional), now)
+            elif n < 2:
+                search.stalled = self.stall_limit
+                break
+            elif move < 0.6:
+                candidate = list(order)
+                node = candidate.pop(rng.randrange(n))
+                candidate.insert(rng.randrange(n), node)
+            elif move < 0.8:
+                candidate = list(order)
+                i, k = rng.randrange(n), rng.randrange(n)
+                candidate[i], candidate[k] = candidate[k], candidate[i]
+            else:
+                i, k = sorted((rng.randrange(n), rng.randrange(n)))
+                candidate = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+
+            result = self._evaluate(search, candidate, now)
+            if result[0] <= search.score:
+                improved = result[0] < search.score - 1e-9
+                search.order, search.score = candidate, result[0]
+                if result[0] < search.best[0] - 1e-9:
+                    search.best_order, search.best = list(candidate), result
+                search.stalled = 0 if improved else search.stalled + 1
+            else:
+                search.stalled += 1
+
+    def _toggle(self, search: _Search, order: List[int], j: int, now: float) -> List[int]:
+        """Quita el pedido opcional j del recorrido o lo inserta en su mejor lugar."""
+        pickup, dropoff = 2 * j, 2 * j + 1
+        if pickup in order:
+            return [node for node in order if node != pickup and node != dropoff]
+        best, best_score = order, INFINITY
+        n = len(order)
+        for i in range(n + 1):
+            with_pickup = order[:i] + [pickup] + order[i:]
+            for k in range(i + 1, n + 2):
+                candidate = with_pickup[:k] + [dropoff] + with_pickup[k:]
+                score = self._evaluate(search, candidate, now)[0]
+                if score < best_score:
+                    best, best_score = candidate, score
+        return best
@@ -0,0 +1,483 @@
+# Logic/simulation.py
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+from Logic.clock import Clock
+from Logic.agent_table import AgentTable
+from Logic.entity.city_map import CityMap
+from Logic.entity.courier import Courier
+from Logic.entity.ia import Ia
+from Logic.entity.job import Job
+from Logic.distance_field import DistanceFieldCache
+from Logic.pathfinder import PathFinder, WeatherCost
+from Logic.incremental_planner import IncrementalPlanner
+from Logic.route_optimizer import RouteOptimizer
+from Logic.weather_simulator import WeatherSimulator
+from Logic.score_manager import ScoreManager
+from Data.game_service import GameService
+
+# Direcciones del sprite (las mismas que usa la vista)
+LEFT, RIGHT, UP, DOWN, WHEELIE_LEFT, WHEELIE_RIGHT = 0, 1, 2, 3, 4, 5
+
+# Evaluaciones por actualización del optimizador de recorridos en sesiones
+# con semilla (equivale a su presupuesto de 2 ms en una máquina típica)
+ROUTE_EVALUATIONS = 250
+
+
+class PlayerInput:
+    """
+    Decisiones del jugador en un tick: desplazamiento, volver sobre sus
+    pasos y las acciones sobre el pedido cercano (recoger, cancelar,
+    entregar). ``direction`` es solo para el sprite.
+    """
+
+    __slots__ = ("dx", "dy", "back", "pick", "cancel", "deliver", "direction")
+
+    def __init__(self, dx: int = 0, dy: int = 0, back: bool = False, pick: bool = False,
+                 cancel: bool = False, deliver: bool = False, direction: Optional[int] = None):
+        self.dx = dx
+        self.dy = dy
+        self.back = back
+        self.pick = pick
+        self.cancel = cancel
+        self.deliver = deliver
+        self.direction = direction
+
+
+IDLE = PlayerInput()
+
+
+class Simulation:
+    """
+    Núcleo del juego sin pygame: reloj de la sesión, movimiento del
+    courier y de la IA, recogidas, entregas, cancelaciones, pérdida de
+    pedidos, clima y puntaje.
+
+    Avanza en ticks fijos de ``tick`` segundos con ``step`` (un tick) o
+    ``advance`` (acumula el dt de un frame y da los ticks que correspondan).
+    Cada tick guarda en ``events`` lo que pasó ("catch", "error", "acept",
+    "remove", "fall") para que la vista reproduzca los sonidos. ``run``
+    juega una sesión completa a máxima velocidad desde un flujo de
+    entradas, para balanceo, evaluación de la IA y pruebas.
+
+    El tiempo de juego sale de ``clock`` (por defecto, el del servicio de
+    juego): cada tick lo avanza ``tick`` segundos y con un ``ManualClock``
+    la sesión no depende del reloj de pared. ``advance`` multiplica el dt
+    del frame por ``clock.rate``, así un ``ScaledClock`` acelera la partida.
+
+    Puede haber varias IAs (``add_ia``): comparten la tabla de agentes
+    ``agents`` y en cada paso de IA todas se mueven con un solo
+    ``AgentTable.step``; el reparto de pedidos evita que persigan el mismo.
+
+    Si hay ``recorder`` (ver Logic/replay.py), cada tick le pasa la entrada
+    del jugador y el cierre de la sesión le pasa el puntaje final.
+    """
+
+    def __init__(
+        self,
+        city_map: CityMap,
+        courier: Courier,
+        ia: Ia,
+        game_service: GameService,
+        weather_simulator: Optional[WeatherSimulator] = None,
+        score_manager: Optional[ScoreManager] = None,
+        session_duration: float = 15 * 60,
+        tick: float = 1 / 60,
+        move_delay: float = 0.15,
+        ia_move_delay: float = 0.15,
+        weather_interval: float = 0.1,
+        max_catch_up: int = 5,
+        clock: Optional[Clock] = None,
+        agents: Optional[AgentTable] = None,
+        seed: Optional[int] = None,
+    ):
+        self.city_map = city_map
+        self.courier = courier
+        self.ia = ia
+        self.game_service = game_service
+        self.weather_simulator = weather_simulator
+        self.score_manager = score_manager
+        self.session_duration = session_duration
+        self.tick = tick
+        self.move_delay = move_delay
+        self.ia_move_delay = ia_move_delay
+        self.weather_interval = weather_interval
+        self.max_catch_up = max_catch_up
+        self.clock = clock if clock is not None else game_service.clock
+        self.seed = seed
+        self.recorder = None
+        # Estado físico de las IAs en columnas; la primera es self.ia
+        self.agents = agents if agents is not None else AgentTable()
+        self.ias: List[Ia] = []
+        if ia is not None:
+            self.agents.adopt(ia)
+            self.ias.append(ia)
+
+        # Estado de la sesión
+        self.state = "running"
+        self.finish_reason: Optional[str] = None
+        self.final_stats: Optional[Dict[str, Any]] = None
+        self.elapsed_time = 0.0
+        self.remaining_time = float(session_duration)
+        self.goal = city_map.goal
+        self.earned = 0.0
+        self.ticks = 0
+        self.events: List[str] = []
+        self.prev_tile = None  # tipo de celda del dropoff del último pedido recogido
+        self.player_interacting = False
+
+        # Temporizadores
+        self.move_timer = 0.0
+        self.ia_move_timer = 0.0
+        self.weather_timer = 0.0
+        self._accumulator = 0.0
+
+        # Dirección del sprite de cada agente
+        self.courier_direction = RIGHT
+        self.ia_direction = RIGHT
+
+    @classmethod
+    def create(
+        cls,
+        city_map: CityMap,
+        jobs: Iterable[Job],
+        weather_config: Dict[str, Any],
+        weather: Iterable = (),
+        ia_mode: Optional[int] = None,
+        score_manager: Optional[ScoreManager] = None,
+        clock: Optional[Clock] = None,
+        seed: Optional[int] = None,
+        **options,
+    ) -> "Simulation":
+        """
+        Arma el mundo completo (courier, IA, rutas, clima y servicio de
+        juego), todo leyendo el mismo reloj (por defecto, el de pared).
+
+        Con ``seed`` la sesión es reproducible: siembra el generador global
+        (clima, pérdida de pedidos, IA fácil) antes de crear el mundo y el
+        optimizador de recorridos usa esa semilla y un presupuesto en
+        evaluaciones en vez de segundos.
+        """
+        if seed is not None:
+            random.seed(seed)
+        weather_simulator = WeatherSimulator(weather_config, clock)
+        agents = AgentTable()
+        courier = Courier(start_pos=(0, 0), max_weight=10, clock=clock, agents=agents)
+        distance_fields = DistanceFieldCache(city_map)
+        # A* levemente ponderado: rutas a <1% del optimo con muchas menos expansiones
+        pathfinder = PathFinder(city_map, WeatherCost(city_map, weather_simulator), heuristic_weight=1.1)
+        ia = Ia(start_pos=(0, 0), max_weight=10, city_map=city_map,
+                distance_fields=distance_fields, pathfinder=pathfinder,
+                planner=IncrementalPlanner(city_map, weather_simulator=weather_simulator),
+                route_optimizer=RouteOptimizer(pathfinder, clock=clock, seed=seed,
+                                               max_evaluations=None if seed is None else ROUTE_EVALUATIONS),
+                clock=clock, agents=agents)
+        if ia_mode is not None:
+            ia.set_mode(ia_mode)
+        game_service = GameService(jobs, weather, city_map, courier, ia, distance_fields, pathfinder, clock)
+        return cls(city_map, courier, ia, game_service, weather_simulator,
+                   score_manager if score_manager is not None else ScoreManager(), agents=agents, seed=seed,
+                   **options)
+
+    def add_ia(self, start_pos=(0, 0), mode: int = 3) -> Ia:
+        """
+        Suma otra IA que comparte mapa, rutas y reloj con la primera. Con
+        más de una IA todas pasan al reparto central de pedidos.
+        """
+        base = self.ia
+        weather_simulator = self.weather_simulator
+        ia = Ia(start_pos=start_pos, max_weight=base.max_weight, city_map=self.city_map,
+                distance_fields=base.distance_fields, pathfinder=base.pathfinder,
+                planner=IncrementalPlanner(self.city_map, weather_simulator=weather_simulator),
+                route_optimizer=RouteOptimizer(
+                    base.pathfinder, clock=self.clock,
+                    seed=None if self.seed is None else self.seed + len(self.ias),
+                    max_evaluations=None if self.seed is None else ROUTE_EVALUATIONS),
+                clock=self.clock, agents=self.agents)
+        ia.weather = base.weather
+        ia.set_mode(mode)
+        self.ias.append(ia)
+        for agent in self.ias:
+            self.game_service.register_agent(agent)
+        return ia
+
+    # -------------------------
+    # Avance del tiempo
+    # -------------------------
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    def advance(self, dt: float, player: PlayerInput = IDLE) -> int:
+        """
+        Suma el dt de un frame (escalado por ``clock.rate``) y da los ticks
+        fijos que caben (como mucho ``max_catch_up`` por unidad de escala).
+        Los eventos de todos ellos quedan en ``events``. Devuelve cuántos
+        ticks se dieron.
+        """
+        rate = self.clock.rate
+        self._accumulator += dt * rate
+        max_steps = self.max_catch_up * max(1, math.ceil(rate))
+        events: List[str] = []
+        steps = 0
+        while self._accumulator >= self.tick and steps < max_steps and self.running:
+            self._accumulator -= self.tick
+            self.step(player)
+            events.extend(self.events)
+            steps += 1
+        if steps >= max_steps:
+            # Frame muy largo: se descarta el atraso en vez de acumularlo
+            self._accumulator = 0.0
+        self.events = events
+        return steps
+
+    def step(self, player: PlayerInput = IDLE) -> List[str]:
+        """Avanza un tick fijo con la entrada dada y devuelve sus eventos."""
+        self.events = []
+        if not self.running:
+            return self.events
+        if self.recorder is not None:
+            self.recorder.input(self.ticks, player)
+        dt = self.tick
+        self.ticks += 1
+        self.clock.advance(dt)
+
+        self.elapsed_time += dt
+        self.remaining_time = max(0.0, self.session_duration - self.elapsed_time)
+        if self.remaining_time <= 0.0:
+            self.finish("time_up")
+            return self.events
+        if self.earned >= self.goal:
+            self.finish("total_earned")
+            return self.events
+
+        self._update_world(dt)
+        self._update_courier(dt, player)
+        self._update_ia(dt)
+
+        defeat_reason = getattr(self.courier, "defeat_reason", None)
+        if defeat_reason:
+            self.finish(defeat_reason)
+        return self.events
+
+    def run(self, inputs: Iterable[Optional[PlayerInput]] = (), max_ticks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Juega la sesión tick a tick con las entradas dadas (None o el fin
+        del flujo equivalen a no tocar nada) hasta que termine o se llegue a
+        max_ticks. Devuelve las estadísticas finales.
+        """
+        inputs = iter(inputs)
+        step = self.step
+        ticks = 0
+        while self.running and (max_ticks is None or ticks < max_ticks):
+            player = next(inputs, None)
+            step(player if player is not None else IDLE)
+            ticks += 1
+        return self.final_stats if self.final_stats is not None else self.stats()
+
+    # -------------------------
+    # Fin de la sesión
+    # -------------------------
+    def stats(self) -> Dict[str, Any]:
+        courier = self.courier
+        return {
+            "time_spent": self.elapsed_time,
+            "time_left": self.remaining_time,
+            "earned": getattr(courier, "total_earned", self.earned),
+            "goal": self.goal,
+            "reputation": getattr(courier, "reputation", 0),
+            "delivered": len(getattr(courier, "delivered_jobs", [])),
+            "reason": self.finish_reason,
+        }
+
+    def finish(self, reason: str = "manual") -> Dict[str, Any]:
+        """Cierra la sesión, calcula el puntaje final y devuelve las estadísticas."""
+        if not self.running:
+            return self.final_stats
+        self.elapsed_time = min(self.elapsed_time, float(self.session_duration))
+        self.remaining_time = max(0.0, self.session_duration - self.elapsed_time)
+        self.earned = getattr(self.courier, "total_earned", self.earned)
+        self.state = "finished"
+        self.finish_reason = reason
+        self.final_stats = self.stats()
+        if self.score_manager is not None:
+            breakdown = self.score_manager.finalize(self.remaining_time, self.session_duration)
+            self.final_stats["score"] = breakdown.as_dict()
+        if self.recorder is not None:
+            self.recorder.finish(self.ticks, reason, self.final_stats.get("score"))
+            self.recorder = None
+        return self.final_stats
+
+    def close(self) -> None:
+        """
+        Suelta los listeners que el motor de rutas registró en el mapa y en
+        el clima. Hace falta cuando el mapa sobrevive a la sesión (lotes que
+        juegan muchas sesiones sobre el mismo CityMap); después de cerrar,
+        la simulación ya no debe avanzar.
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+        engines = [self.game_service.distance_fields, self.game_service.pathfinder]
+        for ia in self.ias:
+            engines += (ia.distance_fields, ia.pathfinder, ia.planner)
+        # Quitar un listener dos veces no falla: los motores compartidos
+        # entre IAs no necesitan tratarse aparte
+        for engine in engines:
+            if engine is not None:
+                engine.detach()
+
+    # -------------------------
+    # Mundo: pedidos y clima
+    # -------------------------
+    def _update_world(self, dt: float) -> None:
+        game_service = self.game_service
+        game_service.update_jobs(self.clock.now())
+        game_service.dispatch_jobs()
+
+        self.weather_timer += dt
+        if self.weather_timer >= self.weather_interval and self.weather_simulator is not None:
+            self.weather_timer = 0.0
+            self.weather_simulator.update()
+            condition = self.weather_simulator.current_condition
+            self.courier.weather = condition
+            for ia in self.ias:
+                ia.weather = condition
+
+    # -------------------------
+    # Courier (jugador)
+    # -------------------------
+    def _update_courier(self, dt: float, player: PlayerInput) -> None:
+        self.move_timer += dt
+        if self.move_timer < self.move_delay:
+            return
+        courier = self.courier
+        self._handle_job(self.game_service.job_most_nearly(courier.position), player)
+
+        if player.back:
+            x, y = self.game_service.get_steps()
+            courier.move_courier(self.city_map.width, self.city_map.height, self.city_map, x, y, False)
+            self.move_timer = 0.0
+            return
+
+        dx, dy = player.dx, player.dy
+        if player.direction is not None:
+            self.courier_direction = player.direction
+        if dx or dy:
+            self.game_service.include_new_step(courier.position)
+            courier.move_courier(self.city_map.width, self.city_map.height, self.city_map, dx, dy, True)
+            self.move_timer = 0.0
+        elif courier.stamina < courier.stamina_max:
+            courier.recover_stamina(1.0)
+
+    def _handle_job(self, job: Optional[Job], player: PlayerInput) -> None:
+        """Pérdida aleatoria y aceptación, cancelación o entrega del pedido cercano."""
+        courier = self.courier
+        game_service = self.game_service
+        score_manager = self.score_manager
+        inventory = courier.inventory
+
+        if len(inventory.get_all()) > 0 and courier.posibility_lose_job():
+            lost_job = inventory.random_job()
+            if lost_job:
+                game_service.set_last_job(lost_job)
+                inventory.remove_job(lost_job)
+                self.events.append("fall")
+                if score_manager is not None:
+                    score_manager.register_cancellation(lost_job)
+                    courier.adjust_reputation(-6)  # posibilidad de extraviar un pedido
+
+        if job is None:
+            return
+
+        if player.pick and not inventory.exist(job):
+            if courier.pick_job(job):
+                x, y = job.dropoff
+                # Tipo de celda del dropoff antes de que cambie
+                self.prev_tile = self.city_map.tiles[y][x]
+                game_service.take_job(job)  # lo sacamos de la lista global
+                self.events.append("catch")
+            else:
+                self.events.append("error")
+
+        if player.cancel:
+            if inventory.exist(job):
+                if inventory.peek_next() is job:
+                    game_service.set_last_job(job)
+                    inventory.remove_job(job)
+                    self.events.append("remove")
+                    if score_manager is not None:
+                        score_manager.register_cancellation(job)
+                        courier.adjust_reputation(-4)  # Penaliza reputación por cancelación
+            else:
+                self.events.append("error")
+
+        if player.deliver and inventory.exist(job):
+            if inventory.peek_next() is job:
+                game_service.set_last_job(job)
+                self.events.append("acept")
+                delivery_result = courier.deliver_job(job)
+                if score_manager is not None:
+                    score_manager.register_delivery(job, delivery_result)
+                self.earned += float(delivery_result.get("payout_applied", getattr(job, "payout", 0.0)))
+            else:
+                self.events.append("error")
+
+    # -------------------------
+    # IA
+    # -------------------------
+    def _update_ia(self, dt: float) -> None:
+        ias = self.ias
+        if not ias:
+            return
+        self.ia_move_timer += dt
+        if self.ia_move_timer < self.ia_move_delay:
+            return
+        self.ia_move_timer = 0.0
+
+        # La estrategia solo se consulta cuando las IAs realmente se mueven;
+        # el movimiento y la energía de todas se aplican en un solo paso
+        jobs = self.game_service.jobs
+        rows, dxs, dys = [], [], []
+        for ia in ias:
+            direction, target = ia.next_movement_ia(jobs, self.city_map)
+            if ia is self.ia and direction in (UP, DOWN, WHEELIE_LEFT, WHEELIE_RIGHT):
+                self.ia_direction = direction
+            rows.append(ia._agent_row)
+            if target is None:
+                dxs.append(0)
+                dys.append(0)
+            else:
+                x, y = ia.position
+                dxs.append(target[0] - x)
+                dys.append(target[1] - y)
+        # Igual que el courier: la IA que no avanza recupera energía
+        self.agents.step(rows, dxs, dys, self.city_map, ias[0].weather, recover=1.0)
+
+        if not self.player_interacting:
+            game_service = self.game_service
+            for ia in ias:
+                self._handle_job_ia(ia, game_service.job_most_nearly_ia(ia.position, ia))
+
+    def _handle_job_ia(self, ia: Ia, job: Optional[Job]) -> None:
+        """Recogida y entrega automáticas del pedido cercano a una IA."""
+        if job is None:
+            return
+        if not ia.inventory.exist(job):
+            if ia.pick_job(job):
+                # Objetivo de entrega hasta completarla
+                ia.prev = job
+                self.game_service.take_job(job)
+                self.events.append("catch")
+            else:
+                self.events.append("error")
+                return
+
+        drop_x, drop_y = job.dropoff
+        ia_x, ia_y = ia.position
+        # Entrega con rango flexible: dentro de 5 casillas del dropoff
+        if ia.inventory.peek_next() is job and abs(ia_x - drop_x) + abs(ia_y - drop_y) <= 5:
+            self.game_service.set_last_job_ia(job)
+            self.events.append("acept")
+            ia.deliver_job(job)
+            ia.prev = None
@@ -0,0 +1,156 @@
+# Logic/spatial_index.py
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+Position = Tuple[int, int]
+
+
+class SpatialHash:
+    """
+    Índice espacial por cubetas cuadradas de ``bucket_size`` celdas.
+
+    Cada elemento guarda su posición y un orden de desempate (por ejemplo
+    su índice en la lista original), así las consultas devuelven el mismo
+    ganador que un recorrido lineal. Las consultas solo visitan las
+    cubetas que tocan el radio buscado.
+    """
+
+    def __init__(self, bucket_size: int = 8):
+        self.bucket_size = max(1, bucket_size)
+        self._buckets: Dict[Tuple[int, int], Dict[Hashable, Tuple[int, int, int]]] = {}
+        self._items: Dict[Hashable, Tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+
+    def _bucket_of(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self.bucket_size, y // self.bucket_size
+
+    # -------------------------
+    # Altas, bajas y movimientos
+    # -------------------------
+    def insert(self, item: Hashable, position: Position, order: int = 0) -> None:
+        """Agrega item en position; si ya estaba, lo mueve."""
+        if item in self._items:
+            self.remove(item)
+        x, y = int(position[0]), int(position[1])
+        entry = (x, y, order)
+        self._items[item] = entry
+        self._buckets.setdefault(self._bucket_of(x, y), {})[item] = entry
+
+    def remove(self, item: Hashable) -> bool:
+        entry = self._items.pop(item, None)
+        if entry is None:
+            return False
+        key = self._bucket_of(entry[0], entry[1])
+        bucket = self._buckets[key]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[key]
+        return True
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._items.clear()
+
+    def position_of(self, item: Hashable) -> Optional[Position]:
+        entry = self._items.get(item)
+        return (entry[0], entry[1]) if entry is not None else None
+
+    def order_of(self, item: Hashable) -> Optional[int]:
+        entry = self._items.get(item)
+        return entry[2] if entry is not None else None
+
+    def items(self) -> List[Any]:
+        return list(self._items)
+
+    # -------------------------
+    # Consultas
+    # -------------------------
+    def query_radius(self, position: Position, radius: float) -> List[Tuple[Any, float]]:
+        """
+        Elementos a distancia euclidiana <= radius de position, como
+        (item, distancia) ordenados por distancia y luego por orden.
+        """
+        px, py = position
+        radius_sq = radius * radius
+        size = self.bucket_size
+        bx0, by0 = int((px - radius) // size), int((py - radius) // size)
+        bx1, by1 = int((px + radius) // size), int((py + radius) // size)
+
+        found = []
+        buckets = self._buckets
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                bucket = buckets.get((bx, by))
+                if not bucket:
+                    continue
+                for item, (x, y, order) in bucket.items():
+                    d_sq = (x - px) * (x - px) + (y - py) * (y - py)
+                    if d_sq <= radius_sq:
+                        found.append((d_sq, order, item))
+        found.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(item, d_sq ** 0.5) for d_sq, _, item in found]
+
+    def nearest(
+        self,
+        position: Position,
+        k: int = 1,
+        max_radius: Optional[float] = None,
+    ) -> List[Tuple[Any, float]]:
+        """
+        Los k elementos más cercanos (opcionalmente dentro de max_radius),
+        como (item, distancia) ordenados por distancia y luego por orden.
+
+        Recorre anillos de cubetas alrededor de position y se detiene cuando
+        el anillo siguiente ya no puede mejorar al k-ésimo encontrado.
+        """
+        if k <= 0 or not self._items:
+            return []
+        px, py = position
+        size = self.bucket_size
+        cbx, cby = int(px // size), int(py // size)
+        limit_sq = max_radius * max_radius if max_radius is not None else float("inf")
+        # Distancia de position al borde más cercano de su propia cubeta
+        inner = min(px - cbx * size, (cbx + 1) * size - px, py - cby * size, (cby + 1) * size - py)
+
+        # Anillos necesarios para cubrir todas las cubetas ocupadas
+        max_ring = 0
+        for bx, by in self._buckets:
+            max_ring = max(max_ring, abs(bx - cbx), abs(by - cby))
+
+        found = []
+        buckets = self._buckets
+        for ring in range(max_ring + 1):
+            if ring > 0:
+                # Cota inferior de la distancia a cualquier celda del anillo
+                bound = (ring - 1) * size + inner
+                bound_sq = bound * bound
+                if bound_sq > limit_sq or (len(found) >= k and bound_sq > found[k - 1][0]):
+                    break
+            for key in self._ring(cbx, cby, ring):
+                bucket = buckets.get(key)
+                if not bucket:
+                    continue
+                for item, (x, y, order) in bucket.items():
+                    d_sq = (x - px) * (x - px) + (y - py) * (y - py)
+                    if d_sq <= limit_sq:
+                        found.append((d_sq, order, item))
+            found.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(item, d_sq ** 0.5) for d_sq, _, item in found[:k]]
+
+    @staticmethod
+    def _ring(cbx: int, cby: int, ring: int) -> List[Tuple[int, int]]:
+        """Cubetas a distancia de Chebyshev exactamente ring de (cbx, cby)."""
+        if ring == 0:
+            return [(cbx, cby)]
+        keys = []
+        for bx in range(cbx - ring, cbx + ring + 1):
+            keys.append((bx, cby - ring))
+            keys.append((bx, cby + ring))
+        for by in range(cby - ring + 1, cby + ring):
+            keys.append((cbx - ring, by))
+            keys.append((cbx + ring, by))
+        return keys
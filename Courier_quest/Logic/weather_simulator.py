@@ -1,14 +1,18 @@
 # Logic/weather_simulator.py
 import random
-import time
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Callable, Optional
+from Logic.clock import Clock, SYSTEM_CLOCK
 from Logic.entity.weather_burst import WeatherBurst
 
+# Callback de cambio de condición: (condición_anterior, condición_nueva)
+ConditionListener = Callable[[str, str], None]
+
 class WeatherSimulator:
     """Simulador de clima con temporizadores y transiciones suaves"""
     
-    def __init__(self, weather_config: Dict[str, Any]):
+    def __init__(self, weather_config: Dict[str, Any], clock: Optional[Clock] = None):
         self.config = weather_config
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
         self.current_condition = weather_config["initial"]["condition"]
         self.current_intensity = weather_config["initial"]["intensity"]
         
@@ -22,11 +26,12 @@ class WeatherSimulator:
         self.target_multiplier = self.current_speed_multiplier
         
         # Temporizador
-        self.burst_start_time = time.time()
+        self.burst_start_time = self.clock.now()
         self.burst_duration = 60 
         self.transition_duration = random.uniform(3, 5)  
         self.is_transitioning = False
         self.transition_start_time = 0
+        self._condition_listeners: List[ConditionListener] = []
         
         print(f"Simulador de clima iniciado: {self.current_condition} (dura {self.burst_duration:.1f}s)")
     
@@ -39,7 +44,7 @@ class WeatherSimulator:
         Actualiza el estado del clima y retorna:
         (condición_actual, intensidad_actual, multiplicador_actual, cambió_clima)
         """
-        current_time = time.time()
+        current_time = self.clock.now()
         elapsed = current_time - self.burst_start_time
         changed_weather = False
         
@@ -62,7 +67,7 @@ class WeatherSimulator:
     def _start_weather_transition(self):
         """Inicia la transición a un nuevo clima"""
         self.is_transitioning = True
-        self.transition_start_time = time.time()
+        self.transition_start_time = self.clock.now()
         
         # Elegir próximo clima usando Markov
         next_condition = self._simulate_weather_change()
@@ -93,19 +98,33 @@ class WeatherSimulator:
         
         return progress
     
+    def add_condition_listener(self, listener: ConditionListener) -> None:
+        """Registra un callback que se invoca al completarse un cambio de clima"""
+        if listener not in self._condition_listeners:
+            self._condition_listeners.append(listener)
+
+    def remove_condition_listener(self, listener: ConditionListener) -> None:
+        if listener in self._condition_listeners:
+            self._condition_listeners.remove(listener)
+
     def _complete_transition(self):
         """Completa la transición climática"""
+        previous_condition = self.current_condition
         self.current_condition = self.target_condition
         self.current_intensity = self.target_intensity
         self.current_speed_multiplier = self.target_multiplier
         self.is_transitioning = False
         
         # Reiniciar temporizador para nuevo burst
-        self.burst_start_time = time.time()
+        self.burst_start_time = self.clock.now()
         self.burst_duration = 60
         self.transition_duration = random.uniform(3, 5)
         
         print(f"Transición completada: {self.current_condition} (mult: {self.current_speed_multiplier:.2f}) - Dura {self.burst_duration:.1f}s")
+
+        if previous_condition != self.current_condition:
+            for listener in list(self._condition_listeners):
+                listener(previous_condition, self.current_condition)
     
     def _simulate_weather_change(self) -> str:
         """Simula cambio climático usando cadena de Markov"""
@@ -142,7 +161,7 @@ class WeatherSimulator:
     
     def get_weather_info(self) -> Dict[str, Any]:
         """Obtiene información completa del clima actual"""
-        current_time = time.time()
+        current_time = self.clock.now()
         time_remaining = max(0, self.burst_duration - (current_time - self.burst_start_time))
         
         return {
@@ -157,5 +176,5 @@ class WeatherSimulator:
     def _get_transition_progress(self) -> float:
         if not self.is_transitioning:
             return 0
-        lapso = time.time() - self.transition_start_time
+        lapso = self.clock.now() - self.transition_start_time
         return min(1.0, lapso / self.transition_duration)
\ No newline at end of file
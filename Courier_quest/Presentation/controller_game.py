@@ -1,16 +1,22 @@
 from Data.api_service import APIService
-from Data.game_service import GameService
 from Logic.entity.city_map import CityMap
 from Logic.entity.job import Job
 from Logic.entity.weather_burst import WeatherBurst
-from Logic.entity.courier import Courier
 from Logic.entity.ia import Ia
-
-from Logic.weather_simulator import WeatherSimulator  
+from Logic.clock import ManualClock
+from Logic.simulation import Simulation
 from Logic.score_manager import ScoreManager
+from Logic.replay import Recorder
+from itertools import islice
+from pathlib import Path
+from typing import List
+import random
 import time
 import json
 
+# Grabación de la última partida (se repite con python -m Logic.replay)
+RECORD_PATH = Path(__file__).resolve().parent.parent / "saves" / "last_session.cqr"
+
 class controller_game:
     """
     Motor del juego: carga mapa, pedidos, clima dinámico e inicializa Courier.
@@ -22,13 +28,25 @@ class controller_game:
         self.game_service = None
         self.city_map = None
         self.jobs = []
+        self.job_feed = None  # pedidos crudos aún sin leer del feed
+        self.feed_batch_size = 256  # pedidos que se leen del feed por frame
+        self.refresh_interval = 5.0  # segundos mínimos entre consultas al feed
+        self.last_refresh = 0.0
         self.weather = []
         self.courier = None
         self.ia = None
+        self.ias = []  # todas las IAs; la primera es self.ia
+        self.ia_count = 1  # IAs rivales; con más de una se reparten los pickups
+        self.ia_mode = 3  # dificultad de las IAs (1 fácil, 2 medio, 3 difícil)
+        self.distance_fields = None
+        self.pathfinder = None
         self.weather_simulator = None  # Nuevo atributo
-        self.last_weather_update = 0
-        self.weather_update_interval = 0.1  # Actualizar clima cada 100ms
+        self.simulation = None  # núcleo del juego sin pygame
         self.score_manager = ScoreManager()
+        self.seed = None  # semilla de la partida (clima, pérdidas, IA)
+        self.record_path = RECORD_PATH  # None para no grabar
+        self.recorder = None
+        self._initial_raw_jobs = []
         
     def _deep_unwrap(self, resp: dict) -> dict:
         """
@@ -66,7 +84,24 @@ class controller_game:
     
     def job_nearly_ia(self):
             return self.game_service.job_most_nearly_ia(self.ia.position)
-    
+
+    def add_ia(self, start_pos=(0, 0), mode: int = 3) -> Ia:
+        """
+        Crea otra IA sobre el mismo mapa. Con más de una IA todas pasan al
+        reparto central de pedidos para no perseguir el mismo pickup.
+        """
+        ia = self.simulation.add_ia(start_pos, mode)
+        self.ias = self.simulation.ias
+        return ia
+
+    def best_route(self, agent=None):
+        """Mejor recorrido conocido (por defecto del courier)."""
+        return self.game_service.best_route(agent if agent is not None else self.courier)
+
+    def route_hint(self, target, position=None):
+        """Camino sugerido desde position (por defecto, el courier) hasta target."""
+        return self.game_service.route_hint(position if position is not None else self.courier.position, target)
+
     def set_last_job(self, job):
         self.game_service.set_last_job(job)
         
@@ -95,14 +130,7 @@ class controller_game:
         print(f"Mapa cargado: {self.city_map.width}x{self.city_map.height}")
         
           # 2) Pedidos
-        print("Cargando pedidos...")
-        jobs_resp = self.api.fetch("city/jobs")
-        raw_jobs = self._deep_unwrap(jobs_resp)
-        raw_jobs = self._find_list_of_dicts(raw_jobs)
-        if raw_jobs is None:
-            raise RuntimeError("city/jobs no contiene lista de pedidos")
-        print(f"Pedidos cargados: {len(raw_jobs)}")
-        self.jobs = [Job(**d) for d in raw_jobs]
+        self.jobs = self._start_job_feed()
 
 
         # 3) Clima DINÁMICO - CORREGIDO
@@ -110,17 +138,37 @@ class controller_game:
         weather_resp = self.api.fetch("city/weather")
         raw_weather = self._deep_unwrap(weather_resp)
         
-        # Crear el simulador de clima (nombre corregido)
-        self.weather_simulator = WeatherSimulator(raw_weather)
-        self.last_weather_update = time.time()
-        
+        # 4) Mundo: courier, IA, rutas, clima y servicio de juego. El reloj
+        # de juego avanza con los ticks y la semilla fija el azar, así la
+        # partida se puede grabar y repetir igual
+        if self.seed is None:
+            self.seed = random.randrange(1 << 32)
+        clock = ManualClock(time.time())
+        self.simulation = Simulation.create(self.city_map, self.jobs, raw_weather,
+                                            ia_mode=self.ia_mode, score_manager=self.score_manager,
+                                            clock=clock, seed=self.seed)
+        for _ in range(self.ia_count - 1):
+            self.add_ia(mode=self.ia_mode)
+        if self.record_path is not None:
+            self.recorder = Recorder(str(self.record_path), {
+                "seed": self.seed,
+                "start": clock.now(),
+                "city_map": raw_map,
+                "weather": raw_weather,
+                "jobs": self._initial_raw_jobs,
+            })
+            self.recorder.attach(self.simulation)
+        self.weather_simulator = self.simulation.weather_simulator
+        self.courier = self.simulation.courier
+        self.ia = self.simulation.ia
+        self.ias = self.simulation.ias
+        self.pathfinder = self.simulation.game_service.pathfinder
+        self.distance_fields = self.simulation.game_service.distance_fields
+
         # Generar bursts iniciales para compatibilidad
         self.weather = self._generate_initial_bursts()
+        self.simulation.game_service.weather = self.weather
         print(f"Clima dinámico inicializado: {self.weather_simulator.current_condition}")
-
-        # 4) Courier
-        self.courier = Courier(start_pos=(0, 0), max_weight=10)
-        self.ia = Ia(start_pos=(0, 0), max_weight=10,city_map=self.city_map)
         print(f"Courier inicializado{self.courier.position}  e IA inicializada {self.ia.position}.")
 
     def _generate_initial_bursts(self):
@@ -140,21 +188,36 @@ class controller_game:
     def start(self):
         """Arranca la carga del mundo y ejecuta el juego."""
         self.load_world()
-        self.game_service = GameService(self.jobs, self.weather, self.city_map, self.courier , self.ia)
+        self.game_service = self.simulation.game_service
+        # La lista visible es la de pedidos ya liberados
+        self.jobs = self.game_service.jobs
         print("Juego iniciado correctamente.")
 
+    def close(self):
+        """Cierra la simulación al salir de la partida: suelta sus listeners del mapa."""
+        if self.simulation is not None:
+            self.simulation.close()
+
     def update(self):
-        """Mtodo principal de actualizacin del juego (llamar en cada frame)."""
+        """
+        Entrada/salida por frame: lee el feed de pedidos y lo refresca al
+        quedarse sin pedidos. Las reglas del juego avanzan en self.simulation.
+        """
         current_time = time.time()
 
-        if len(self.jobs) <= 0 and len(self.courier.inventory.get_all()) <= 0:
+        if self.game_service:
+            if self.job_feed is not None:
+                self._merge_jobs(self._pull_raw_jobs())
+                if self.job_feed is None:
+                    self._finish_merge()
+            pending = self.game_service.pending_jobs()
+        else:
+            pending = 0
+        if (len(self.jobs) <= 0 and pending <= 0 and self.job_feed is None
+                and len(self.courier.inventory.get_all()) <= 0
+                and current_time - self.last_refresh >= self.refresh_interval):
             self.refresh_jobs()
 
-        if current_time - self.last_weather_update >= self.weather_update_interval:
-            self._update_weather()
-            self.last_weather_update = current_time
-            self.courier.weather = self.weather_simulator.current_condition
-
     def _update_weather(self):
         """Actualiza el estado del clima."""
         if not self.weather_simulator:
@@ -173,18 +236,60 @@ class controller_game:
     def move_ia(self, dx, dy, record_step=True):
         self.ia.move_ia(self.city_map.width, self.city_map.height, self.city_map, dx, dy, record_step)
 
-    def new_jobs(self):
-        """Genera pedidos nuevos y actualiza la lista principal."""
+    def _pull_raw_jobs(self) -> List[dict]:
+        """Lee el siguiente lote crudo del feed en curso; lo cierra al agotarse."""
+        if self.job_feed is None:
+            return []
+        batch = list(islice(self.job_feed, self.feed_batch_size))
+        if len(batch) < self.feed_batch_size:
+            self.job_feed = None
+        return batch
+
+    def _open_job_feed(self) -> List[dict]:
+        """Abre el feed de city/jobs y devuelve su primer lote; el resto llega por frame."""
         print("Cargando pedidos...")
-        jobs_resp = self.api.fetch("city/jobs")
-        raw_jobs = self._deep_unwrap(jobs_resp)
-        raw_jobs = self._find_list_of_dicts(raw_jobs)
-        if raw_jobs is None:
+        self.last_refresh = time.time()
+        self.job_feed = iter(self.api.stream("city/jobs"))
+        batch = self._pull_raw_jobs()
+        if self.job_feed is None:
+            print(f"Pedidos en el feed: {len(batch)}")
+        else:
+            print(f"Pedidos en el feed: {len(batch)} (el resto se lee durante la partida)")
+        return batch
+
+    def _start_job_feed(self) -> List[Job]:
+        batch = self._open_job_feed()
+        if not batch:
             raise RuntimeError("city/jobs no contiene lista de pedidos")
-        print(f"Pedidos cargados: {len(raw_jobs)}")
-        self.jobs = [Job(**d) for d in raw_jobs]
-        if self.game_service:
-            self.game_service.set_jobs(self.jobs)
+        self._initial_raw_jobs = batch
+        return Job.from_dicts(batch)
+
+    def _merge_jobs(self, batch: List[dict]) -> None:
+        self.game_service.merge_jobs(batch)
+        if self.recorder is not None:
+            self.recorder.merge(batch)
+
+    def _finish_merge(self) -> None:
+        self.game_service.finish_merge()
+        if self.recorder is not None:
+            self.recorder.finish_merge()
+
+    def new_jobs(self):
+        """
+        Consulta el feed y mezcla por id con los pedidos actuales: solo se
+        crean los nuevos, se actualizan los que cambiaron y se retiran los
+        que ya no están (al terminar de leer el feed).
+        """
+        if not self.game_service:
+            self.jobs = self._start_job_feed()
+            return
+        self.game_service.begin_merge()
+        if self.recorder is not None:
+            self.recorder.begin_merge()
+        self._merge_jobs(self._open_job_feed())
+        if self.job_feed is None:
+            self._finish_merge()
+        self.jobs = self.game_service.jobs
 
     def refresh_jobs(self):
         """Carga una nueva lista de pedidos en la lista principal."""
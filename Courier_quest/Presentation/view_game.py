@@ -15,6 +15,8 @@ from Logic.entity.ia import Ia
 
 from Data.score_repository import ScoreRepository
 from Logic.score_manager import ScoreBreakdown
+from Logic.route_optimizer import PICKUP
+from Logic.simulation import PlayerInput, LEFT, RIGHT, UP, DOWN, WHEELIE_LEFT, WHEELIE_RIGHT
 
 CELL_SIZE = 20
 HUD_HEIGHT = 75
@@ -30,9 +32,12 @@ class View_game:
         pygame.init()
         pygame.mixer.init
         self.engine = controller_game()
-        self.engine.start()
         #Aqui se uede obtner la opcion que escoja el usuario 1 Facil 2 Medio 3 Dificil
-        self.engine.ia.set_mode(1)  # Modo de dificultad FACIL para la IA
+        # (antes de start: la grabación guarda el modo de cada IA al empezar)
+        self.engine.ia_mode = 1  # Modo de dificultad FACIL para la IA
+        self.engine.start()
+        # Reglas, reloj y puntaje viven en la simulación; la vista solo dibuja
+        self.sim = self.engine.simulation
         self.player_name = (player_name or "Player").strip() or "Player"
         self.resume_requested = resume
         self.return_to_menu = False
@@ -45,15 +50,6 @@ class View_game:
         pygame.display.set_caption("Courier Quest")
         self.clock = pygame.time.Clock()
 
-        self.move_timer = 0.0
-        self.move_delay = 0.15
-        self.current_direction = 1  
-        
-        self.ia_move_timer=0.0
-        self.ia_move_delay=0.15
-        self.current_direction_ia = 1 
-        
-        
 
         # Ruta de las imÃ¡genes 
         assets_dir = Path(__file__).parent.parent.parent / "src" / "assets"
@@ -87,26 +83,27 @@ class View_game:
         loaded = sorted(self.tile_images.keys())
         print(f"TILE_IMAGES cargadas: {loaded}")
 
+        # Capa estatica del mapa: se compone una vez y se repinta por regiones
+        self.map_layer = None
+        self._dirty_map_regions = []
+        self.engine.city_map.add_tile_listener(self._on_tile_changed)
+
         # Iconos de clima (puedes agregar imÃ¡genes especÃ­ficas para cada condiciÃ³n)
         self.weather_icons = {}
         self._load_weather_icons(tiles_dir)
 
         self.running = True
-        self.elapsed_time = 0.0
-        self.player_interacting = False
-        self.goal = self.engine.city_map.goal
-        self.earned = 0.0
-        self.state = "running"
         self.final_stats = None
-        self.session_duration = 15 * 60
-        self.remaining_time = float(self.session_duration)
 
         self.paused = False
         self.pause_options = ["Resume", "Save", "Main Menu", "Quit Game"]
         self.pause_index = 0
         self.pause_feedback = ""
-        self.prev = None
         self.prev_ia = None
+        self.route = None  # mejor recorrido conocido del courier
+        self.route_path = []  # camino sugerido hasta la próxima parada del courier
+        self._route_path_key = None
+        self.inventory_order = None  # orden del panel de inventario (None = llegada)
         self.pause_feedback_time = 0.0
         self.return_to_menu = False
         self.exit_game = False
@@ -121,6 +118,67 @@ class View_game:
         self.roar=True
         pygame.mixer.music.set_volume(0.3)
 
+    # Estado de la sesión: se lee y escribe en la simulación
+    @property
+    def state(self):
+        return self.sim.state
+
+    @state.setter
+    def state(self, value):
+        self.sim.state = value
+
+    @property
+    def elapsed_time(self):
+        return self.sim.elapsed_time
+
+    @elapsed_time.setter
+    def elapsed_time(self, value):
+        self.sim.elapsed_time = value
+
+    @property
+    def remaining_time(self):
+        return self.sim.remaining_time
+
+    @remaining_time.setter
+    def remaining_time(self, value):
+        self.sim.remaining_time = value
+
+    @property
+    def session_duration(self):
+        return self.sim.session_duration
+
+    @property
+    def earned(self):
+        return self.sim.earned
+
+    @earned.setter
+    def earned(self, value):
+        self.sim.earned = value
+
+    @property
+    def goal(self):
+        return self.sim.goal
+
+    @goal.setter
+    def goal(self, value):
+        self.sim.goal = value
+
+    @property
+    def prev(self):
+        return self.sim.prev_tile
+
+    @prev.setter
+    def prev(self, value):
+        self.sim.prev_tile = value
+
+    @property
+    def current_direction(self):
+        return self.sim.courier_direction
+
+    @property
+    def current_direction_ia(self):
+        return self.sim.ia_direction
+
     def _load_sounds(self, tiles_dir):  
       sounds_dict = {
         "catch": "entrega.mp3",
@@ -232,27 +290,18 @@ class View_game:
                 dt = self.clock.tick(FPS) / 1000.0
                 self._handle_events()
                 if self.state == "running" and not self.paused:
-                    self.elapsed_time += dt
-                    self.remaining_time = max(0.0, self.session_duration - self.elapsed_time)
-                    if self.remaining_time <= 0.0:
-                        self._finish_game(reason="time_up")
-                        
-                if self.state == "running" and not self.paused:
-                    if self.earned >= self.goal:
-                        self._finish_game(reason="total_earned")
-                        
-                if self.state == "running":
-                    if not self.paused:
-                        self.engine.update()
-                        self._update(dt)
-                        #Se hace separado para no intervernir con el jugador
-                        self._update_ia(dt)
-
-                    courier = self.engine.courier
-                    ia=self.engine.ia
-                    defeat_reason = getattr(courier, "defeat_reason", None)
-                    if defeat_reason and self.state == "running":
-                        self._finish_game(reason=defeat_reason)
+                    if self.roar:
+                        self.roar = False
+                        self.play_Sound("roar", 0)
+                    self.engine.update()
+                    self.sim.advance(dt, self._read_player_input())
+                    for event in self.sim.events:
+                        self.play_Sound(event, 0)
+                    if self.state == "running":
+                        self.route = self.engine.best_route()
+                        self._update_route_path()
+                    else:
+                        self._finish_game(reason=self.sim.finish_reason)
 
                 if self.state == "running":
                     self._draw()
@@ -264,6 +313,8 @@ class View_game:
                     self._draw_end_screen()
                 pygame.display.flip()
 
+            self.engine.city_map.remove_tile_listener(self._on_tile_changed)
+            self.engine.close()
             pygame.quit()
             return {"return_to_menu": self.return_to_menu, "exit_game": self.exit_game}
 
@@ -315,43 +366,25 @@ class View_game:
 
                 if getattr(self, "show_inventory", False):
                     if event.key == pygame.K_1:
-                        self.ordered_jobs = self.engine.courier.inventory.ordered_jobs("priority")
+                        self.inventory_order = "priority"
                     elif event.key == pygame.K_2:
-                        self.ordered_jobs = self.engine.courier.inventory.ordered_jobs("deadline")
+                        self.inventory_order = "deadline"
 
     def _finish_game(self, reason="manual"):
-        if self.state != "running":
+        if self.final_stats is not None:
             return
-        courier = self.engine.courier
-        self.elapsed_time = min(self.elapsed_time, float(self.session_duration))
-        self.remaining_time = max(0.0, self.session_duration - self.elapsed_time)
-        earned_total = getattr(courier, "total_earned", self.earned)
-        self.earned = earned_total
-        self.state = "finished"
-
-        delivered_count = len(getattr(courier, "delivered_jobs", []))
-        reputation_value = getattr(courier, "reputation", 0)
-
-        self.final_stats = {
-            "time_spent": self.elapsed_time,
-            "time_left": self.remaining_time,
-            "earned": earned_total,
-            "goal": self.goal,
-            "reputation": reputation_value,
-            "delivered": delivered_count,
-            "reason": reason,
-            "player_name": self.player_name,
-        }
+        # La simulación cierra la sesión (si no lo hizo ya) y calcula el puntaje
+        self.sim.finish(reason)
+        self.final_stats = dict(self.sim.final_stats, player_name=self.player_name)
+        reason = self.final_stats["reason"]
 
         if reason == "manual":
             self.return_to_menu = True
 
-        score_manager = getattr(self.engine, "score_manager", None)
-        if score_manager is not None:
-            breakdown = score_manager.finalize(self.remaining_time, self.session_duration)
-            score_data = breakdown.as_dict()
-            self.final_stats["score"] = score_data
-            self._store_score_record(score_data, reputation_value, delivered_count, reason)
+        score_data = self.final_stats.get("score")
+        if score_data is not None:
+            self._store_score_record(score_data, self.final_stats["reputation"],
+                                     self.final_stats["delivered"], reason)
 
         if reason != "manual":
             self._delete_snapshot()
@@ -595,7 +628,7 @@ class View_game:
             "score_breakdown": score_manager.get_breakdown().as_dict() if score_manager else None,
             "weather": self._serialize_weather_state(),
             "game_service": {
-                "session_start": getattr(self.engine.game_service, "session_start", time.time())
+                "session_start": getattr(self.engine.game_service, "session_start", self.sim.clock.now())
             },
         }
         try:
@@ -645,15 +678,20 @@ class View_game:
 
         session_start = snapshot.get("game_service", {}).get("session_start")
         if session_start is None:
-            session_start = getattr(self.engine.game_service, "session_start", time.time())
+            session_start = getattr(self.engine.game_service, "session_start", self.sim.clock.now())
+        # El reloj de juego sigue desde donde se guardó la partida
+        if session_start is not None and hasattr(self.sim.clock, "set"):
+            self.sim.clock.set(session_start + self.elapsed_time)
+        # Una partida retomada no se puede repetir desde el inicio: no se graba
+        if self.engine.recorder is not None:
+            self.engine.recorder.discard()
+            self.engine.recorder = None
 
         inventory_jobs = [self._deserialize_job(job) for job in courier_data.get("inventory", [])]
-        courier.inventory.items.clear()
-        if hasattr(courier.inventory, "_heap"):
-            courier.inventory._heap.clear()
+        courier.inventory.clear()
         for job in inventory_jobs:
             if session_start is not None and hasattr(job, "bind_session_start"):
-                job.bind_session_start(session_start)
+                job.bind_session_start(session_start, self.sim.clock)
             courier.inventory.add_job(job)
         courier.current_load = courier.inventory.total_weight()
 
@@ -661,19 +699,19 @@ class View_game:
         if session_start is not None:
             for job in courier.delivered_jobs:
                 if hasattr(job, "bind_session_start"):
-                    job.bind_session_start(session_start)
+                    job.bind_session_start(session_start, self.sim.clock)
 
         jobs = [self._deserialize_job(job) for job in snapshot.get("jobs", [])]
         if session_start is not None:
             for job in jobs:
                 if hasattr(job, "bind_session_start"):
-                    job.bind_session_start(session_start)
+                    job.bind_session_start(session_start, self.sim.clock)
 
         self.engine.jobs = jobs
         if self.engine.game_service:
             self.engine.game_service.session_start = session_start
             self.engine.game_service.set_jobs(jobs)
-            self.engine.jobs = list(self.engine.game_service.jobs)
+            self.engine.jobs = self.engine.game_service.jobs
 
         last_job_id = snapshot.get("last_job_id")
         if last_job_id:
@@ -754,116 +792,59 @@ class View_game:
         instr_x = panel_rect.x + (panel_width - instruction.get_width()) // 2
         self.screen.blit(instruction, (instr_x, panel_rect.bottom - 25))
 
-    def _move_courier(self, dx, dy, record_step=True):
-        self.engine.move_courier(dx, dy, record_step)
-        
-    def _move_ia(self, dx, dy, record_step=True):
-        self.engine.move_ia(dx, dy, record_step)
-        
-             
-    def _update(self, dt: float):
-     if self.roar == True:
-        self.roar = False
-        self.play_Sound("roar", 0)
-        
-     self.move_timer += dt
-     if self.move_timer >= self.move_delay:
+    def _read_player_input(self) -> PlayerInput:
+        """Traduce las teclas presionadas a la entrada del tick."""
         keys = pygame.key.get_pressed()
         dx = dy = 0
-        self._pickup_job()
-        if keys[pygame.K_BACKSPACE]:
-            dx, dy = self.engine.get_steps()
-            self._move_courier(dx, dy,False)
-            self.move_timer = 0
-        else:
-            if keys[pygame.K_UP]:
-                dy = -1
-                self.current_direction = 2  
-            elif keys[pygame.K_DOWN]:
-                dy = 1
-                self.current_direction = 3  
-            
-            if keys[pygame.K_a]:
-                dx = -1
-                self.current_direction = 4  
-            elif keys[pygame.K_d]:
-                dx = 1
-                self.current_direction = 5 
-            if keys[pygame.K_LEFT]:
-                dx = -1
-                self.current_direction = 0  
-            elif keys[pygame.K_RIGHT]:
-                dx = 1
-                self.current_direction = 1 
-                    
-            if dx or dy:
-              self.engine.include_step(self.engine.courier.position)
-              self._move_courier(dx, dy,True)
-              self.move_timer = 0  
-
-            courier = self.engine.courier
-            if dx == 0 and dy == 0 and courier.stamina < courier.stamina_max:
-                courier.recover_stamina(1.0) 
-                
-                
-    def _update_ia(self, dt: float):
-        """Actualiza movimiento de la IA con control de tiempo."""
-        jobs = self.engine.jobs
-        next_movement = self.engine.ia.next_movement_ia(jobs, self.engine.city_map)
-        
-
-        # acumula tiempo del movimiento IA
-        #   Tuve que usar su propio mover timer y delay por que sino anda todo loco
-        self.ia_move_timer += dt
-
-        if self.ia_move_timer >= self.ia_move_delay:
-            self.ia_move_timer = 0.0
-
-            dx = dy = 0
-            if next_movement[0] == 2:
-                dy = -1
-                self.current_direction_ia = 2
-            elif next_movement[0] == 3:
-                dy = 1
-                self.current_direction_ia = 3
-            elif next_movement[0] == 4:
-                dx = -1
-                self.current_direction_ia = 4
-            elif next_movement[0] == 5:
-                dx = 1
-                self.current_direction_ia = 5
-
-            ia_x, ia_y = self.engine.ia.position
-            target_x, target_y = next_movement[1]
-            dx = target_x - ia_x
-            dy = target_y - ia_y
-
-            self.engine.move_ia(dx, dy)
-            
-            if not self.player_interacting:
-                self._pickup_job_ia()
-
-    def _movement_ia(self, dt: float): 
-        jobs = self.engine.jobs
-        self.move_timer += dt
-        
-        if self.move_timer >= self.move_delay:
-            info_ia = self.engine.ia.next_movement_ia(jobs)
-            dx = dy = info_ia[1]
-            self._pickup_job_ia() 
-            
-            if dx or dy:
-                self._move_ia(dx, dy,True)
-                self.move_timer = 0  
-
-            ia = self.engine.ia
-            if dx == 0 and dy == 0 and ia.stamina < ia.stamina_max:
-                ia.recover_stamina(1.0) 
+        direction = None
+        if keys[pygame.K_UP]:
+            dy, direction = -1, UP
+        elif keys[pygame.K_DOWN]:
+            dy, direction = 1, DOWN
+        if keys[pygame.K_a]:
+            dx, direction = -1, WHEELIE_LEFT
+        elif keys[pygame.K_d]:
+            dx, direction = 1, WHEELIE_RIGHT
+        if keys[pygame.K_LEFT]:
+            dx, direction = -1, LEFT
+        elif keys[pygame.K_RIGHT]:
+            dx, direction = 1, RIGHT
+        return PlayerInput(dx, dy, back=bool(keys[pygame.K_BACKSPACE]), pick=bool(keys[pygame.K_e]),
+                           cancel=bool(keys[pygame.K_q]), deliver=bool(keys[pygame.K_r]),
+                           direction=direction)
+
+    def _hint_target(self):
+        """
+        Próxima parada del courier: la primera del recorrido del HUD o, sin
+        recorrido, el pedido a entregar o el pickup más cercano.
+        """
+        stop = self.route.next_stop() if self.route is not None else None
+        if stop is not None:
+            kind, job = stop
+            return tuple(job.pickup if kind == PICKUP else job.dropoff)
+        job = self.engine.courier.inventory.peek_next()
+        if job is not None:
+            return tuple(job.dropoff)
+        job = self.engine.game_service.job_table.nearest(self.engine.courier.position)
+        return tuple(job.pickup) if job is not None else None
+
+    def _update_route_path(self):
+        """Pide el camino hasta la próxima parada solo si cambian courier, parada o mapa."""
+        target = self._hint_target()
+        if target is None:
+            self.route_path = []
+            self._route_path_key = None
+            return
+        key = (self.engine.courier.position, target, self.engine.city_map.version)
+        if key != self._route_path_key:
+            self._route_path_key = key
+            self.route_path = self.engine.route_hint(target) or []
 
     def _draw(self):
         """Dibujar mapa, pedidos, courier y HUD."""
         self._draw_map()
         self._draw_jobs()
+        self._draw_route_path()
         self._draw_players()
         self._draw_hud()
         self._draw_reputation()
@@ -1210,15 +1191,63 @@ class View_game:
         self._draw_inventory()
 
     def _draw_map(self):
+        """Dibuja la ciudad estática con un solo blit de la capa cacheada."""
+        if self.map_layer is None:
+            self._build_map_layer()
+        elif self._dirty_map_regions:
+            regions = self._dirty_map_regions
+            self._dirty_map_regions = []
+            for region in regions:
+                self._paint_map_region(*region)
+        self.screen.blit(self.map_layer, (0, 0))
+
+    def _on_tile_changed(self, x, y, dirty):
+        """Callback del CityMap: solo marca la región para repintarla."""
+        self._dirty_map_regions.append(dirty)
+
+    def _build_map_layer(self):
+        """Compone una sola vez la ciudad completa en una superficie."""
+        cmap = self.engine.city_map
+        self.map_layer = pygame.Surface(
+            (cmap.width * CELL_SIZE, cmap.height * CELL_SIZE)
+        ).convert()
+        self._dirty_map_regions = []
+        self._paint_map_region(0, 0, cmap.width, cmap.height)
+
+    def _paint_map_region(self, rx, ry, rw, rh):
+        """Repinta en la capa estática las celdas y bloques de la región."""
         cmap = self.engine.city_map
-        for y in range(cmap.height):
-            for x in range(cmap.width):
+        layer = self.map_layer
+        if rw <= 0 or rh <= 0:
+            return
+
+        # Los bloques que tocan la región pueden salirse de ella: se repinta
+        # el área completa que cubren para no dejar edificios a medias.
+        bloques = [
+            bloque for bloque in cmap.detectar_bloques()
+            if bloque['x'] < rx + rw and rx < bloque['x'] + bloque['width']
+            and bloque['y'] < ry + rh and ry < bloque['y'] + bloque['height']
+        ]
+        x0, y0, x1, y1 = rx, ry, rx + rw, ry + rh
+        for bloque in bloques:
+            x0 = min(x0, bloque['x'])
+            y0 = min(y0, bloque['y'])
+            x1 = max(x1, bloque['x'] + bloque['width'])
+            y1 = max(y1, bloque['y'] + bloque['height'])
+
+        layer.fill(
+            (0, 0, 0),
+            pygame.Rect(x0 * CELL_SIZE, y0 * CELL_SIZE, (x1 - x0) * CELL_SIZE, (y1 - y0) * CELL_SIZE),
+        )
+
+        for y in range(y0, y1):
+            for x in range(x0, x1):
                 key = cmap.tiles[y][x]
-                
-                if key in ['C', 'P']: 
+
+                if key in ['C', 'P']:
                     img = self.tile_images.get(key)
                     if img:
-                        self.screen.blit(img, (x * CELL_SIZE, y * CELL_SIZE))
+                        layer.blit(img, (x * CELL_SIZE, y * CELL_SIZE))
                     else:
                         name = cmap.legend[key].get("name", "")
                         if name == "calle":
@@ -1234,68 +1263,66 @@ class View_game:
                             CELL_SIZE,
                             CELL_SIZE
                         )
-                        pygame.draw.rect(self.screen, color, rect)
-                
-        
-        bloques_edificios = cmap.detectar_bloques()
+                        pygame.draw.rect(layer, color, rect)
+
+        for bloque in cmap.detectar_bloques():
+            if (bloque['x'] < x1 and x0 < bloque['x'] + bloque['width']
+                    and bloque['y'] < y1 and y0 < bloque['y'] + bloque['height']):
+                self._paint_building_block(bloque)
+
+    def _paint_building_block(self, bloque):
+        cmap = self.engine.city_map
+        layer = self.map_layer
         building_img = self.tile_images.get('B')
-        window_img = self.tile_images.get('W') 
-        ground_img = self.tile_images.get('G')  
+        window_img = self.tile_images.get('W')
+        ground_img = self.tile_images.get('G')
         npc_image = self.tile_images.get('D')
-        
-        for bloque in bloques_edificios:
-            x = bloque['x']
-            y = bloque['y']
-            w = bloque['width']
-            h = bloque['height']
-            
-            building_rect = pygame.Rect(
-                x * CELL_SIZE,
-                y * CELL_SIZE,
-                w * CELL_SIZE,
-                h * CELL_SIZE
-            )
-            
-            if building_img or window_img or ground_img or npc_image:
-                edificio_completo = pygame.Surface((w * CELL_SIZE, h * CELL_SIZE), pygame.SRCALPHA)
-                
-                for i in range(w):  
-                    for j in range(h):  
-                        pos_x = i * CELL_SIZE
-                        pos_y = j * CELL_SIZE                  
-                        celda_x = x + i
-                        celda_y = y + j
-                        tipo_celda = cmap.tiles[celda_y][celda_x]
-                        
-                        if tipo_celda == 'D' and npc_image:
-                            if h==1 and  w==1:
-                                edificio_completo.blit(npc_image, (pos_x, pos_y))
-
-                            elif j == h - 1:  
-                                if self.tile_images.get('G_NPC'):  
-                                    edificio_completo.blit(self.tile_images['G_NPC'], (pos_x, pos_y))
-                            else:  
-                                if self.tile_images.get('W_NPC'):  
-                                    edificio_completo.blit(self.tile_images['W_NPC'], (pos_x, pos_y))
+
+        x = bloque['x']
+        y = bloque['y']
+        w = bloque['width']
+        h = bloque['height']
+
+        building_rect = pygame.Rect(
+            x * CELL_SIZE,
+            y * CELL_SIZE,
+            w * CELL_SIZE,
+            h * CELL_SIZE
+        )
+
+        if building_img or window_img or ground_img or npc_image:
+            for i in range(w):
+                for j in range(h):
+                    pos_x = (x + i) * CELL_SIZE
+                    pos_y = (y + j) * CELL_SIZE
+                    tipo_celda = cmap.tiles[y + j][x + i]
+
+                    if tipo_celda == 'D' and npc_image:
+                        if h == 1 and w == 1:
+                            layer.blit(npc_image, (pos_x, pos_y))
+
+                        elif j == h - 1:
+                            if self.tile_images.get('G_NPC'):
+                                layer.blit(self.tile_images['G_NPC'], (pos_x, pos_y))
                         else:
-                            if j == h - 1:
-                                if ground_img:
-                                    edificio_completo.blit(ground_img, (pos_x, pos_y))
-                            else:  
-                                if window_img:
-                                    edificio_completo.blit(window_img, (pos_x, pos_y))
-                                
-                
-                self.screen.blit(edificio_completo, building_rect)
-            else:
-                pygame.draw.rect(self.screen, (100, 100, 100), building_rect)
-            
-            pygame.draw.rect(
-                self.screen,
-                (30, 30, 30),
-                building_rect,
-                1  
-            )
+                            if self.tile_images.get('W_NPC'):
+                                layer.blit(self.tile_images['W_NPC'], (pos_x, pos_y))
+                    else:
+                        if j == h - 1:
+                            if ground_img:
+                                layer.blit(ground_img, (pos_x, pos_y))
+                        else:
+                            if window_img:
+                                layer.blit(window_img, (pos_x, pos_y))
+        else:
+            pygame.draw.rect(layer, (100, 100, 100), building_rect)
+
+        pygame.draw.rect(
+            layer,
+            (30, 30, 30),
+            building_rect,
+            1
+        )
 
     def _draw_jobs(self):
 
@@ -1317,184 +1344,24 @@ class View_game:
                 self.screen.blit(img, (x * CELL_SIZE, y * CELL_SIZE))
 
 
-        # ------ 3. DIBUJAR DROP-OFFS DE LA IA ------
-        for job in self.engine.ia.inventory.get_all():
-            x, y = job.dropoff
-            img = self.tile_images.get("D")
-            if img:
-                self.screen.blit(img, (x * CELL_SIZE, y * CELL_SIZE))
+        # ------ 3. DIBUJAR DROP-OFFS DE LAS IAS ------
+        for ia in self.engine.ias:
+            for job in ia.inventory.get_all():
+                x, y = job.dropoff
+                img = self.tile_images.get("D")
+                if img:
+                    self.screen.blit(img, (x * CELL_SIZE, y * CELL_SIZE))
 
             
 
 
-    def _update_job(self, job: Job):
-        """Gestiona aceptacion, cancelacion y entrega del pedido cercano."""
-        keys = pygame.key.get_pressed()
-        courier_ref = self.engine.courier
-        ia_ref = self.engine.ia
-        score_manager = getattr(self.engine, "score_manager", None)
-        
-        
-        if len(courier_ref.inventory.get_all())>0 and courier_ref.posibility_lose_job():
-                lost_job = courier_ref.inventory.random_job()
-                if lost_job:
-                    self.engine.set_last_job(lost_job)
-                    courier_ref.inventory.remove_job(lost_job)
-                    self.play_Sound("fall",0)
-                    if score_manager is not None:
-                        score_manager.register_cancellation(job)
-                        courier_ref.adjust_reputation(-6)  # posibilidad de extraviar un pedido
-
-
-        if keys[pygame.K_e] and job is not None:
-            if job not in self.engine.courier.inventory.get_all():  # aÃºn no tomado
-                if self.engine.courier.pick_job(job):
-                    x,y = job.dropoff 
-                    self.prev = self.engine.city_map.tiles[y][x] # saca la posicion de donde se va anetregar a ver de que tipo es ante de actualizarlo
-                    self.engine.jobs.remove(job)  # lo sacamos de la lista global
-                    self.play_Sound("catch",0)
-                else:
-                    self.play_Sound("error",0)
-                    
-                   
-
-        if keys[pygame.K_q] and job is not None:
-            if job in courier_ref.inventory.get_all():
-                  next_job = courier_ref.inventory.peek_next()
-                  if next_job == job:
-                    self.engine.set_last_job(job)
-                    self.engine.courier.inventory.remove_job(job)
-                    self.play_Sound("remove",0)
-                    if score_manager is not None:
-                       score_manager.register_cancellation(job)
-                       courier_ref.adjust_reputation(-4)  # Penaliza reputaciÃ³n por cancelaciÃ³n (-4 en la rÃºbrica)
-                       
-            else:
-              self.play_Sound("error",0)       
-                       
-
-        if keys[pygame.K_r] and job is not None:
-            if job in courier_ref.inventory.get_all():
-                next_job = courier_ref.inventory.peek_next()
-                if next_job == job:
-                    self.engine.set_last_job(job)
-                    self.play_Sound("acept",0)
-                    delivery_result = courier_ref.deliver_job(job)
-                    if score_manager is not None:
-                        score_manager.register_delivery(job, delivery_result)
-                    earned_delta = float(delivery_result.get("payout_applied", getattr(job, "payout", 0.0)))
-                    self.earned += earned_delta
-                else:
-                    self.play_Sound("error",0)
-                    
-    def _update_job_ia(self, jobs: Job):
-        """Gestiona pickup y entrega de un job para la IA."""
-    def _update_job_ia(self, jobs: Job):
-        """Gestiona pickup y entrega de un job para la IA."""
-        ia_ref = self.engine.ia
-
-        # ----------------- PICKUP ------------------
-
-        # ----------------- PICKUP ------------------
-        if jobs is not None:
-            # Si aún no está en inventario, intentar recogerlo
-            if jobs not in ia_ref.inventory.get_all():
-
-                if ia_ref.pick_job(jobs):
-
-                    # Guardamos el job como objetivo de entrega
-                    ia_ref.prev = jobs  
-            # Si aún no está en inventario, intentar recogerlo
-            if jobs not in ia_ref.inventory.get_all():
-
-                if ia_ref.pick_job(jobs):
-
-                    # Guardamos el job como objetivo de entrega
-                    ia_ref.prev = jobs  
-
-                    # Sacarlo del mapa para que deje de dibujarse
-                    # Sacarlo del mapa para que deje de dibujarse
-                    if jobs in self.engine.jobs:
-                        self.engine.jobs.remove(jobs)
-                        self.engine.jobs.remove(jobs)
-                    else:
-                        print(f"[WARN] Job {jobs} no estaba en la lista global.")
-                        print(f"[WARN] Job {jobs} no estaba en la lista global.")
-
-                    # Sonido de pickup
-                    # Sonido de pickup
-                    self.play_Sound("catch", 0)
-
-
-                else:
-                    # No pudo recogerlo
-                    self.play_Sound("error", 0)
-
-        # ----------------- DELIVERY ------------------
-        if jobs is not None and jobs in ia_ref.inventory.get_all():
-
-            next_job = ia_ref.inventory.peek_next()
-
-            # Posición actual IA
-            ia_x, ia_y = ia_ref.position
-
-            # Destino dropoff del job
-            drop_x, drop_y = jobs.dropoff
-
-            # Distancia Manhattan (rango flexible)
-            distance = abs(ia_x - drop_x) + abs(ia_y - drop_y)
-
-            # Si está dentro de 5 casillas del dropoff y es el job correcto
-            if next_job == jobs and distance <= 5:
-
-                # Registrar job entregado (affecta UI/score)
-                self.engine.set_last_job_ia(jobs)
-
-                # Sonido de entrega
-                self.play_Sound("acept", 0)
-
-                # Realizar entrega
-                ia_ref.deliver_job(jobs)
-
-                # Limpiar objetivo
-                ia_ref.prev = None
-
-                    
-                    
-                    # No pudo recogerlo
-                self.play_Sound("error", 0)
-
-        # ----------------- DELIVERY ------------------
-        if jobs is not None and jobs in ia_ref.inventory.get_all():
-
-            next_job = ia_ref.inventory.peek_next()
-
-            # Posición actual IA
-            ia_x, ia_y = ia_ref.position
-
-            # Destino dropoff del job
-            drop_x, drop_y = jobs.dropoff
-
-            # Distancia Manhattan (rango flexible)
-            distance = abs(ia_x - drop_x) + abs(ia_y - drop_y)
-
-            # Si está dentro de 5 casillas del dropoff y es el job correcto
-            if next_job == jobs and distance <= 5:
-
-                # Registrar job entregado (affecta UI/score)
-                self.engine.set_last_job_ia(jobs)
-
-                # Sonido de entrega
-                self.play_Sound("acept", 0)
-
-                # Realizar entrega
-                ia_ref.deliver_job(jobs)
-
-                # Limpiar objetivo
-                ia_ref.prev = None
-
-                    
-                    
+    def _draw_route_path(self):
+        # Camino sugerido hasta la próxima parada del recorrido
+        if len(self.route_path) < 2:
+            return
+        half = CELL_SIZE // 2
+        points = [(x * CELL_SIZE + half, y * CELL_SIZE + half) for x, y in self.route_path]
+        pygame.draw.lines(self.screen, (180, 220, 255), False, points, 2)
 
     def _draw_courier(self):
         x, y = self.engine.courier.position
@@ -1512,8 +1379,8 @@ class View_game:
         center = (px + CELL_SIZE // 2, py + CELL_SIZE // 2)
         pygame.draw.circle(self.screen, (255, 0, 0), center, CELL_SIZE // 3)
         
-    def _draw_ia(self):
-        x, y = self.engine.ia.position
+    def _draw_ia(self, ia):
+        x, y = ia.position
         px, py = x * CELL_SIZE, y * CELL_SIZE
 
         if self.courier_images and self.current_direction_ia in self.courier_images:
@@ -1530,7 +1397,8 @@ class View_game:
         
     def _draw_players(self):
         self._draw_courier()
-        self._draw_ia()
+        for ia in self.engine.ias:
+            self._draw_ia(ia)
 
     def _draw_hud(self):
         # Barra inferior
@@ -1549,6 +1417,14 @@ class View_game:
         )
         self.screen.blit(earn_surf, (10, h - HUD_HEIGHT + 40))
 
+        # Recorrido sugerido: próximas paradas del optimizador
+        if self.route is not None and self.route.stops:
+            stops = " > ".join(
+                f"{'P' if kind == PICKUP else 'D'}:{job.id}" for kind, job in self.route.stops[:4]
+            )
+            route_surf = self.small_font.render(f"Route: {stops}", True, (180, 220, 255))
+            self.screen.blit(route_surf, (250, h - HUD_HEIGHT + 48))
+
         # Botonn Inventory
     
         self.inv_button = pygame.Rect(w - 200, h - HUD_HEIGHT + 10, 180, 35)
@@ -1634,12 +1510,6 @@ class View_game:
             self.screen.blit(surf, (rect.x + 20, rect.y + 50 + i * 30))
             
             
-    def _pickup_job_ia(self):
-        self._update_job_ia(self.engine.job_nearly_ia())
-    
-    def _pickup_job(self):
-        self._update_job(self.engine.job_nearly())
-    
     def _draw_inventory(self):
        if not getattr(self, "show_inventory", False):
            return
@@ -1665,7 +1535,10 @@ class View_game:
        self.screen.blit(txt_p, (self.priority_button.x + 10, self.priority_button.y + 5))
        self.screen.blit(txt_d, (self.deadline_button.x + 10, self.deadline_button.y + 5))
 
-       items = getattr(self, "ordered_jobs", self.engine.courier.inventory.get_all())
+       # Las vistas ordenadas del inventario siempre están al día
+       inventory = self.engine.courier.inventory
+       order = getattr(self, "inventory_order", None)
+       items = inventory.ordered_jobs(order) if order else inventory.get_all()
        if items:
            for i, item in enumerate(items[:5]):  # muestra hasta 5
                txt = self.small_font.render(